@@ -0,0 +1,4 @@
+"""
+Benchmarks of the orchestrator, run `python -m benchmarks --help`, `python -m benchmarks.memory --help`
+and `python -m benchmarks.codec --help`
+"""
@@ -0,0 +1,139 @@
+"""
+Saga throughput and latency benchmark with in-process stub steps
+
+    python -m benchmarks [--quick] [--sagas N] [--output results.json]
+
+Every case runs `sagas` sagas keeping at most `concurrency` of them in flight and reports sagas/second
+and p50/p99/max latency of a saga from the call to the result. Cases vary the number of steps, concurrency,
+retry rate, rollback path and the execution mode:
+
+    plain     - without manager, saga runs on the caller event loop
+    manager   - through `Manager`, no store
+    callback  - `Manager` with no-op store/complete/abort callbacks
+    journal   - `Manager` with `JournalStore` in the temporary directory
+    sqlite    - `Manager` with `SQLiteStore` in the temporary directory
+
+Results are written as JSON (stdout by default) for comparison across versions.
+"""
+import argparse, asyncio, itertools, json, logging, pathlib, platform, sys, tempfile, time
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+import orsa
+from orsa import Manager
+from orsa.store import JournalStore, SQLiteStore
+from benchmarks._sagas import Stubs, build
+
+MODES = ('plain', 'manager', 'callback', 'journal', 'sqlite')
+
+def _manager(mode: str, workdir: pathlib.Path) -> Manager | None:
+    if mode == 'plain':
+        return None
+    if mode == 'journal':
+        return Manager(store=JournalStore(workdir / 'journal'))
+    if mode == 'sqlite':
+        return Manager(store=SQLiteStore(workdir / 'saga.db', synchronous='NORMAL'))
+    manager = Manager()
+    if mode == 'callback':
+        @manager.saga.store
+        async def _store(self, saga):
+            pass
+
+        @manager.saga.complete
+        async def _complete(self, saga):
+            pass
+
+        @manager.saga.abort
+        async def _abort(self, saga, ex):
+            pass
+    return manager
+
+async def _drive(entry, manager: Manager | None, sagas: int, concurrency: int) -> list[float]:
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(n: int):
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                if manager is None:
+                    await entry(n)
+                else:
+                    await asyncio.wrap_future(await entry(n))
+            except Exception:
+                pass
+            latencies.append(time.perf_counter() - started)
+
+    await asyncio.gather(*(one(n) for n in range(sagas)))
+    return latencies
+
+def _percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+def run_case(mode: str, steps: int, concurrency: int, sagas: int, retry_rate: float, rollback: bool) -> dict:
+    with tempfile.TemporaryDirectory(prefix='orsa-bench-') as workdir:
+        manager = _manager(mode, pathlib.Path(workdir))
+        entry = build(steps, Stubs(retry_rate, rollback), manager)
+        if manager is not None:
+            manager.Start()
+        try:
+            # Warm up: entry template and binding plans are compiled by the first run
+            asyncio.run(_drive(entry, manager, min(sagas, 10), 1))
+            started = time.perf_counter()
+            latencies = asyncio.run(_drive(entry, manager, sagas, concurrency))
+            elapsed = time.perf_counter() - started
+        finally:
+            if manager is not None:
+                manager.Stop()
+    return {'mode': mode, 'steps': steps, 'concurrency': concurrency, 'retry_rate': retry_rate, 'rollback': rollback,
+            'sagas': sagas, 'seconds': round(elapsed, 6), 'sagas_per_sec': round(sagas / elapsed, 1),
+            'p50_ms': round(_percentile(latencies, 0.50) * 1e3, 4), 'p99_ms': round(_percentile(latencies, 0.99) * 1e3, 4),
+            'max_ms': round(max(latencies) * 1e3, 4)}
+
+def cases(opts) -> list[tuple]:
+    result = []
+    for mode, steps, concurrency in itertools.product(opts.modes, opts.steps, opts.concurrency):
+        result.append((mode, steps, concurrency, 0.0, False))
+    # Failure paths are measured with the middle number of steps and the highest concurrency
+    steps, concurrency = opts.steps[len(opts.steps) // 2], opts.concurrency[-1]
+    for mode in opts.modes:
+        if opts.retry_rate:
+            result.append((mode, steps, concurrency, opts.retry_rate, False))
+        result.append((mode, steps, concurrency, 0.0, True))
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sagas', type=int, default=2000, help='sagas per case')
+    parser.add_argument('--steps', type=int, nargs='+', default=[1, 5, 20])
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 100])
+    parser.add_argument('--retry-rate', type=float, default=0.1, help='probability of the step first attempt failure')
+    parser.add_argument('--modes', nargs='+', choices=MODES, default=list(MODES))
+    parser.add_argument('--quick', action='store_true', help='small smoke run')
+    parser.add_argument('--output', type=pathlib.Path, help='JSON output file, stdout by default')
+    opts = parser.parse_args()
+    if opts.quick:
+        opts.sagas, opts.steps, opts.concurrency = 200, [1, 5], [1, 50]
+
+    # Stub failures are expected, keep stderr for the progress
+    orsa.configure_logging(level=logging.CRITICAL)
+    results = []
+    for case in cases(opts):
+        mode, steps, concurrency, retry_rate, rollback = case
+        result = run_case(mode, steps, concurrency, opts.sagas, retry_rate, rollback)
+        results.append(result)
+        print(f"{result['mode']:>8} steps={result['steps']:<3} conc={result['concurrency']:<4} retry={result['retry_rate']:<4} "
+              f"rollback={result['rollback']!s:<5} {result['sagas_per_sec']:>10.1f} sagas/s  p50 {result['p50_ms']:8.3f} ms  "
+              f"p99 {result['p99_ms']:8.3f} ms", file=sys.stderr)
+
+    report = {'orsa': orsa.__version__, 'python': platform.python_version(), 'platform': platform.platform(),
+              'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()), 'results': results}
+    text = json.dumps(report, indent=2)
+    if opts.output:
+        opts.output.write_text(text)
+    else:
+        print(text)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+In-process stub sagas of the benchmark
+"""
+import asyncio, linecache, random
+
+from orsa import orchestrator, Retry
+
+class Stubs():
+    """
+    Behaviour of the stub steps: the first attempt of a step fails with `retry_rate` probability,
+    the last step of the saga always fails when `rollback` path is measured.
+    With `hold` the last step waits for `release()`, with `park` its first attempt fails to be retried later
+    """
+    def __init__(self, retry_rate: float = 0.0, rollback: bool = False, seed: int = 1, hold: bool = False, park: bool = False):
+        self.retry_rate = retry_rate
+        self.rollback = rollback
+        self.hold = hold
+        self.park = park
+        self.held = 0
+        self._gate: asyncio.Event = None
+        self._loop: asyncio.AbstractEventLoop = None
+        self._random = random.Random(seed)
+        self._failed: set[tuple] = set()
+
+    async def wait(self):
+        if not self.hold:
+            return
+        if self._gate is None:
+            self._gate, self._loop = asyncio.Event(), asyncio.get_running_loop()
+        self.held += 1
+        await self._gate.wait()
+
+    def release(self):
+        if self._gate is not None:
+            self._loop.call_soon_threadsafe(self._gate.set)
+
+    def step(self, no: int, last: bool, n: int):
+        if self.rollback and last:
+            raise RuntimeError("Stub failure")
+        if self.park and last and (n, no) not in self._failed:
+            self._failed.add((n, no))
+            raise ConnectionError("Stub transient failure")
+        if self.retry_rate and (n, no) not in self._failed and self._random.random() < self.retry_rate:
+            self._failed.add((n, no))
+            raise ConnectionError("Stub transient failure")
+        return n + no
+
+    def undo(self, no: int, n: int):
+        return None
+
+def build(steps: int, stubs: Stubs, manager = None, parallel: bool = False, retry: Retry = Retry(2, 0.0, 1.0)):
+    """
+    Build saga entry with `steps` stub steps and a rollback for every step. Entry body is generated
+    as straight declarations, as a saga is written by hand, so the entry template is used from the second run
+    """
+    lines = ["async def bench_saga(saga, n):"]
+    for no in range(steps):
+        lines += [f"    @saga.step(retry=_retry)",
+                  f"    async def step_{no}():",
+                  *([f"        await _stubs.wait()"] if stubs.hold and no == steps - 1 else []),
+                  f"        return _stubs.step({no}, {no == steps - 1}, n)",
+                  f"    @saga.rollback",
+                  f"    async def undo_{no}():",
+                  f"        return _stubs.undo({no}, n)"]
+    namespace = {'_stubs': stubs, '_retry': retry}
+    source, filename = '\n'.join(lines) + '\n', f'<bench_saga:{steps}>'
+    # Template checks the declarations of the entry by its source
+    linecache.cache[filename] = (len(source), None, source.splitlines(True), filename)
+    exec(compile(source, filename, 'exec'), namespace)
+    return orchestrator(namespace['bench_saga'], manager=manager, parallel=parallel)
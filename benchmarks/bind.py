@@ -0,0 +1,58 @@
+"""
+Micro-benchmark of the step arguments binding overhead
+
+Compares reflection on every call (`get_type_hints` + `inspect.signature`, as it was done before
+binding plans were introduced) against the precompiled binding plan used by `Callee`.
+
+    python benchmarks/bind.py [--number N]
+"""
+import argparse, pathlib, sys, timeit
+from typing import Annotated, get_type_hints, get_args, get_origin
+from inspect import signature
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+from orsa import Result
+from orsa.core._callee import Callee
+
+def get_exchange_rates() -> dict[str, tuple[float, float]]:
+    return {}
+
+def convert_to_base_currency() -> float:
+    return 0.0
+
+def convert_to_dst_currency(
+        BaseAmount: Result[float, convert_to_base_currency],
+        ExchRates: Result[dict[str, tuple[float, float]], get_exchange_rates],
+        amount: float, toCurrency: str) -> float:
+    return 0.0
+
+def _reflect_bind(fn, returns, context, args):
+    kwargs = {**context}
+    for vn, tp in get_type_hints(fn, include_extras=True).items():
+        if get_origin(tp) is Result or get_origin(tp) is Annotated:
+            _type, _step = get_args(tp)
+            kwargs[vn] = returns.get(_step.__name__, None)
+    sig = signature(fn)
+    params = sig.bind(*args, **{k: kwargs[k] for k, v in sig.parameters.items() if k in kwargs})
+    params.apply_defaults()
+    return params
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--number', type=int, default=100_000)
+    opts = parser.parse_args()
+
+    returns = {'convert_to_base_currency': 12.5, 'get_exchange_rates': {'USD': (3.2, 1)}}
+    context = {'amount': 45.12, 'fromCurrency': 'USD', 'toCurrency': 'CNY'}
+    callee = Callee(convert_to_dst_currency, 'bench', returns)
+
+    before = timeit.timeit(lambda: _reflect_bind(convert_to_dst_currency, returns, context, []), number=opts.number)
+    after = timeit.timeit(lambda: callee._bind_context(context, []), number=opts.number)
+
+    print(f"reflection : {before / opts.number * 1e9:10.0f} ns/call")
+    print(f"plan       : {after / opts.number * 1e9:10.0f} ns/call")
+    print(f"speedup    : {before / after:10.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Encode/decode cost and size of the saga state with the store codecs against JSON
+
+    python -m benchmarks.codec [--steps 1 5 20] [--payloads scalar rich rows] [--output codec.json]
+
+    scalar  - every step returns a number and a short string
+    rich    - every step returns UUID, datetime, Decimal and a list of dataclass items
+    rows    - every step returns a result set of 1000 row tuples
+
+    json     - `json.dumps`/`json.loads` with the encoder converting UUID, datetime, Decimal and dataclasses,
+               as the custom store of `saga.store` callback does, types are not restored on decode
+    pickle   - `PickleCodec`
+    msgpack  - `MsgpackCodec`, skipped when `msgpack` package is not installed
+
+Time is the best of the repeated runs in microseconds per state.
+"""
+import argparse, dataclasses, datetime, decimal, json, pathlib, platform, sys, time, uuid
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+import orsa
+from orsa.store import PickleCodec, MsgpackCodec
+
+PAYLOADS = ('scalar', 'rich', 'rows')
+
+@dataclasses.dataclass
+class Item:
+    sku: str
+    cost: float
+    quantity: float
+
+class _JsonEncoder(json.JSONEncoder):
+    def default(self, obj):
+        if isinstance(obj, uuid.UUID):
+            return str(obj)
+        if isinstance(obj, (datetime.datetime, datetime.date)):
+            return obj.isoformat()
+        if isinstance(obj, decimal.Decimal):
+            return str(obj)
+        if dataclasses.is_dataclass(obj):
+            return dataclasses.asdict(obj)
+        return super().default(obj)
+
+class _JsonCodec():
+    def encode(self, state) -> bytes:
+        return json.dumps(state, cls=_JsonEncoder).encode()
+
+    def decode(self, data: bytes):
+        return json.loads(data)
+
+def _codecs() -> dict:
+    codecs = {'json': _JsonCodec(), 'pickle': PickleCodec()}
+    try:
+        codecs['msgpack'] = MsgpackCodec()
+    except ImportError:
+        print("msgpack is not installed, MsgpackCodec is skipped", file=sys.stderr)
+    return codecs
+
+def _result(payload: str, no: int):
+    if payload == 'scalar':
+        return {'amount': no * 10.5, 'ref': f'ref-{no}'}
+    if payload == 'rich':
+        return {'uid': uuid.UUID(int=no), 'at': datetime.datetime(2024, 1, 1, 12, no % 60, tzinfo=datetime.timezone.utc),
+                'total': decimal.Decimal('1234.56'), 'items': [Item(f'sku-{no}-{n}', 1.25 * n, 2.0) for n in range(10)]}
+    return [(n, f'row-{n}', n * 0.5, n % 2 == 0) for n in range(1000)]
+
+def state(steps: int, payload: str) -> dict:
+    """
+    State of the saga with `steps` completed steps, as `saga.state` returns it
+    """
+    return {'@uid': uuid.UUID(int=steps), '@args': [42, 'customer'], '@kwargs': {}, '@src': '/srv/app/sagas.py',
+            '@entry': 'order', '@module': 'app.sagas', '@created': 1.7e9, '@deadline': None, '@retry': None,
+            '@returns': {f'step_{no}': _result(payload, no) for no in range(steps)}}
+
+def _best(fn, arg, budget: float) -> float:
+    best, spent, runs = float('inf'), 0.0, 0
+    while spent < budget or runs < 5:
+        started = time.perf_counter()
+        fn(arg)
+        elapsed = time.perf_counter() - started
+        best, spent, runs = min(best, elapsed), spent + elapsed, runs + 1
+    return best
+
+def run_case(name: str, codec, steps: int, payload: str, budget: float) -> dict:
+    value = state(steps, payload)
+    data = codec.encode(value)
+    return {'codec': name, 'steps': steps, 'payload': payload, 'bytes': len(data),
+            'encode_us': round(_best(codec.encode, value, budget) * 1e6, 2),
+            'decode_us': round(_best(codec.decode, data, budget) * 1e6, 2)}
+
+def main():
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.codec', description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--steps', type=int, nargs='+', default=[1, 5, 20])
+    parser.add_argument('--payloads', nargs='+', choices=PAYLOADS, default=list(PAYLOADS))
+    parser.add_argument('--budget', type=float, default=0.2, help='seconds of the repeated runs per measure')
+    parser.add_argument('--output', type=pathlib.Path, help='JSON output file, stdout by default')
+    opts = parser.parse_args()
+
+    results = []
+    for payload in opts.payloads:
+        for steps in opts.steps:
+            for name, codec in _codecs().items():
+                result = run_case(name, codec, steps, payload, opts.budget)
+                results.append(result)
+                print(f"{result['payload']:>7} steps={result['steps']:<3} {result['codec']:>8} {result['bytes']:>9} bytes  "
+                      f"encode {result['encode_us']:10.2f} us  decode {result['decode_us']:10.2f} us", file=sys.stderr)
+
+    report = {'orsa': orsa.__version__, 'python': platform.python_version(), 'platform': platform.platform(),
+              'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()), 'results': results}
+    text = json.dumps(report, indent=2)
+    if opts.output:
+        opts.output.write_text(text)
+    else:
+        print(text)
+
+if __name__ == "__main__":
+    main()
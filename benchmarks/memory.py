@@ -0,0 +1,104 @@
+"""
+Memory footprint of the sagas waiting in flight and parked by the manager
+
+    python -m benchmarks.memory [--sagas N] [--steps 1 5 20] [--output memory.json]
+
+    inflight  - without manager, saga waits in the last step
+    manager   - through `Manager`, saga waits in the last step
+    parked    - through `Manager`, saga is parked until the retry of the last step in one hour
+
+Bytes per saga is the growth of the memory traced by `tracemalloc` divided by the number of waiting sagas,
+it includes the task, the result future and everything else the saga keeps alive.
+"""
+import argparse, asyncio, gc, json, logging, pathlib, platform, sys, time, tracemalloc
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+import orsa
+from orsa import Manager, Retry, RetryPolicy
+from benchmarks._sagas import Stubs, build
+
+MODES = ('inflight', 'manager', 'parked')
+
+async def _until(condition, timeout: float = 300.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise TimeoutError("Sagas did not reach the waiting point")
+        await asyncio.sleep(0.01)
+
+def _traced() -> int:
+    gc.collect()
+    return tracemalloc.get_traced_memory()[0]
+
+async def _measure(entry, stubs: Stubs, manager: Manager | None, sagas: int, park: bool) -> int:
+    # Warm up: entry template and binding plans are compiled by the first run
+    for n in range(10):
+        if manager is None:
+            await entry(n)
+        else:
+            await asyncio.wrap_future(await entry(n))
+    stubs.hold, stubs.park = not park, park
+    tracemalloc.start()
+    try:
+        before = _traced()
+        if manager is None:
+            waiting = [asyncio.ensure_future(entry(n)) for n in range(sagas)]
+        else:
+            waiting = [await entry(n) for n in range(sagas)]
+        if stubs.park:
+            await _until(lambda: manager.parked >= sagas)
+        else:
+            await _until(lambda: stubs.held >= sagas)
+        used = _traced() - before
+    finally:
+        tracemalloc.stop()
+    stubs.release()
+    if manager is None:
+        await asyncio.gather(*waiting)
+    elif not stubs.park:
+        await asyncio.gather(*(asyncio.wrap_future(future) for future in waiting))
+    return used
+
+def run_case(mode: str, steps: int, sagas: int) -> dict:
+    # Retry delay without jitter is always long enough to park
+    manager = Manager(retry_policy=RetryPolicy(jitter=None), park_after=60.0) if mode != 'inflight' else None
+    park = mode == 'parked'
+    stubs = Stubs(hold=not park, park=park)
+    entry = build(steps, stubs, manager, retry=Retry(2, 3600.0, 1.0))
+    stubs.hold = stubs.park = False
+    if manager is not None:
+        manager.Start()
+    try:
+        used = asyncio.run(_measure(entry, stubs, manager, sagas, park))
+    finally:
+        if manager is not None:
+            manager.Stop()
+    return {'mode': mode, 'steps': steps, 'sagas': sagas, 'bytes': used, 'bytes_per_saga': round(used / sagas)}
+
+def main():
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.memory', description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sagas', type=int, default=10000, help='waiting sagas per case')
+    parser.add_argument('--steps', type=int, nargs='+', default=[1, 5, 20])
+    parser.add_argument('--modes', nargs='+', choices=MODES, default=list(MODES))
+    parser.add_argument('--output', type=pathlib.Path, help='JSON output file, stdout by default')
+    opts = parser.parse_args()
+
+    orsa.configure_logging(level=logging.CRITICAL)
+    results = []
+    for mode in opts.modes:
+        for steps in opts.steps:
+            result = run_case(mode, steps, opts.sagas)
+            results.append(result)
+            print(f"{result['mode']:>8} steps={result['steps']:<3} {result['bytes_per_saga']:>10} bytes/saga", file=sys.stderr)
+
+    report = {'orsa': orsa.__version__, 'python': platform.python_version(), 'platform': platform.platform(),
+              'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()), 'results': results}
+    text = json.dumps(report, indent=2)
+    if opts.output:
+        opts.output.write_text(text)
+    else:
+        print(text)
+
+if __name__ == "__main__":
+    main()
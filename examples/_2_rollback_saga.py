@@ -16,7 +16,7 @@ async def currency_exchange(saga: Saga, amount: float, fromCurrency: str, toCurr
             _logger.info("Obtain exchange rates ... success (%d)",len(data))
             return { cur['Cur_Abbreviation']: (cur['Cur_OfficialRate'],cur['Cur_Scale']) for cur in data }
 
-    @saga.step
+    @saga.step(executor='thread') # Blocking file I/O is executed out of the event loop
     def register_convert_transaction():
         uidTransaction = uuid.uuid4()
         with open(str(uidTransaction),'tw', encoding='utf-8') as fd:
@@ -10,7 +10,7 @@ async def currency_exchange(saga: Saga, amount: float, fromCurrency: str, toCurr
     """
     Sample Saga. Exchange from currencies
     """
-    @saga.step(retry=3) # Number  of retries for this step
+    @saga.step(retry=3, cache=300.0) # Number  of retries for this step, rates are reused by sagas for 5 minutes
     async def get_exchange_rates() -> dict[str,tuple[float,float]]:
         async with httpx.AsyncClient() as cli:
             res = await cli.get('https://api.nbrb.by/exrates/rates?periodicity=0')
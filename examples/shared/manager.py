@@ -1,36 +1,20 @@
-import orsa, asyncio, aiofiles, json, pathlib, uuid, pydantic
-from shared.otypes import OrderItem
+import orsa, asyncio, aiofiles, pathlib
+from orsa.store import PickleCodec
 
 manager:orsa.Manager = orsa.Manager()
 
 _sagaItems = {}
-_sagaDbFile = pathlib.Path('saga.db.json')
+_sagaDbFile = pathlib.Path('saga.db.bin')
+_sagaCodec = PickleCodec()
 
 async def WriteDB(Db: list):
-    class Encoder(json.JSONEncoder):
-        def default(self, obj):
-            if isinstance(obj, uuid.UUID):
-                return str(obj)
-            if isinstance(obj, pydantic.BaseModel):
-                return obj.model_dump(by_alias=True)
-            return super().default(obj)
-
-    async with aiofiles.open(_sagaDbFile, mode='w',encoding='utf-8') as f:
-        await f.write(json.dumps(Db, indent=4, cls=Encoder))
+    async with aiofiles.open(_sagaDbFile, mode='wb') as f:
+        await f.write(_sagaCodec.encode(Db))
 
 async def ReadDB() -> list:
-    class Decoder(json.JSONDecoder):
-        def __init__(self, *args, **kwargs):
-            super().__init__(object_hook=self.object_hook, *args, **kwargs)
-
-        def object_hook(self, obj):
-            if "sku" in obj:
-                return OrderItem(**obj)
-            return obj
-
     if _sagaDbFile.exists():
-        async with aiofiles.open(_sagaDbFile, mode='r',encoding='utf-8') as f:
-            _sagaSnapshot = json.loads(await f.read(), cls=Decoder)
+        async with aiofiles.open(_sagaDbFile, mode='rb') as f:
+            _sagaSnapshot = _sagaCodec.decode(await f.read())
             return _sagaSnapshot if type(_sagaSnapshot) == list else []
     return []
 
@@ -65,8 +49,7 @@ async def _shutdown(self):
     self.logger.debug(f"Manager is shutdown")
 
 @manager.monitor(timeout=20.0)
-async def _monitor(self):
-    tasks = asyncio.all_tasks(asyncio.get_running_loop())
-    self.logger.debug(f"@RUNNING: {[task.get_name() for task in tasks if task.get_name() != '@monitoring']}",extra={'kind':'manager'})
+async def _monitor(self, metrics: orsa.MetricsSnapshot):
+    self.logger.debug(f"@RUNNING: {metrics.gauges['orsa_sagas_in_flight'][()]} sagas, completed {sum(metrics.counters.get('orsa_sagas_total', {}).values())}",extra={'kind':'manager'})
 
 manager.Start()
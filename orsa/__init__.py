@@ -3,13 +3,19 @@ __version__ = "0.1.1"
 Python saga orchestrator (ORSA)
 """
 from logging import Logger
-from .core._types import Result, Retry
+from .core._types import Result, Retry, DeadlineExceeded, Released, BlobRef
 from .core._context import Context as Saga
 from .core._orchestrator import orchestrator
+from .core._batch import batch, Batch
 from .core._manager import Manager
-from .core._logger import getLogger
+from .core._admission import Overloaded
+from .core._retry import RetryPolicy, CircuitOpen
+from .core._cache import StepCache
+from .core._metrics import MetricsSnapshot
+from .core._tracing import Tracer, Span, InMemoryTracer, OpenTelemetryTracer, set_tracer, get_tracer, current_span
+from .core._logger import getLogger, configure as configure_logging, JsonFormatter
 
 def logger() -> Logger:
     return getLogger('orsa',True)
 
-__all__ = ['Saga', 'Result', 'Retry', 'Manager','orchestrator','logger']
\ No newline at end of file
+__all__ = ['Saga', 'Result', 'Retry', 'Released', 'BlobRef', 'Manager', 'Overloaded', 'DeadlineExceeded', 'RetryPolicy', 'CircuitOpen', 'StepCache', 'MetricsSnapshot', 'Tracer', 'Span', 'InMemoryTracer', 'OpenTelemetryTracer', 'set_tracer', 'get_tracer', 'current_span', 'orchestrator', 'batch', 'Batch', 'logger', 'configure_logging', 'JsonFormatter']
\ No newline at end of file
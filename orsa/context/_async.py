@@ -1,34 +1,198 @@
-from asyncio import Future, iscoroutinefunction
-from ..core._context import Context,_logger
+from asyncio import Future, FIRST_COMPLETED, iscoroutinefunction, create_task, wait, gather, get_running_loop, timeout_at
+from time import monotonic
+from contextlib import asynccontextmanager, nullcontext
+from time import time
+from ..core._context import Context,_logger,_liveness
+from logging import DEBUG
+from ..core._callee import Callee
+from ..core._template import _Template
+from ..core import _tracing
+from ..core._types import DeadlineExceeded, RollbackInfo, BlobRef, _Parked
+
+_NO_SCOPE = nullcontext()
 
 class AsyncContext(Context):
-    def __init__(self, entry, args, kwargs, manager=None, state=None):
-        super().__init__(entry, args, kwargs, manager, state)
+    __slots__ = ('_future',)
+
+    def __init__(self, entry, args, kwargs, manager=None, state=None, parallel: bool = False, deadline: float = None,
+                 parallel_rollback: bool = False):
+        super().__init__(entry, args, kwargs, manager, state, parallel, deadline, parallel_rollback)
+        self._future = None
+
+    def _deadline_scope(self):
+        """
+        Scope cancelled at the saga deadline, the cancelled step fails with `DeadlineExceeded`
+        """
+        if self._deadline is None:
+            return _NO_SCOPE
+        return self.__deadline_scope()
+
+    @asynccontextmanager
+    async def __deadline_scope(self):
+        loop = get_running_loop()
+        try:
+            async with timeout_at(loop.time() + self._deadline - time()) as scope:
+                yield
+        except TimeoutError:
+            if scope.expired():
+                raise DeadlineExceeded(f"Saga deadline exceeded") from None
+            raise
 
     async def __rollback(self, no: int, _context):
+        if self._parallel_rollback:
+            await self.__rollback_concurrent([stp._name for stp in self._steps[:no] if not isinstance(stp, Context._rollback)], _context)
+            return
+        owner_of = {id(rb): name for name, rollbacks in self.__owners()[0].items() for rb in rollbacks}
         while no > 0:
             no -= 1
             self._step_no = no
             if isinstance(self._steps[no], Context._rollback):
-                try:
-                    await self._steps[no](_context)
-                    _logger.debug(f"Rollback", extra={'saga' : self._steps[no]._name, 'kind' : f"{self._name}."})
-                except Exception as ex:
-                    _logger.error(f"Rollback error at step {no}", exc_info=ex, extra={'saga': self._steps[no]._name, 'kind' : f'{self._name}.'})
+                await self.__compensate(self._steps[no], _context, owner_of.get(id(self._steps[no])))
         self._step_no = None
 
+    def __owned_end(self, no: int) -> int:
+        """
+        Position after the rollbacks declared for the step `no`
+        """
+        no += 1
+        while no < len(self._steps) and isinstance(self._steps[no], Context._rollback):
+            no += 1
+        return no
+
+    def __owners(self) -> tuple[dict[str, list[Callee]], list[Callee]]:
+        """
+        Rollbacks grouped by the preceding step, rollbacks declared before any step are orphans
+        """
+        owned: dict[str, list[Callee]] = {}
+        orphans = []
+        owner = None
+        for stp in self._steps:
+            if not isinstance(stp, Context._rollback):
+                owner = stp._name
+            elif owner is None:
+                orphans.append(stp)
+            else:
+                owned.setdefault(owner, []).append(stp)
+        return owned, orphans
+
+    async def __compensate(self, stp: Callee, _context, step_name: str = None):
+        started = monotonic()
+        # Saga is aborting, rollback retries are never parked
+        self._compensating = True
+        try:
+            await stp(_context, owner=self)
+            self._rolled_back(RollbackInfo(stp._name, step_name, monotonic() - started, None))
+            if self._manager is not None and self._manager._metrics is not None:
+                self._manager._metrics.inc('orsa_rollbacks_total', (self._name, stp._name, 'ok'))
+            if _logger.isEnabledFor(DEBUG):
+                _logger.debug(f"Rollback", extra={'saga' : stp._name, 'kind' : f"{self._name}.", 'uid': self._uid})
+        except Exception as ex:
+            self._rolled_back(RollbackInfo(stp._name, step_name, monotonic() - started, ex))
+            if self._manager is not None and self._manager._metrics is not None:
+                self._manager._metrics.inc('orsa_rollbacks_total', (self._name, stp._name, 'failed'))
+            _logger.error(f"Rollback error", exc_info=ex, extra={'saga': stp._name, 'kind' : f'{self._name}.', 'uid': self._uid})
+
+    async def __rollback_completed(self, completed: list[str], _context):
+        """
+        Rollback steps in reverse order of their completion, used by parallel execution
+        """
+        if self._parallel_rollback:
+            await self.__rollback_concurrent(completed, _context)
+            return
+        owned, orphans = self.__owners()
+        for name in reversed(completed):
+            for stp in reversed(owned.get(name, [])):
+                await self.__compensate(stp, _context, name)
+        for stp in reversed(orphans):
+            await self.__compensate(stp, _context)
+
+    async def __rollback_concurrent(self, completed: list[str], _context):
+        """
+        Rollback completed steps concurrently. Rollbacks of the step are started when rollbacks of all
+        completed steps, which take result of the step (or whose rollbacks take it), are finished
+        """
+        owned, orphans = self.__owners()
+        owner_of = {id(rb): name for name, rollbacks in owned.items() for rb in rollbacks}
+        order = {name: no for no, name in enumerate(completed)}
+        dependents: dict[str, set[str]] = {name: set() for name in completed}
+        for stp in self._steps:
+            user = owner_of.get(id(stp)) if isinstance(stp, Context._rollback) else stp._name
+            if user not in order:
+                continue
+            for dep in stp._depends():
+                # Only later completed steps may depend on the step, it keeps the graph acyclic
+                if dep in order and order[dep] < order[user]:
+                    dependents[dep].add(user)
+
+        undone = {name: get_running_loop().create_future() for name in completed}
+        async def undo(name: str):
+            try:
+                await gather(*(undone[user] for user in dependents[name]))
+                for stp in reversed(owned.get(name, [])):
+                    await self.__compensate(stp, _context, name)
+            finally:
+                undone[name].set_result(True)
+
+        await gather(*(undo(name) for name in reversed(completed)))
+        for stp in reversed(orphans):
+            await self.__compensate(stp, _context)
+
+    async def __abort(self, step_name: str, ex: Exception):
+        if self._catch:
+            if iscoroutinefunction(self._catch):
+                await self._catch(step_name, ex)
+            else:
+                self._catch(step_name, ex)
+        if self._future:
+            self._future.set_exception(ex)
+
     async def __call__(self, future: Future = None):
+        """
+        Run the saga, returns the result of the last step
+        """
         self._future = future
-        await self._run(self._args, self._kwargs)
+        if _tracing._active is None:
+            return await self._run(self._args, self._kwargs)
+        span = _tracing._start(f"saga {self._name}", {'orsa.saga.uid': str(self._uid), 'orsa.saga.entry': self._name}, self._trace_parent)
+        token = _tracing._current.set(span)
+        try:
+            return await self._run(self._args, self._kwargs)
+        except _Parked:
+            span.set_attribute('orsa.parked', True)
+            raise
+        except BaseException as ex:
+            span.record_exception(ex)
+            raise
+        finally:
+            _tracing._current.reset(token)
+            span.end()
 
     async def _run(self, args, kwargs):
-        await self._entry(self, *args, **kwargs)
+        template = _Template.of(self._entry)
+        if template is not None:
+            template.instantiate(self, args, kwargs)
+        else:
+            try:
+                await self._entry(self, *args, **kwargs)
+            except Exception as ex:
+                # Saga fails on declaration of the steps, nothing is executed yet
+                await self.__abort(None, ex)
+                raise
+            template = _Template.compile(self)
+        self._liveness = template.liveness if template is not None else _liveness(self._steps)
         if self._readiness:
-            if iscoroutinefunction(self._readiness):
-                await self._readiness()
-            else:
-                self._readiness()
-        await self._execute(args, kwargs)
+            try:
+                async with self._deadline_scope():
+                    if iscoroutinefunction(self._readiness):
+                        await self._readiness()
+                    else:
+                        self._readiness()
+            except DeadlineExceeded as ex:
+                await self.__abort(None, ex)
+                raise
+        if self._parallel:
+            return await self._execute_graph(args, kwargs)
+        return await self._execute(args, kwargs)
 
     async def _execute(self, args, kwargs):
         _arguments = self._expand_arguments(args, kwargs, self._entry)
@@ -37,30 +201,132 @@ class AsyncContext(Context):
             self._step_no = no
             if not isinstance(self._steps[no], Context._rollback):
                 step_name = self._steps[no]._name
+                executed = False
                 try:
                     if step_name not in self._returns:
                         """
                         Step is not executed
                         """
-                        _logger.debug(f"Execute", extra={'saga' : step_name, 'kind' : f"{self._name}."})
-                        _return = await self._steps[no](_arguments)
-                        self._returns[step_name] = _return
+                        if _logger.isEnabledFor(DEBUG):
+                            _logger.debug(f"Execute", extra={'saga' : step_name, 'kind' : f"{self._name}.", 'uid': self._uid})
+                        async with self._deadline_scope():
+                            _return = await self._steps[no](_arguments, owner=self)
+                        executed = True
+                        await self._keep_result(step_name, _return)
+                        self._release(step_name)
                         if self._manager:
                             await self._manager._store_saga(self)
                     else:
-                        _logger.debug(f"Restored", extra={'saga' : step_name, 'kind' : f"{self._name}."})
+                        # Result of the restored last step is the result of the saga
+                        _return = self._returns[step_name]
+                        if _logger.isEnabledFor(DEBUG):
+                            _logger.debug(f"Restored", extra={'saga' : step_name, 'kind' : f"{self._name}.", 'uid': self._uid})
 
+                except _Parked:
+                    raise
                 except Exception as ex:
-                    await self.__rollback(self._step_no,_arguments)
-                    if self._catch:
-                        if iscoroutinefunction(self._catch):
-                            await self._catch(step_name, ex)
-                        else:
-                            self._catch(step_name, ex)
-                    if self._future:
-                        self._future.set_exception(ex)
+                    # Step is executed, but its result is not kept or stored: its own rollbacks are applied as well
+                    await self.__rollback(self.__owned_end(no) if executed else self._step_no,_arguments)
+                    await self.__abort(step_name, ex)
                     raise
         self._step_no = None
+        if type(_return) is BlobRef:
+            _return = self._load_blob(_return)
+        if self._future:
+            self._future.set_result(_return)
+        return _return
+
+    async def __finished(self, step_name: str, value, completed: list[str]):
+        """
+        Keep the result of the step finished in the graph and store the saga, the step is compensated once its result is kept
+        """
+        await self._keep_result(step_name, value)
+        completed.append(step_name)
+        self._release(step_name)
+        if self._manager:
+            await self._manager._store_saga(self)
+
+    async def _execute_graph(self, args, kwargs):
+        """
+        Execute steps as a dependency graph built from `Result[...]` annotations,
+        independent steps are running concurrently
+        """
+        _arguments = self._expand_arguments(args, kwargs, self._entry)
+        steps = [stp for stp in self._steps if not isinstance(stp, Context._rollback)]
+        names = {stp._name for stp in steps}
+        depends = {stp._name: {dep for dep in stp._depends() if dep in names and dep != stp._name} for stp in steps}
+
+        completed = [stp._name for stp in steps if stp._name in self._returns]
+        if _logger.isEnabledFor(DEBUG):
+            for name in completed:
+                _logger.debug(f"Restored", extra={'saga' : name, 'kind' : f"{self._name}.", 'uid': self._uid})
+        done = set(completed)
+        pending = [stp for stp in steps if stp._name not in done]
+        running = {}
+        failure = None
+        parked = False
+
+        while pending or running:
+            # Parked or failed step stops the launch of the next steps, the running ones are finished before the saga
+            # is parked or rolled back, so the side effects of every started step are compensated
+            for stp in [stp for stp in pending if depends[stp._name] <= done and not parked and not failure]:
+                pending.remove(stp)
+                if _logger.isEnabledFor(DEBUG):
+                    _logger.debug(f"Execute", extra={'saga' : stp._name, 'kind' : f"{self._name}.", 'uid': self._uid})
+                running[create_task(stp(_arguments, owner=self), name=f"{self._name}.{stp._name}")] = stp._name
+            if not running:
+                if parked or failure:
+                    break
+                failure = (pending[0]._name, RuntimeError(f"Unresolved dependencies {depends[pending[0]._name] - done}"))
+                break
+
+            try:
+                async with self._deadline_scope():
+                    finished, _ = await wait(running, return_when=FIRST_COMPLETED)
+            except BaseException as ex:
+                # Deadline or cancellation of the saga: running steps must not outlive it
+                for task in running:
+                    task.cancel()
+                await gather(*running, return_exceptions=True)
+                if not isinstance(ex, DeadlineExceeded):
+                    raise
+                # Step failed before the deadline stays the cause of the abort
+                failure = failure or (next(iter(running.values())), ex)
+                for task, step_name in running.items():
+                    if not task.cancelled() and task.exception() is None:
+                        try:
+                            await self.__finished(step_name, task.result(), completed)
+                        except Exception as exc:
+                            _logger.error(f"Exception: {exc}. Result is not kept on the deadline", exc_info=False,
+                                          extra={'saga' : step_name, 'kind' : f"{self._name}.", 'uid': self._uid})
+                break
+            for task in finished:
+                step_name = running.pop(task)
+                if isinstance(task.exception(), _Parked):
+                    parked = True
+                    continue
+                if task.exception() is not None:
+                    failure = failure or (step_name, task.exception())
+                    continue
+                try:
+                    await self.__finished(step_name, task.result(), completed)
+                except Exception as ex:
+                    # Store failure aborts the saga as the step failure does, the running steps are finished first
+                    failure = failure or (step_name, ex)
+                    continue
+                done.add(step_name)
+
+        if failure:
+            step_name, ex = failure
+            await self.__rollback_completed(completed, _arguments)
+            await self.__abort(step_name, ex)
+            raise ex
+        if parked:
+            raise _Parked(self._name)
+
+        _return = self._returns.get(steps[-1]._name) if steps else None
+        if type(_return) is BlobRef:
+            _return = self._load_blob(_return)
         if self._future:
             self._future.set_result(_return)
-        return _return
\ No newline at end of file
+        return _return
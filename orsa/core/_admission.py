@@ -0,0 +1,139 @@
+from collections import deque
+from typing import NamedTuple
+import asyncio, concurrent.futures, threading, time
+
+class Overloaded(Exception):
+    """
+    Saga is rejected or shed by the manager admission control
+    """
+
+AdmissionInfo = NamedTuple("AdmissionInfo", [('in_flight', int), ('pending', int), ('max_in_flight', int), ('max_pending', int),
+                                             ('admitted', int), ('rejected', int), ('shed', int), ('wait_avg', float), ('wait_max', float)])
+
+class _Admission():
+    """
+    Admission control of the manager sagas: at most `max_in_flight` sagas are executing, the next `max_pending`
+    sagas are waiting in the queue. When the queue is full new saga is blocked until there is room ('block'),
+    rejected with `Overloaded` ('reject') or the oldest pending saga is dropped in favour of the new one ('shed')
+    """
+    def __init__(self, launch, abort, max_in_flight: int = None, max_pending: int = None, overflow: str = 'block'):
+        if overflow not in ('block', 'reject', 'shed'):
+            raise ValueError(f"overflow must be 'block', 'reject' or 'shed', got {overflow!r}")
+        self._launch = launch
+        self._abort = abort
+        self._max_in_flight = max_in_flight
+        self._max_pending = max_pending if max_pending is not None else (0 if max_in_flight is None else 1024)
+        self._overflow = overflow
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._pending: deque[tuple] = deque()
+        self._blocked: deque[concurrent.futures.Future] = deque()
+        self._admitted = 0
+        self._rejected = 0
+        self._shed = 0
+        self._waited = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    @property
+    def info(self) -> AdmissionInfo:
+        with self._lock:
+            return AdmissionInfo(self._in_flight, len(self._pending), self._max_in_flight, self._max_pending,
+                                 self._admitted, self._rejected, self._shed,
+                                 self._wait_total / self._waited if self._waited else 0.0, self._wait_max)
+
+    async def admit(self, saga, block: bool = False) -> concurrent.futures.Future:
+        """
+        Launch saga or put it to the pending queue, returns future of the saga execution
+        """
+        while True:
+            victim = None
+            with self._lock:
+                if self._max_in_flight is None or self._in_flight < self._max_in_flight:
+                    self._in_flight += 1
+                    self._admitted += 1
+                    action = 'launch'
+                elif len(self._pending) < self._max_pending:
+                    ticket = concurrent.futures.Future()
+                    self._pending.append((saga, ticket, time.monotonic()))
+                    return ticket
+                elif self._overflow == 'block' or block:
+                    waiter = concurrent.futures.Future()
+                    self._blocked.append(waiter)
+                    action = 'block'
+                elif self._overflow == 'reject':
+                    self._rejected += 1
+                    raise Overloaded(f"Saga {saga._name} is rejected, {self._in_flight} in flight and {len(self._pending)} pending")
+                else:
+                    victim = self._pending.popleft() if self._pending else None
+                    self._shed += 1
+                    ticket = concurrent.futures.Future()
+                    self._pending.append((saga, ticket, time.monotonic()))
+                    action = 'shed'
+
+            if action == 'launch':
+                return self._run(saga)
+            elif action == 'shed':
+                if victim is not None:
+                    ex = Overloaded(f"Saga {victim[0]._name} is shed by newer saga")
+                    victim[1].set_exception(ex)
+                    self._abort(victim[0], ex)
+                return ticket
+            try:
+                await asyncio.wrap_future(waiter)
+            except BaseException:
+                if not waiter.cancel():
+                    # Wakeup is already delivered to the cancelled admission, pass it on
+                    self._wake()
+                with self._lock:
+                    if waiter in self._blocked:
+                        self._blocked.remove(waiter)
+                raise
+
+    def _run(self, saga) -> concurrent.futures.Future:
+        # Slot is released when the run is finished, parked saga does not occupy it
+        return self._launch(saga, self._release)
+
+    def _release(self):
+        """
+        Saga is finished, launch the next pending one
+        """
+        with self._lock:
+            if self._pending:
+                saga, ticket, queued = self._pending.popleft()
+                wait = time.monotonic() - queued
+                self._waited += 1
+                self._wait_total += wait
+                self._wait_max = max(self._wait_max, wait)
+                self._admitted += 1
+            else:
+                saga = None
+                self._in_flight -= 1
+        self._wake()
+        if saga is not None:
+            self._run(saga).add_done_callback(lambda future: _copy_future(future, ticket))
+
+    def _wake(self):
+        """
+        Wake the first blocked admission, cancelled admissions pass the wakeup on
+        """
+        while True:
+            with self._lock:
+                if not self._blocked:
+                    return
+                waiter = self._blocked.popleft()
+            try:
+                waiter.set_result(True)
+                return
+            except concurrent.futures.InvalidStateError:
+                continue
+
+def _copy_future(source: concurrent.futures.Future, target: concurrent.futures.Future):
+    if target.done():
+        return
+    if source.cancelled():
+        target.cancel()
+    elif source.exception() is not None:
+        target.set_exception(source.exception())
+    else:
+        target.set_result(source.result())
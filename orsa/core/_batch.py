@@ -0,0 +1,131 @@
+from asyncio import AbstractEventLoop, Future, TimerHandle, get_running_loop, iscoroutinefunction
+from typing import Any, NamedTuple
+from weakref import WeakKeyDictionary
+import functools, threading
+
+from ._logger import getLogger
+
+_logger = getLogger("orsa", True)
+
+BatchInfo = NamedTuple("BatchInfo", [('batches', int), ('items', int), ('pending', int)])
+
+class _Pending():
+    """
+    Items collected on the event loop for the next bulk call
+    """
+    __slots__ = ('items', 'futures', 'timer')
+
+    def __init__(self):
+        self.items: list = []
+        self.futures: list[Future] = []
+        self.timer: TimerHandle = None
+
+class Batch():
+    """
+    Bulk function called with the list of items collected from the concurrent sagas, see `batch()`
+    """
+    def __init__(self, fn, max_size: int = 100, max_wait: float = 0.01):
+        if max_size < 1:
+            raise ValueError(f"max_size must be positive, got {max_size}")
+        if max_wait < 0:
+            raise ValueError(f"max_wait must not be negative, got {max_wait}")
+        functools.update_wrapper(self, fn)
+        self._fn = fn
+        self._coroutine = iscoroutinefunction(fn)
+        self._max_size = max_size
+        self._max_wait = max_wait
+        self._lock = threading.Lock()
+        self._pending: WeakKeyDictionary[AbstractEventLoop, _Pending] = WeakKeyDictionary()
+        self._running = set()
+        self._batches = 0
+        self._items = 0
+
+    def __call__(self, item) -> Future:
+        """
+        Add item to the batch of the running event loop, returned future is resolved with the result of the item
+        """
+        loop = get_running_loop()
+        pending = self._pending.get(loop)
+        if pending is None:
+            with self._lock:
+                pending = self._pending.setdefault(loop, _Pending())
+        future = loop.create_future()
+        pending.items.append(item)
+        pending.futures.append(future)
+        if len(pending.items) >= self._max_size:
+            self.__flush(loop, pending)
+        elif pending.timer is None:
+            pending.timer = loop.call_later(self._max_wait, self.__flush, loop, pending)
+        return future
+
+    def __flush(self, loop: AbstractEventLoop, pending: _Pending):
+        if pending.timer is not None:
+            pending.timer.cancel()
+            pending.timer = None
+        # Items of the cancelled callers are not sent
+        batch = [(item, future) for item, future in zip(pending.items, pending.futures) if not future.done()]
+        pending.items, pending.futures = [], []
+        if batch:
+            task = loop.create_task(self.__execute([item for item, _ in batch], [future for _, future in batch]),
+                                    name=f"@batch:{self.__name__}")
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def __execute(self, items: list, futures: list[Future]):
+        with self._lock:
+            self._batches += 1
+            self._items += len(items)
+        try:
+            results = await self._fn(items) if self._coroutine else self._fn(items)
+            if not isinstance(results, (list, tuple)) or len(results) != len(items):
+                raise ValueError(f"Batch `{self.__name__}` must return a list of {len(items)} results, got {type(results).__name__}"
+                                 f"{f' of {len(results)}' if isinstance(results, (list, tuple)) else ''}")
+        except Exception as ex:
+            _logger.debug(f"Batch of {len(items)} items failed: {ex}", extra={'saga': self.__name__, 'kind': 'batch '})
+            for future in futures:
+                if not future.done():
+                    future.set_exception(ex)
+        else:
+            for future, result in zip(futures, results):
+                if future.done():
+                    continue
+                # Exception in place of the result fails only the saga of the item
+                if isinstance(result, BaseException):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+        finally:
+            # Bulk call cancelled on shutdown does not leave the callers waiting
+            for future in futures:
+                if not future.done():
+                    future.cancel()
+
+    @property
+    def info(self) -> BatchInfo:
+        with self._lock:
+            return BatchInfo(self._batches, self._items, sum(len(pending.items) for pending in list(self._pending.values())))
+
+def batch(fn = None, max_size: int = 100, max_wait: float = 0.01):
+    """
+    Decorator for declare bulk function, the function takes the list of items and returns the list of their results,
+    result can be an exception of the item. Calls of the concurrent sagas on the same event loop are collected to one
+    bulk call up to `max_size` items or `max_wait` seconds after the first item. Every saga awaits the result of its item,
+    so retries and rollbacks of the step calling the bulk function stay per saga
+
+    Examples:
+        @batch(max_size=200, max_wait=0.005)
+        async def reserve_skus(items: list[tuple[str,int]]) -> list[int]:
+            ...
+
+        @orchestrator
+        async def order(saga: Saga, sku: str, qty: int):
+            @saga.step(retry=3)
+            async def reserve() -> int:
+                return await reserve_skus((sku, qty))
+    """
+    def decorator(func) -> Batch:
+        return Batch(func, max_size, max_wait)
+
+    if fn is None:
+        return decorator
+    return decorator(fn)
@@ -0,0 +1,104 @@
+from collections import OrderedDict
+from typing import Any, NamedTuple
+import threading, time
+
+CacheInfo = NamedTuple("CacheInfo", [('size', int), ('max_size', int), ('hits', int), ('misses', int),
+                                     ('evictions', int), ('expired', int), ('invalidated', int)])
+
+_MISSING = object()
+
+class StepCache():
+    """
+    Cache of the step results shared by all sagas of the manager, sagas without manager share the process-wide one.
+    Result is keyed by the step (`saga.step`), the values bound to the step parameters and the values the step reads
+    from the saga closure (entry arguments), steps with unhashable parameters or closure values are not cached. Cached value is shared by the sagas, steps must not modify it.
+    Least recently used results are evicted when `max_size` is reached
+
+    Examples:
+        manager = Manager(cache_size=4096)
+
+        @saga.step(cache=300.0)  # Result is reused for 5 minutes
+        async def get_exchange_rates() -> dict[str,tuple[float,float]]:
+            ...
+
+        manager.cache.invalidate('currency_exchange.get_exchange_rates')
+    """
+    _default: 'StepCache' = None
+    _default_lock = threading.Lock()
+
+    def __init__(self, max_size: int = 1024):
+        if max_size < 1:
+            raise ValueError(f"max_size must be positive, got {max_size}")
+        self._max_size = max_size
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[tuple, tuple[float, Any]] = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expired = 0
+        self._invalidated = 0
+
+    @classmethod
+    def default(cls) -> 'StepCache':
+        """
+        Process-wide cache of the sagas without manager
+        """
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls()
+            return cls._default
+
+    @staticmethod
+    def key(step: str, args: tuple, kwargs: dict, closure: tuple = ()) -> tuple | None:
+        """
+        Key of the step call, None when a parameter or closure value is unhashable
+        """
+        key = (step, args, tuple(kwargs.items()), closure)
+        try:
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
+    def get(self, key: tuple) -> Any:
+        """
+        Cached result or `_MISSING`
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    return entry[1]
+                del self._entries[key]
+                self._expired += 1
+            self._misses += 1
+            return _MISSING
+
+    def put(self, key: tuple, value: Any, ttl: float):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def invalidate(self, step: str = None) -> int:
+        """
+        Drop cached results of the step (`saga.step`) or all results, returns number of dropped results
+        """
+        with self._lock:
+            if step is None:
+                keys = list(self._entries)
+            else:
+                keys = [key for key in self._entries if key[0] == step]
+            for key in keys:
+                del self._entries[key]
+            self._invalidated += len(keys)
+            return len(keys)
+
+    @property
+    def info(self) -> CacheInfo:
+        with self._lock:
+            return CacheInfo(len(self._entries), self._max_size, self._hits, self._misses, self._evictions, self._expired, self._invalidated)
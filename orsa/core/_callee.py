@@ -1,80 +1,374 @@
 from typing import Annotated, get_type_hints, get_args, get_origin
-from inspect import signature, iscoroutinefunction
-from asyncio import sleep as async_sleep
-from time import sleep as sync_sleep
+from inspect import signature, iscoroutinefunction, isfunction, Parameter
+from weakref import WeakKeyDictionary
+from asyncio import sleep as async_sleep, get_running_loop, timeout as async_timeout
+from concurrent.futures import Executor, ProcessPoolExecutor
+from functools import partial
+import threading
 from uuid import UUID
-from ._types import Retry, Result
+from time import time, perf_counter
+from ._types import Retry, Result, BlobRef, _Parked
+from ._cache import StepCache, _MISSING
+from ._flight import _Flights
 from ._logger import getLogger
+from . import _tracing
 
 _logger = getLogger("orsa",True)
 
+EXECUTORS = ('thread', 'process')
+
+_pools: dict[str, Executor] = {}
+_pools_lock = threading.Lock()
+
+def _default_pool(kind: str) -> Executor:
+    """
+    Process-wide pools for steps of sagas without manager, 'thread' uses default executor of the event loop
+    """
+    if kind == 'thread':
+        return None
+    with _pools_lock:
+        if kind not in _pools:
+            _pools[kind] = ProcessPoolExecutor()
+        return _pools[kind]
+
+def _local(fn) -> bool:
+    """
+    Function is declared in another function and can not be pickled
+    """
+    return '<locals>' in getattr(fn, '__qualname__', '')
+
+class _Binding:
+    """
+    Precompiled binding plan of the step function, maps parameters to context keys and `Result` step names and types.
+    Plans are cached by code object, so every saga instance declaring the same closure shares one plan
+    """
+    __slots__ = ('signature', 'context', 'required', 'results', 'positional')
+
+    _plans: WeakKeyDictionary = WeakKeyDictionary()
+
+    def __init__(self, fn):
+        self.signature = signature(fn)
+        hints = get_type_hints(fn, include_extras=True)
+        context, required, results, positional = [], [], [], False
+        for name, param in self.signature.parameters.items():
+            if param.kind in (Parameter.VAR_POSITIONAL, Parameter.VAR_KEYWORD):
+                continue
+            positional = positional or param.kind is Parameter.POSITIONAL_ONLY
+            tp = hints.get(name)
+            if get_origin(tp) is Result or get_origin(tp) is Annotated:
+                _type, _step = get_args(tp)
+                results.append((name, _step.__name__, _type))
+            else:
+                context.append(name)
+                if param.default is Parameter.empty:
+                    required.append(name)
+        self.context = tuple(context)
+        self.required = tuple(required)
+        self.results = tuple(results)
+        self.positional = positional
+
+    @classmethod
+    def of(cls, fn) -> '_Binding':
+        code = getattr(fn, '__code__', None)
+        if code is None:
+            return cls(fn)
+        plan = cls._plans.get(code)
+        if plan is None:
+            plan = cls._plans[code] = cls(fn)
+        return plan
+
+def _captured(fn, seen: tuple) -> tuple:
+    code = getattr(fn, '__code__', None)
+    if code is None or code in seen or not fn.__closure__:
+        return ()
+    seen = (*seen, code)
+    values = []
+    for name, cell in zip(code.co_freevars, fn.__closure__):
+        try:
+            value = cell.cell_contents
+        except ValueError:
+            # Variable is not assigned yet
+            continue
+        if isinstance(value, Callee):
+            value = (value._key, _captured(value._fn, seen))
+        elif isfunction(value):
+            value = (value.__qualname__, _captured(value, seen))
+        values.append((name, value))
+    return tuple(values)
+
+_NO_RETRY = Retry(0, 0.0, 0.0)
+
 class Callee:
     """
-    Proxy class of the called function
+    Proxy class of the called function. Every saga run holds own copy of its steps, so the instance keeps
+    only references: retry config and binding plan are shared by the copies of the same step
     """
-    def __init__(self, fn, saga, returns: dict, retry: Retry | int = None, name: str = None):
+    __slots__ = ('_fn', '_saga', '_name', '_returns', '_binding', '_coroutine', '_retry_config', '_executor', '_timeout', '_keep', '_cache', '_coalesce')
+
+    _kind = 'step'
+
+    def __init__(self, fn, saga, returns: dict, retry: Retry | int = None, name: str = None, executor: str | Executor = None, timeout: float = None,
+                 keep: bool = False, cache: float | bool = None, coalesce: bool = False):
         self._fn = fn
         self._saga = saga;
         self._name = self._fn.__name__ if not name else name
         self._returns = returns
+        self._binding = None
+        self._coroutine = iscoroutinefunction(fn)
         """
         Expand Retry parameter
         """
         if retry is None:
-            self._retry_config = Retry(0, 0.0, 0.0)
+            self._retry_config = _NO_RETRY
         elif isinstance(retry, int):
             self._retry_config = Retry(retry, 3.0, 1.0)
         elif isinstance(retry, Retry):
             self._retry_config = retry
         else:
-            raise TypeError(f"retry must be None, int or Retry, got {type(retry_config)}")
+            raise TypeError(f"retry must be None, int or Retry, got {type(retry)}")
+        """
+        Executor for sync function: 'thread', 'process' or Executor instance
+        """
+        if executor is not None and not isinstance(executor, Executor) and executor not in EXECUTORS:
+            raise ValueError(f"executor must be one of {EXECUTORS} or Executor, got {executor!r}")
+        if (executor == 'process' or isinstance(executor, ProcessPoolExecutor)) and not iscoroutinefunction(fn) and _local(fn):
+            raise TypeError(f"Step `{self._name}` is a local function and can not be pickled to process pool, declare it at module level")
+        self._executor = executor
+        self._timeout = timeout
+        self._keep = keep
+        """
+        Time to live of the cached result: True - until eviction, None or False - result is not cached
+        """
+        if cache is None or cache is False:
+            self._cache = None
+        elif cache is True:
+            self._cache = float('inf')
+        elif isinstance(cache, (int, float)) and cache > 0:
+            self._cache = float(cache)
+        else:
+            raise ValueError(f"cache must be None, bool or positive time to live, got {cache!r}")
+        self._coalesce = coalesce
 
-    def _bind_context(self,context, args):
+    def _rebind(self, fn, returns: dict) -> 'Callee':
         """
-        Bind call params context with signature of the function
+        Copy of the step bound to the function with the same code and to the results of another saga run
         """
-        kwargs = {**context}
-        for vn, tp in get_type_hints(self._fn, include_extras=True).items():
-            if get_origin(tp) is Result or get_origin(tp) is Annotated:
-                _type, _step = get_args(tp)
-                kwargs[vn] = self._returns.get(_step.__name__,None)
-        sig = signature(self._fn)
-        params = sig.bind(*args, **{k: kwargs[k] for k, v in sig.parameters.items() if k in kwargs})
-        params.apply_defaults()
-        return params
+        callee = object.__new__(type(self))
+        callee._fn = fn
+        callee._returns = returns
+        callee._saga = self._saga
+        callee._name = self._name
+        callee._binding = self._binding if self._binding is not None else _Binding.of(fn)
+        callee._coroutine = self._coroutine
+        callee._retry_config = self._retry_config
+        callee._executor = self._executor
+        callee._timeout = self._timeout
+        callee._keep = self._keep
+        callee._cache = self._cache
+        callee._coalesce = self._coalesce
+        return callee
+
+    def _bind_context(self,context, args, owner = None) -> tuple[tuple, dict]:
+        """
+        Bind call params context with signature of the function, results written out-of-line are read from the blobs
+        """
+        if self._binding is None:
+            self._binding = _Binding.of(self._fn)
+        plan = self._binding
+        kwargs = {name: context[name] for name in plan.context if name in context}
+        for name, step, hint in plan.results:
+            value = self._returns.get(step,None)
+            kwargs[name] = owner._load_blob(value, hint) if type(value) is BlobRef else value
+        # Binding error fails the step once, before the first attempt
+        if args or plan.positional or any(name not in kwargs for name in plan.required):
+            params = plan.signature.bind(*args, **kwargs)
+            return params.args, params.kwargs
+        return (), kwargs
+
+    def _closure(self) -> tuple:
+        """
+        Values of the free variables of the step function, the same step of two sagas differs by the entry arguments
+        it reads from the closure. Steps and nested functions of the saga are keyed by the name and the own closure
+        """
+        return _captured(self._fn, ())
 
-    def _repeat(self, attempt, ex):
+    def _depends(self) -> tuple[str]:
+        """
+        Names of the steps whose results are requested through `Result[...]` annotations
+        """
+        if self._binding is None:
+            self._binding = _Binding.of(self._fn)
+        return tuple(step for name, step, hint in self._binding.results)
+
+    def _repeat(self, attempt, ex, policy = None, previous: float = None, uid: UUID = None):
         """
         Calculate the next delay if attempts do not exceed the limit; otherwise, re-raise the exception
         """
+        if policy is not None:
+            policy.failure(self._key)
         if attempt < self._retry_config.count:
-            current_delay = self._retry_config.timeout * (self._retry_config.scale ** attempt)
-            _logger.warning(f"Exception: {ex}. Repeating {attempt}/{self._retry_config.count} after {current_delay:.1f} sec", exc_info=False, extra={'saga' : self._name,'kind' : f'{self._saga}.'})
+            if policy is None:
+                current_delay = self._retry_config.timeout * (self._retry_config.scale ** attempt)
+            else:
+                current_delay = policy.delay(self._key, attempt, self._retry_config, previous)
+                if current_delay is None:
+                    _logger.error(f"Exception: {ex}. Retry budget is exhausted at {attempt}/{self._retry_config.count} attempts.", exc_info=False, extra={'saga' : self._name,'kind' : f'{self._saga}.', 'uid': uid})
+                    raise ex
+            _logger.warning(f"Exception: {ex}. Repeating {attempt}/{self._retry_config.count} after {current_delay:.1f} sec", exc_info=False, extra={'saga' : self._name,'kind' : f'{self._saga}.', 'uid': uid})
         else:
-            _logger.error(f"Exception: {ex}. Failed after {attempt}/{self._retry_config.count} attempts.", exc_info=False, extra={'saga' : self._name,'kind' : f'{self._saga}.'})
+            _logger.error(f"Exception: {ex}. Failed after {attempt}/{self._retry_config.count} attempts.", exc_info=False, extra={'saga' : self._name,'kind' : f'{self._saga}.', 'uid': uid})
             raise ex
 
         return current_delay
 
-    def __call__(self, context, args=[]):
-        sig = self._bind_context(context, args)
-        attempt = 0
-        while True:
-            try:
-                attempt += 1
-                return self._fn(*sig.args, **sig.kwargs)
-            except Exception as ex:
-                sync_sleep(self._repeat(attempt, ex))
+    @property
+    def _key(self) -> str:
+        """
+        Key of the step in the manager retry policy
+        """
+        return f"{self._saga}.{self._name}"
 
-    async def __call__(self, context, args=[]):
-        sig = self._bind_context(context,args)
+    def _resolve_executor(self, owner) -> tuple[bool, Executor]:
+        """
+        Resolve executor of the sync function, step option overrides default executor of the manager
+        """
+        manager = getattr(owner, '_manager', None)
+        executor = self._executor if self._executor is not None or manager is None else manager._executor
+        if executor is None or self._coroutine:
+            return False, None
+        if self._executor is None and (executor == 'process' or isinstance(executor, ProcessPoolExecutor)) and _local(self._fn):
+            # Closure declared in the entry can not be pickled, the default process executor runs it on the thread pool
+            executor = 'thread'
+        if isinstance(executor, str):
+            pool = manager._pool(executor) if manager is not None else _default_pool(executor)
+        else:
+            pool = executor
+        return True, pool
+
+    async def __call__(self, context, args=[], owner=None):
+        _args, _kwargs = self._bind_context(context,args,owner)
+        # Step resumed from the park continues own retries
+        if not self._coalesce or (owner is not None and owner._retrying and self._name in owner._retrying):
+            return await self._call(_args, _kwargs, owner)
+        key = StepCache.key(self._key, _args, _kwargs, self._closure())
+        if key is None:
+            return await self._call(_args, _kwargs, owner)
+        manager = getattr(owner, '_manager', None)
+        flights = manager._flights if manager is not None else _Flights.default()
+        merged = None
+        if manager is not None and manager._metrics is not None:
+            merged = partial(manager._metrics.inc, 'orsa_step_coalesced_total', (self._saga, self._name))
+        return await flights.call(key, partial(self._call, _args, _kwargs, owner), merged)
+
+    async def _call(self, _args: tuple, _kwargs: dict, owner):
+        offload, pool = self._resolve_executor(owner)
+        manager = getattr(owner, '_manager', None)
+        policy = manager._retry_policy if manager is not None else None
+        metrics = manager._metrics if manager is not None else None
+        cache = cache_key = None
+        if self._cache is not None:
+            cache = manager._cache if manager is not None else StepCache.default()
+            cache_key = cache.key(self._key, _args, _kwargs, self._closure())
+        span = None
+        if _tracing._active is not None:
+            span = _tracing._start(f"{self._kind} {self._name}", {'orsa.saga.uid': str(getattr(owner, 'uid', '')),
+                                                                 'orsa.saga.entry': self._saga, 'orsa.step': self._name})
+        started = perf_counter()
         attempt = 0
-        while True:
-            try:
+        delay = None
+        retrying = owner._retrying.get(self._name) if owner is not None and owner._retrying else None
+        if retrying is not None:
+            # Saga is resumed from the park, continue with the recorded attempt
+            at, attempt, delay = retrying
+            await self._backoff(owner, at - time(), attempt, delay)
+        try:
+            if cache_key is not None:
+                result = cache.get(cache_key)
+                if metrics is not None:
+                    metrics.inc('orsa_step_cache_total', (self._saga, self._name, 'miss' if result is _MISSING else 'hit'))
+                if result is not _MISSING:
+                    if span is not None:
+                        span.set_attribute('orsa.cache.hit', True)
+                    return result
+            while True:
                 attempt += 1
-                if iscoroutinefunction(self._fn):
-                    return await self._fn(*sig.args, **sig.kwargs)
+                if policy is not None:
+                    await policy.acquire(self._key)
+                if metrics is not None:
+                    metrics.inc('orsa_step_attempts_total', (self._saga, self._name))
+                try:
+                    if span is None:
+                        result = await self._attempt(attempt, offload, pool, _args, _kwargs)
+                    else:
+                        result = await self._traced_attempt(span, attempt, offload, pool, _args, _kwargs)
+                except Exception as ex:
+                    if metrics is not None:
+                        metrics.inc('orsa_step_failures_total', (self._saga, self._name))
+                    delay = self._repeat(attempt, ex, policy, delay, getattr(owner, 'uid', None))
+                    if metrics is not None:
+                        metrics.inc('orsa_step_retries_total', (self._saga, self._name))
+                    await self._backoff(owner, delay, attempt, delay)
+                    continue
+                if policy is not None:
+                    policy.success(self._key)
+                if cache_key is not None:
+                    cache.put(cache_key, result, self._cache)
+                return result
+        except BaseException as ex:
+            if span is not None:
+                if isinstance(ex, _Parked):
+                    span.set_attribute('orsa.parked', True)
                 else:
-                    return self._fn(*sig.args, **sig.kwargs)
-            except Exception as ex:
-                await async_sleep(self._repeat(attempt, ex))
+                    span.record_exception(ex)
+            raise
+        finally:
+            # Recorded retry is consumed unless the step is parked again with the new one
+            if retrying is not None and owner._retrying.get(self._name) is retrying:
+                owner._retrying.pop(self._name, None)
+            if metrics is not None:
+                metrics.observe('orsa_step_duration_seconds', (self._saga, self._name), perf_counter() - started)
+            if span is not None:
+                span.set_attribute('orsa.attempts', attempt)
+                span.end()
+
+    async def _backoff(self, owner, wait: float, attempt: int, delay: float):
+        """
+        Wait before the next attempt, long wait parks the saga in the manager instead
+        """
+        if wait <= 0:
+            return
+        if owner is not None and owner._park_retry(self._name, attempt, delay, wait):
+            raise _Parked(self._name)
+        await async_sleep(wait)
+
+    async def _traced_attempt(self, parent: _tracing.Span, attempt: int, offload: bool, pool: Executor, args, kwargs):
+        span = _tracing._start('attempt', {'orsa.attempt': attempt}, parent)
+        token = _tracing._current.set(span)
+        try:
+            return await self._attempt(attempt, offload, pool, args, kwargs)
+        except BaseException as ex:
+            span.record_exception(ex)
+            raise
+        finally:
+            _tracing._current.reset(token)
+            span.end()
+
+    async def _attempt(self, attempt: int, offload: bool, pool: Executor, args, kwargs):
+        if self._timeout is None:
+            return await self._invoke(offload, pool, args, kwargs)
+        try:
+            async with async_timeout(self._timeout) as scope:
+                return await self._invoke(offload, pool, args, kwargs)
+        except TimeoutError:
+            if scope.expired():
+                raise TimeoutError(f"Attempt {attempt} timed out after {self._timeout:g} sec") from None
+            raise
+
+    async def _invoke(self, offload: bool, pool: Executor, args, kwargs):
+        if self._coroutine:
+            return await self._fn(*args, **kwargs)
+        elif offload:
+            # Thread can not be interrupted on timeout, the result of abandoned call is dropped
+            return await get_running_loop().run_in_executor(pool, partial(self._fn, *args, **kwargs))
+        else:
+            return self._fn(*args, **kwargs)
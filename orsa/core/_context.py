@@ -1,36 +1,101 @@
 from typing import Any
 from uuid import UUID, uuid4
 from ._callee import Callee
-from ._types import Retry
+from ._types import Retry, RollbackInfo, RELEASED, BlobRef
+from concurrent.futures import Executor
 from datetime import datetime
+from time import time
 from inspect import getsource, getsourcefile, signature
+from weakref import WeakKeyDictionary
 
 from ._logger import getLogger
+from logging import DEBUG
+from . import _tracing
 
 _logger = getLogger("orsa", True)
 
+_entries: WeakKeyDictionary = WeakKeyDictionary()
+
+def _entry_details(entry) -> tuple[dict[str,str], tuple[str]]:
+    """
+    Source details and parameter names of the entry, resolved once per entry function
+    """
+    details = _entries.get(entry)
+    if details is None:
+        details = _entries[entry] = ({'@src': getsourcefile(entry),'@entry': entry.__name__,'@module': entry.__module__},
+                                     tuple(signature(entry).parameters))
+    return details
+
+def _liveness(steps: list[Callee]) -> dict[str, tuple[tuple[str, tuple[str]]]]:
+    """
+    Results which may be released when the step is completed, every one with the steps reading it.
+    Results of the last step, of the steps with `keep` and results read by rollbacks live until the saga is finished
+    """
+    readers: dict[str, list[str]] = {}
+    pinned = set()
+    last = None
+    for stp in steps:
+        if isinstance(stp, Context._rollback):
+            pinned.update(stp._depends())
+            continue
+        last = stp._name
+        if stp._keep:
+            pinned.add(stp._name)
+        for dep in stp._depends():
+            if dep != stp._name:
+                readers.setdefault(dep, []).append(stp._name)
+    pinned.add(last)
+    liveness = {}
+    for stp in steps:
+        if isinstance(stp, Context._rollback):
+            continue
+        candidates = [dep for dep in dict.fromkeys(stp._depends()) if dep not in pinned and dep != stp._name]
+        if stp._name not in pinned and stp._name not in readers:
+            candidates.append(stp._name)
+        if candidates:
+            liveness[stp._name] = tuple((name, tuple(readers.get(name, ()))) for name in candidates)
+    return liveness
+
 class Context:
     """
     Base class implement Saga execution context, can be specialized in overloaded Child class|
+    Context is slotted and allocates rarely used members on demand, as millions of sagas can be in flight
     """
+    __slots__ = ('_entry', '_parallel', '_parallel_rollback', '_rollbacks', '_compensating', '_trace_parent', '_steps', '_name',
+                 '_step_no', '_readiness', '_catch', '_manager', '_args', '_kwargs', '_uid', '_returns', '_created', '_deadline', '_retrying',
+                 '_state', '_liveness')
+
     class _step(Callee):
         """
         Class implement every step execution context
         """
-        def __init__(self, fn, saga, returns, args, kwargs, retry: Retry | int = None):
-            super().__init__(fn, saga, returns, retry)
+        __slots__ = ()
+
+        def __init__(self, fn, saga, returns, args, kwargs, retry: Retry | int = None, **options):
+            super().__init__(fn, saga, returns, retry, **options)
             #self._step_context = (args, kwargs)
 
     class _rollback(Callee):
         """
         Class implement rollback operation for step
         """
-        def __init__(self, fn, saga, returns, args, kwargs, retry: Retry | int = None):
-            super().__init__(fn, saga, returns, retry)
+        __slots__ = ()
+
+        _kind = 'rollback'
+
+        def __init__(self, fn, saga, returns, args, kwargs, retry: Retry | int = None, **options):
+            super().__init__(fn, saga, returns, retry, **options)
             #self._step_context = (args, kwargs)
 
-    def __init__(self, entry, args, kwargs, manager = None, state = None):
+    def __init__(self, entry, args, kwargs, manager = None, state = None, parallel: bool = False, deadline: float = None,
+                 parallel_rollback: bool = False):
         self._entry = entry
+        self._parallel = parallel
+        self._parallel_rollback = parallel_rollback
+        self._rollbacks: list[RollbackInfo] = None
+        self._compensating = False
+        # Span of the caller is the parent of the saga span, also when the saga runs on the manager shard
+        self._trace_parent = _tracing._current.get() if _tracing._active is not None else None
         self._steps:list[Callee] = []
         self._name = self._entry.__name__
         self._step_no = None
@@ -42,20 +107,25 @@ class Context:
             self._kwargs = state.get('@kwargs',{})
             self._uid = state.get('@uid',uuid4()) 
             self._returns = state.get('@returns',{}) 
+            self._created = state.get('@created',time())
+            self._deadline = state.get('@deadline',None)
+            self._retrying = state.get('@retry') or None
         else:
             self._args = args
             self._kwargs = kwargs
             self._uid = uuid4()
             self._returns = {}
-
-        self._state = {'@uid': self._uid,'@args': self._args, '@kwargs': self._kwargs, **self._get_entry_details(), '@returns': self._returns }
+            self._created = time()
+            self._deadline = self._created + deadline if deadline is not None else None
+            self._retrying = None
+        self._state = None
+        self._liveness = None
 
     def _expand_arguments(self, args, kwargs, fn):
         _expand_arguments = {**kwargs}
-        for narg in range(len(args)):
-            params = list(signature(fn).parameters.keys())
-            for arg in args:
-                _expand_arguments[params[narg]] = arg
+        # First parameter of the entry is the saga context
+        for name, arg in zip(_entry_details(fn)[1][1:], args):
+            _expand_arguments[name] = arg
         return _expand_arguments
 
     @staticmethod
@@ -73,64 +143,134 @@ class Context:
     @property
     def state(self) -> dict[str,Any]:
         """
-        Get Saga execution state
+        Get Saga execution state, the state is built on the first request of the store and shares results with the saga
         """
+        if self._state is None:
+            if self._retrying is None:
+                self._retrying = {}
+            self._state = {'@uid': self._uid,'@args': self._args, '@kwargs': self._kwargs, **_entry_details(self._entry)[0], '@created': self._created,
+                           '@deadline': self._deadline, '@retry': self._retrying, '@returns': self._returns }
         return self._state
 
+    def _park_retry(self, step_name: str, attempt: int, delay: float, wait: float) -> bool:
+        """
+        Record retry time of the step when the manager parks the saga for such wait
+        """
+        if self._manager is None or self._manager._park_after is None or wait < self._manager._park_after or self._compensating:
+            return False
+        at = time() + wait
+        if self._deadline is not None and at >= self._deadline:
+            return False
+        if self._retrying is None:
+            self._retrying = {}
+        self._retrying[step_name] = (at, attempt, delay)
+        return True
+
+    async def _keep_result(self, step_name: str, value: Any):
+        """
+        Store the step result, large result is written to the blobs of the manager and kept as the handle
+        """
+        blobs = self._manager._blobs if self._manager is not None else None
+        self._returns[step_name] = await blobs.offload(self._uid, value, step_name) if blobs is not None else value
+
+    def _load_blob(self, ref: BlobRef, hint: type = None) -> Any:
+        """
+        Read the step result written out-of-line
+        """
+        blobs = self._manager._blobs if self._manager is not None else None
+        if blobs is None:
+            raise RuntimeError(f"Step result {ref} is written to blobs, but the manager has no BlobStore")
+        return blobs.load(ref, hint)
+
+    def _release(self, step_name: str):
+        """
+        Replace results whose readers are all completed with the tombstone when the step is completed
+        """
+        for name, readers in self._liveness.get(step_name, ()) if self._liveness else ():
+            if name in self._returns and all(reader in self._returns for reader in readers):
+                self._returns[name] = RELEASED
+
+    @property
+    def rollbacks(self) -> list[RollbackInfo]:
+        """
+        Get rollbacks executed on saga abort in order of their completion
+        """
+        return self._rollbacks if self._rollbacks is not None else []
+
+    def _rolled_back(self, info: RollbackInfo):
+        if self._rollbacks is None:
+            self._rollbacks = []
+        self._rollbacks.append(info)
+
     def _get_entry_details(self):
-        entrySourceFile = getsourcefile(self._entry)
-        entryName = self._entry.__name__
-        entryModule = self._entry.__module__
-        return {'@src': entrySourceFile,'@entry': entryName,'@module': entryModule}
+        return {**_entry_details(self._entry)[0]}
 
-    def step(self, fn = None, retry: Retry | int = None):
+    def step(self, fn = None, retry: Retry | int = None, executor: str | Executor = None, timeout: float = None, keep: bool = False,
+             cache: float | bool = None, coalesce: bool = False):
         """
         Decorator for declare Saga Step
+
+        executor: run sync step in 'thread' or 'process' pool of the manager or in given Executor,
+                  steps for process pool must be declared at module level
+        timeout: time limit in seconds for every attempt, expired attempt is cancelled and retried
+        keep: keep the result in the saga state until the saga is finished, otherwise the result is released
+              as soon as no later step or rollback reads it through `Result[...]`
+        cache: reuse the result of the step called with the same parameters by any saga of the manager
+               for `cache` seconds, True - until the result is evicted or invalidated
+        coalesce: sagas calling the step with the same parameters at once share one call and its retries,
+                  for idempotent steps only
         """
         def decorator(func):
-            _logger.debug(f"Add step `{func.__name__}`", extra={'saga' : self._name, 'kind' : 'orchestrator '})
-            self._steps.append(self._step(func, self._name, self._returns, (), {}, retry))
+            if _logger.isEnabledFor(DEBUG):
+                _logger.debug(f"Add step `{func.__name__}`", extra={'saga' : self._name, 'kind' : 'orchestrator '})
+            self._steps.append(self._step(func, self._name, self._returns, (), {}, retry, executor=executor, timeout=timeout, keep=keep, cache=cache, coalesce=coalesce))
             return func
 
         if fn is None:
             return decorator
         else:
-            _logger.debug(f"Add step `{fn.__name__}`", extra={'saga' : self._name, 'kind' : 'orchestrator '})
-            self._steps.append(self._step(fn, self._name, self._returns, (), {}, retry))
+            if _logger.isEnabledFor(DEBUG):
+                _logger.debug(f"Add step `{fn.__name__}`", extra={'saga' : self._name, 'kind' : 'orchestrator '})
+            self._steps.append(self._step(fn, self._name, self._returns, (), {}, retry, executor=executor, timeout=timeout, keep=keep, cache=cache, coalesce=coalesce))
             return fn
 
-    def rollback(self, fn = None, retry: Retry | int = None):
+    def rollback(self, fn = None, retry: Retry | int = None, executor: str | Executor = None, timeout: float = None):
         """
         Decorator for declare Rollback for previous Step Saga
         """
         stepFor = None
-        for stp in reversed(self._steps):
-            if isinstance(stp, Context._step):
-                stepFor = stp._name
-                break
+        if _logger.isEnabledFor(DEBUG):
+            for stp in reversed(self._steps):
+                if isinstance(stp, Context._step):
+                    stepFor = stp._name
+                    break
 
         def decorator(func):
-            _logger.debug(f"Add rollback `{fn.__name__}`{f' for {stepFor}' if stepFor else ''}", extra={'saga': self._name, 'kind': 'orchestrator '})
-            self._steps.append(self._rollback(func, self._name, self._returns, (), {}, retry))
+            if _logger.isEnabledFor(DEBUG):
+                _logger.debug(f"Add rollback `{func.__name__}`{f' for {stepFor}' if stepFor else ''}", extra={'saga': self._name, 'kind': 'orchestrator '})
+            self._steps.append(self._rollback(func, self._name, self._returns, (), {}, retry, executor=executor, timeout=timeout))
             return func
 
         if fn is None:
             return decorator
         else:
-            _logger.debug(f"Add rollback `{fn.__name__}`{f' for {stepFor}' if stepFor else ''}", extra={'saga' : self._name, 'kind' : 'orchestrator '})
-            self._steps.append(self._rollback(fn, self._name, self._returns, (), {}, retry))
+            if _logger.isEnabledFor(DEBUG):
+                _logger.debug(f"Add rollback `{fn.__name__}`{f' for {stepFor}' if stepFor else ''}", extra={'saga' : self._name, 'kind' : 'orchestrator '})
+            self._steps.append(self._rollback(fn, self._name, self._returns, (), {}, retry, executor=executor, timeout=timeout))
             return fn
 
     def readiness(self, fn):
         """
         Decorator for declare Saga readiness callback, executing before start saga
         """
-        _logger.debug(f"Register lifespan `{fn.__name__}`", extra={'saga' : self._name, 'kind' : 'orchestrator '})
+        if _logger.isEnabledFor(DEBUG):
+            _logger.debug(f"Register lifespan `{fn.__name__}`", extra={'saga' : self._name, 'kind' : 'orchestrator '})
         self._readiness = fn
 
     def catch(self, fn):
         """
         Decorator for declare Saga exception handler
         """
-        _logger.debug(f"Register catch `{fn.__name__}`", extra={'saga' : self._name, 'kind' : 'orchestrator '})
+        if _logger.isEnabledFor(DEBUG):
+            _logger.debug(f"Register catch `{fn.__name__}`", extra={'saga' : self._name, 'kind' : 'orchestrator '})
         self._catch = fn
\ No newline at end of file
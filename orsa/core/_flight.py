@@ -0,0 +1,81 @@
+from typing import Any, Callable, Awaitable, NamedTuple
+import asyncio, concurrent.futures, threading
+
+from ._types import _Parked
+
+CoalesceInfo = NamedTuple("CoalesceInfo", [('in_flight', int), ('calls', int), ('merged', int)])
+
+class _Flights():
+    """
+    Registry of the coalesced step calls in flight. The first caller of the key is the leader and executes the step
+    with its retries, callers of the same key from any shard await the result or the exception of the leader.
+    Call abandoned by the leader (cancelled or parked saga) is taken over by one of the waiting callers
+    """
+    _default: '_Flights' = None
+    _default_lock = threading.Lock()
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights: dict[tuple, concurrent.futures.Future] = {}
+        self._calls = 0
+        self._merged = 0
+
+    @classmethod
+    def default(cls) -> '_Flights':
+        """
+        Process-wide registry of the sagas without manager
+        """
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls()
+            return cls._default
+
+    async def call(self, key: tuple, fn: Callable[[], Awaitable[Any]], merged: Callable[[], Any] = None) -> Any:
+        joined = False
+        while True:
+            with self._lock:
+                flight = self._flights.get(key)
+                leader = flight is None
+                if leader:
+                    flight = self._flights[key] = concurrent.futures.Future()
+                    self._calls += 1
+                elif not joined:
+                    self._merged += 1
+            if leader:
+                return await self.__lead(key, flight, fn)
+            if not joined and merged is not None:
+                merged()
+            joined = True
+            try:
+                # Cancellation of the waiting saga must not cancel the call of the others
+                return await asyncio.shield(asyncio.wrap_future(flight))
+            except asyncio.CancelledError:
+                if not flight.cancelled():
+                    raise
+
+    async def __lead(self, key: tuple, flight: concurrent.futures.Future, fn: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            result = await fn()
+        except Exception as ex:
+            self.__land(key)
+            if isinstance(ex, _Parked):
+                flight.cancel()
+            else:
+                flight.set_exception(ex)
+            raise
+        except BaseException:
+            self.__land(key)
+            flight.cancel()
+            raise
+        self.__land(key)
+        flight.set_result(result)
+        return result
+
+    def __land(self, key: tuple):
+        with self._lock:
+            self._flights.pop(key, None)
+
+    @property
+    def info(self) -> CoalesceInfo:
+        with self._lock:
+            return CoalesceInfo(len(self._flights), self._calls, self._merged)
@@ -1,4 +1,9 @@
+import atexit
+import copy
+import json
 import logging
+import logging.handlers
+import queue
 import sys
 
 RESET = "\x1b[0m"
@@ -10,13 +15,24 @@ COLORS = {
     "CRITICAL": "\x1b[41m",  # red background
 }
 
+FORMAT = '%(levelname)s:%(source)s%(saga)s: %(message)s'
+
 class __log_formater(logging.Formatter):
+    """
+    Text formatter, logger name is followed by the `kind` and `saga` extra fields of the record
+    """
+    def __init__(self, colored: bool = True):
+        super().__init__(FORMAT)
+        self._colored = colored
+
     def format(self, record: logging.LogRecord) -> str:
+        # Record is shared by all handlers, the formatter adds own fields and does not touch the standard ones
         if not getattr(record,'saga',None):
             record.saga = ""
-        
-        if getattr(record,'kind',None):
-            record.name = f"{record.name}:{record.kind}"
+        kind = getattr(record,'kind',None)
+        record.source = f"{record.name}:{kind}" if kind else record.name
+        if not self._colored:
+            return super().format(record)
 
         levelname = record.levelname
         try:
@@ -28,14 +44,90 @@ class __log_formater(logging.Formatter):
         finally:
             record.levelname = levelname
 
+class JsonFormatter(logging.Formatter):
+    """
+    Structured formatter, one JSON object per record with saga, step and uid fields
+    """
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {'ts': record.created, 'level': record.levelname, 'logger': record.name, 'message': record.getMessage()}
+        kind = getattr(record,'kind',None) or ''
+        name = getattr(record,'saga',None)
+        if kind.endswith('.'):
+            # Step record: `kind` is the saga name followed by dot, `saga` is the step name
+            entry['saga'] = kind[:-1]
+            if name:
+                entry['step'] = name
+        else:
+            if kind.strip():
+                entry['kind'] = kind.strip()
+            if name:
+                entry['saga'] = name
+        uid = getattr(record,'uid',None)
+        if uid is not None:
+            entry['uid'] = str(uid)
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry['exc'] = record.exc_text
+        return json.dumps(entry, default=str)
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """
+    Queue handler which leaves formatting to the listener thread: only the message arguments are merged on the caller,
+    as their values may change, the exception is passed to the formatter of the listener as is
+    """
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+_listener: logging.handlers.QueueListener = None
+
+def _stop_listener():
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+atexit.register(_stop_listener)
+
+def _handler(colored: bool = True, structured: bool = False, stream = None) -> logging.Handler:
+    handler = logging.StreamHandler(stream)
+    if structured:
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(__log_formater(colored and (1 or sys.stdout.isatty())))
+    return handler
+
 def getLogger(name, colored = True) -> logging.Logger:
     _logger = logging.getLogger(name)
     if not _logger.handlers:
-        _logHandler = logging.StreamHandler()
-        if colored and (1 or sys.stdout.isatty()):
-            _logHandler.setFormatter(__log_formater('%(levelname)s:%(name)s%(saga)s: %(message)s'))
-        else:
-            _logHandler.setFormatter(logging.Formatter('%(levelname)s:%(name)s%(saga)s: %(message)s'))
-        _logger.addHandler(_logHandler)
+        _logger.addHandler(_handler(colored))
         _logger.propagate = False
-    return _logger
\ No newline at end of file
+    return _logger
+
+def configure(level: int | str = None, colored: bool = True, structured: bool = False, queued: bool = False, stream = None) -> logging.Logger:
+    """
+    Replace handler of the orsa logger
+
+    structured: format records as JSON objects with saga, step and uid fields
+    queued: event loop threads only put records to the queue, formatting and output run in the listener thread
+    """
+    _logger = logging.getLogger('orsa')
+    _stop_listener()
+    for handler in list(_logger.handlers):
+        _logger.removeHandler(handler)
+        handler.close()
+    handler = _handler(colored, structured, stream)
+    if queued:
+        global _listener
+        records = queue.SimpleQueue()
+        _listener = logging.handlers.QueueListener(records, handler, respect_handler_level=True)
+        _listener.start()
+        handler = _QueueHandler(records)
+    _logger.addHandler(handler)
+    _logger.propagate = False
+    if level is not None:
+        _logger.setLevel(level)
+    return _logger
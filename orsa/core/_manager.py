@@ -1,10 +1,23 @@
 from logging import Logger
-import asyncio, threading, sys
-from typing import Any
+import logging
+import asyncio, contextlib, threading, sys, time
+from typing import Any, NamedTuple
 from uuid import UUID
 import uuid
 from ._context import Context as Saga
 from ._logger import getLogger
+from ._persist import _StoreQueue
+from ._admission import _Admission, AdmissionInfo
+from ._retry import RetryPolicy, RetryInfo
+from ._timer import _TimerWheel
+from ._metrics import Metrics, MetricsSnapshot
+from ._cache import StepCache
+from ._flight import _Flights, CoalesceInfo
+from . import _tracing
+from inspect import signature
+from ._types import _Parked
+from ..store._base import Store
+from ..store._blob import BlobStore
 import concurrent.futures
 import importlib
 
@@ -18,6 +31,7 @@ async def _call_helper(func,*args, **kwargs):
 class _OnSaga():
     def __init__(self):
         self._on_store = None
+        self._on_store_many = None
         self._on_abort = None
         self._on_complete = None
 
@@ -32,6 +46,18 @@ class _OnSaga():
         """
         self._on_store = func
 
+    def store_many(self, func):
+        """
+        Decorator to define callback when need store states of the batch of Sagas, used instead of `store`.
+        Repeated stores of the same Saga are coalesced until the batch is flushed
+
+        Examples:
+            @manager.saga.store_many
+            async def _saga_store_many(self: Manager, sagas: list[Saga])
+                StoreSagas({saga.uid: saga.state for saga in sagas})
+        """
+        self._on_store_many = func
+
     def complete(self, func):
         """
         Decorator to define callback when Saga is executing complete wit success state
@@ -56,9 +82,83 @@ class _OnSaga():
         """
         self._on_abort = func
 
+class _Shard():
+    """
+    Event loop running in a separate thread, sagas are routed to shards by `uid`
+    """
+    def __init__(self, no: int):
+        self.no = no
+        self.loop: asyncio.AbstractEventLoop = None
+        self.thread: threading.Thread = None
+        self.queue: _StoreQueue = None
+        self.sagas = 0
+
+    @property
+    def name(self) -> str:
+        return '@manager' if self.no == 0 else f'@manager:{self.no}'
+
+ShardInfo = NamedTuple("ShardInfo", [('no', int), ('thread', str), ('sagas', int), ('tasks', int)])
+
+def _retrieve(task: asyncio.Task):
+    """
+    Retrieve exception of the fire and forget task
+    """
+    task.cancelled() or task.exception()
+
 class Manager():
     """Saga orchestrator manager base class"""
-    def __init__(self, threads: int = 1):
+    def __init__(self, threads: int = 1, store: Store = None, store_delay: float = 0.0, store_batch: int = 256, durability: str = 'flush', restore_concurrency: int = 64,
+                 max_in_flight: int = None, max_pending: int = None, overflow: str = 'block',
+                 executor: str | concurrent.futures.Executor = None, thread_workers: int = None, process_workers: int = None,
+                 retry_policy: RetryPolicy = None, park_after: float = None, metrics: bool = True, cache_size: int = 1024,
+                 blobs: BlobStore = None):
+        """
+        threads: number of event loop shards, every shard runs own event loop in separate thread
+        store: built-in saga state store (see `orsa.store`), called before `saga.store`, `saga.complete`
+               and `saga.abort` callbacks, incomplete sagas from the store are restored on startup
+        store_delay: max delay in seconds to collect dirty sagas before the store flush
+        store_batch: max number of sagas passed to the store at once
+        durability: 'flush' - step waits until saga state is stored, 'async' - state is stored in background
+        restore_concurrency: max number of sagas restored from the store executing at once
+        max_in_flight: max number of executing sagas, unlimited by default
+        max_pending: max number of sagas waiting for the launch when `max_in_flight` is reached
+        overflow: policy when pending queue is full: 'block' - caller waits, 'reject' - raise `Overloaded`,
+                  'shed' - the oldest pending saga is aborted with `Overloaded`
+        executor: default executor of sync steps: 'thread', 'process' or Executor, sync steps run on the event loop by default
+        thread_workers, process_workers: size of the manager thread and process pools
+        retry_policy: retry engine shared by all sagas of the manager: jitter, retry budget and circuit breakers of the steps,
+                      fixed delays of the step `Retry` without budget and breakers by default
+        park_after: saga waiting for the step retry at least `park_after` seconds is stored with the retry time
+                    and unloaded from memory, the timer wheel of the manager resumes it when the retry is due
+        metrics: collect step and saga latency histograms and counters, see `manager.metrics`
+        cache_size: max number of the step results kept by `manager.cache` for steps declared with `cache`
+        blobs: area of the large step results written out-of-line (see `orsa.store.BlobStore`), state keeps only their handles
+        """
+        if durability not in ('flush', 'async'):
+            raise ValueError(f"durability must be 'flush' or 'async', got {durability!r}")
+        self._store = store
+        self._executor = executor
+        self._retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+        self._workers = {'thread': thread_workers, 'process': process_workers}
+        self._pools: dict[str, concurrent.futures.Executor] = {}
+        self._pools_lock = threading.Lock()
+        self._admission = _Admission(self._schedule_saga, self.__shed_saga, max_in_flight, max_pending, overflow)
+        self._restore_concurrency = restore_concurrency
+        self._park_after = park_after
+        self._metrics = Metrics() if metrics else None
+        self._cache = StepCache(cache_size)
+        self._flights = _Flights()
+        self._blobs = blobs
+        self._parked: dict[UUID, tuple[dict[str,Any], concurrent.futures.Future]] = {}
+        self._resumed: dict[UUID, concurrent.futures.Future] = {}
+        self._timers = _TimerWheel(self.__wake_saga)
+        self._finalizing: set[concurrent.futures.Future] = set()
+        self._restoring = None
+        self._entries = {}
+        self._store_delay = store_delay
+        self._store_batch = store_batch
+        self._durability = durability
+        self._shards = [_Shard(no) for no in range(max(1, threads))]
         self._event_loop = None
         self._event_thread = None
         self._on_monitor = (None, 10.0)
@@ -68,24 +168,119 @@ class Manager():
         self._on_saga = _OnSaga()
 
     async def __monitor(self):
+        # Callback with the second parameter receives the metrics snapshot
+        with_metrics = len(signature(self._on_monitor[0]).parameters) > 1
         while not self.__monitoring_task.cancelled():
-            await _call_helper(self._on_monitor[0],self)
+            if with_metrics:
+                await _call_helper(self._on_monitor[0],self,self.metrics)
+            else:
+                await _call_helper(self._on_monitor[0],self)
             await asyncio.sleep(self._on_monitor[1])
 
-    def _schedule_saga(self, saga: Saga):
+    def _shard_of(self, uid: UUID) -> _Shard:
+        """
+        Get shard which executes the Saga
         """
-        Schedule or reschedule Saga
+        return self._shards[uid.int % len(self._shards)]
+
+    async def _admit_saga(self, saga: Saga, block: bool = False) -> concurrent.futures.Future:
         """
-        asyncio.run_coroutine_threadsafe(_call_helper(self.saga._on_store, self,saga), loop=self._event_loop)
-        task = asyncio.run_coroutine_threadsafe(saga(), loop=self._event_loop)
+        Launch Saga through admission control, restored sagas are never rejected
+        """
+        return await self._admission.admit(saga, block)
+
+    def __shed_saga(self, saga: Saga, ex: Exception):
+        asyncio.run_coroutine_threadsafe(self._abort_saga(saga, ex), loop=self._shard_of(saga.uid).loop)
+
+    def _schedule_saga(self, saga: Saga, finished = None) -> concurrent.futures.Future:
+        """
+        Schedule or reschedule Saga, returns future of the Saga result.
+        `finished` is called when the run is over: saga is completed, aborted or parked
+        """
+        shard = self._shard_of(saga.uid)
+        # Resumed parked saga continues the result of its first run
+        result = self._resumed.pop(saga.uid, None) or concurrent.futures.Future()
+        async def __run_saga():
+            shard.sagas += 1
+            try:
+                return await saga()
+            except _Parked:
+                # Retry time of the step must survive restart
+                await shard.queue.put(saga)
+                raise
+            finally:
+                shard.sagas -= 1
         def __complete_task(future: asyncio.Future):
+            if finished is not None:
+                finished()
             if future.cancelled():
-                self.logger.error("Saga is terminated")      
-            elif future.exception() is not None:
-                asyncio.run_coroutine_threadsafe(_call_helper(self.saga._on_abort, self,saga,future.exception()), loop=self._event_loop)          
+                outcome = 'terminated'
+            elif isinstance(future.exception(), _Parked):
+                outcome = 'parked'
             else:
-                asyncio.run_coroutine_threadsafe(_call_helper(self.saga._on_complete, self,saga), loop=self._event_loop)
-        task.add_done_callback(__complete_task)
+                outcome = 'aborted' if future.exception() is not None else 'completed'
+            # Metrics are recorded before the caller gets the result
+            if self._metrics is not None:
+                self._metrics.inc('orsa_sagas_total', (saga._name, outcome))
+                if outcome != 'parked':
+                    self._metrics.observe('orsa_saga_duration_seconds', (saga._name,), time.time() - saga._created)
+            if outcome == 'terminated':
+                self.logger.error("Saga is terminated")
+                result.cancel()
+            elif outcome == 'parked':
+                self._park_saga(saga.state, result)
+            elif outcome == 'aborted':
+                self.__finalize(asyncio.run_coroutine_threadsafe(self._abort_saga(saga,future.exception()), loop=shard.loop))
+                result.set_exception(future.exception())
+            else:
+                self.__finalize(asyncio.run_coroutine_threadsafe(self._complete_saga(saga), loop=shard.loop))
+                result.set_result(future.result())
+        def __start():
+            # Plain tasks of the shard loop: concurrent future of every saga run costs a lock and a condition
+            shard.loop.create_task(self._store_saga(saga)).add_done_callback(_retrieve)
+            shard.loop.create_task(__run_saga()).add_done_callback(__complete_task)
+        shard.loop.call_soon_threadsafe(__start)
+        return result
+
+    def __finalize(self, future: concurrent.futures.Future):
+        """
+        Track complete and abort handlers, manager stop waits for them
+        """
+        self._finalizing.add(future)
+        future.add_done_callback(self._finalizing.discard)
+
+    def _park_saga(self, state: dict[str,Any], result: concurrent.futures.Future):
+        """
+        Keep only the state of the saga waiting for the step retry until the earliest retry time
+        """
+        at = min(retry[0] for retry in state['@retry'].values())
+        # Entry details of the restored states are separate strings, parked sagas of the same entry share them
+        for key in ('@src', '@entry', '@module'):
+            if type(state.get(key)) is str:
+                state[key] = sys.intern(state[key])
+        self._parked[state['@uid']] = (state, result)
+        self._timers.add(time.monotonic() + at - time.time(), state['@uid'])
+        if _logger.isEnabledFor(logging.DEBUG):
+            _logger.debug(f"Saga:{state.get('@entry')} with {state['@uid']} is parked for {max(0.0, at - time.time()):.1f} sec", extra={'kind': 'manager', 'uid': state['@uid']})
+
+    def __wake_saga(self, uid: UUID):
+        state, result = self._parked.pop(uid)
+        async def __resume():
+            self._resumed[uid] = result
+            try:
+                await self._resume_saga(state)
+            except Exception as ex:
+                self._resumed.pop(uid, None)
+                _logger.error(f"Saga:{state.get('@entry')} with {uid} ... resume failed", exc_info=ex, extra={'kind': 'manager'})
+                result.set_exception(ex)
+        self._event_loop.create_task(__resume(), name='@resume')
+
+    @property
+    def parked(self) -> int:
+        """
+        Get number of sagas parked until the step retry
+        """
+        return len(self._parked)
 
     @property
     def logger(self) -> Logger:
@@ -101,11 +296,65 @@ class Manager():
         """
         return self._on_saga
 
+    @property
+    def admission(self) -> AdmissionInfo:
+        """
+        Get admission control counters: in flight and pending sagas, pending wait time
+        """
+        return self._admission.info
+
+    @property
+    def metrics(self) -> MetricsSnapshot:
+        """
+        Get snapshot of the manager metrics, `metrics.prometheus()` renders it in Prometheus text format
+        """
+        admission = self._admission.info
+        gauges = {'orsa_sagas_in_flight': {(): admission.in_flight}, 'orsa_sagas_pending': {(): admission.pending},
+                  'orsa_sagas_parked': {(): len(self._parked)},
+                  'orsa_shard_sagas': {(str(shard.no),): shard.sagas for shard in self._shards}}
+        return self._metrics.snapshot(gauges) if self._metrics is not None else MetricsSnapshot({}, {}, gauges)
+
+    @property
+    def retries(self) -> dict[str, RetryInfo]:
+        """
+        Get retry policy state of the steps: circuit breaker, retry budget tokens and counters
+        """
+        return self._retry_policy.info
+
+    @property
+    def cache(self) -> StepCache:
+        """
+        Get cache of the step results: `info` counters and `invalidate()`
+        """
+        return self._cache
+
+    @property
+    def blobs(self) -> BlobStore | None:
+        """
+        Get area of the large step results: `info` counters
+        """
+        return self._blobs
+
+    @property
+    def coalesced(self) -> CoalesceInfo:
+        """
+        Get counters of the coalesced step calls: calls in flight, executed calls and merged callers
+        """
+        return self._flights.info
+
+    @property
+    def shards(self) -> tuple[ShardInfo]:
+        """
+        Get combined view of the manager shards
+        """
+        return tuple(ShardInfo(shard.no, shard.name, shard.sagas,
+                               len(asyncio.all_tasks(shard.loop)) if shard.loop and not shard.loop.is_closed() else 0) for shard in self._shards)
+
     def Start(self):
         """
-        Create new event loop in separate thread and run manager
+        Create new event loop for every shard in separate thread and run manager
         """
-        def async_loop_thread(loop: asyncio.AbstractEventLoop):
+        def async_loop_thread(loop: asyncio.AbstractEventLoop, main: bool):
             asyncio.set_event_loop(loop)
             if sys.platform == "win32":
                 try:
@@ -115,31 +364,81 @@ class Manager():
                 except Exception:
                     pass
             try:
-                loop.run_until_complete(_call_helper(self.__on_startup_fn,self))
+                if main:
+                    if restore:
+                        # Restored sagas are executing in background, manager accepts new ones meanwhile
+                        self._restoring = loop.create_task(self.__restore_store(restore), name='@restore')
+                    loop.run_until_complete(_call_helper(self.__on_startup_fn,self))
                 loop.run_forever()
             except Exception as e:
                 _logger.error(f"Event loop exited unexpectedly: {e}", extra={'kind': 'manager'})
             finally:
-                loop.run_until_complete(_call_helper(self.__on_shutdown_fn,self))
+                if main:
+                    loop.run_until_complete(_call_helper(self.__on_shutdown_fn,self))
+                    if self._store:
+                        self._store.close()
+
+        for shard in self._shards:
+            shard.loop = asyncio.new_event_loop()
+            shard.queue = _StoreQueue(shard.loop, self._flush_sagas, self._store_delay, self._store_batch)
+        # Incomplete sagas are loaded before manager accepts new ones
+        restore = self._shards[0].loop.run_until_complete(self._store.load()) if self._store else None
+        if restore is not None and self._blobs is not None:
+            # Blobs of the sagas finished while their completion was not stored are referenced by no state
+            self._blobs.sweep(restore)
+        for shard in self._shards:
+            shard.thread = threading.Thread(target=async_loop_thread, args=(shard.loop, shard.no == 0), daemon=False, name=shard.name)
+        # Startup callback is running on the first shard and may already route restored sagas to the others
+        for shard in reversed(self._shards):
+            shard.thread.start()
 
-        self._event_loop:asyncio.AbstractEventLoop = asyncio.new_event_loop()
-        self._event_thread = threading.Thread(target=async_loop_thread, args=(self._event_loop,), daemon=False, name='@manager')
-        self._event_thread.start()
+        self._event_loop:asyncio.AbstractEventLoop = self._shards[0].loop
+        self._event_thread = self._shards[0].thread
+
+        self._timers.start(self._event_loop)
 
         # Run monitoring loop
         if self._on_monitor[0]:
-            self.__monitoring_task = self._event_loop.create_task(self.__monitor(),name='@monitoring')
+            def __start_monitoring():
+                self.__monitoring_task = self._event_loop.create_task(self.__monitor(),name='@monitoring')
+            self._event_loop.call_soon_threadsafe(__start_monitoring)
+
+    def _pool(self, kind: str) -> concurrent.futures.Executor:
+        """
+        Get shared bounded pool of the manager for sync steps
+        """
+        pool = self._pools.get(kind)
+        if pool is None:
+            with self._pools_lock:
+                pool = self._pools.get(kind)
+                if pool is None:
+                    if kind == 'thread':
+                        pool = concurrent.futures.ThreadPoolExecutor(self._workers['thread'], thread_name_prefix='@step')
+                    elif kind == 'process':
+                        pool = concurrent.futures.ProcessPoolExecutor(self._workers['process'])
+                    else:
+                        raise ValueError(f"Unknown executor {kind!r}")
+                    self._pools[kind] = pool
+        return pool
 
     def Stop(self):
         """
-        Stop event loop and shutdown the manager
+        Stop event loops and shutdown the manager
         """
-        if self._event_loop is not None:
-            self._event_loop.call_soon_threadsafe(self._event_loop.stop)
-        if self._event_thread is not None:
-            self._event_thread.join()
-        if self._event_loop is not None:
-            self._event_loop.close()
+        # Finished sagas must be marked complete or aborted in the store before the loops stop
+        concurrent.futures.wait(list(self._finalizing), timeout=30.0)
+        for shard in self._shards:
+            if shard.loop is not None:
+                shard.loop.call_soon_threadsafe(shard.loop.stop)
+        for shard in self._shards:
+            if shard.thread is not None:
+                shard.thread.join()
+        for shard in self._shards:
+            if shard.loop is not None:
+                shard.loop.close()
+        for pool in self._pools.values():
+            pool.shutdown(wait=True)
+        self._pools.clear()
 
     def startup(self, func):
         """
@@ -149,8 +448,7 @@ class Manager():
             @manager.startup
             async def _startup(self)
                 _incomplete_sagas = LoadIncompleteSagas()
-                for saga in _incomplete_sagas:
-                    _uid, _name = await self._restore_saga(saga['state'])
+                report = await self.restore([saga['state'] for saga in _incomplete_sagas])
         """
         self.__on_startup_fn = func
 
@@ -178,9 +476,181 @@ class Manager():
 
     async def _store_saga(self,saga: Saga):
         """
-        Internal method to call saga commit handler
+        Internal method to queue saga for the store, waits for the flush in 'flush' durability mode
+        """
+        future = self._shard_of(saga.uid).queue.put(saga)
+        if self._durability == 'flush':
+            if _tracing._active is None:
+                await future
+                return
+            span = _tracing._start('store', {'orsa.saga.uid': str(saga.uid), 'orsa.saga.entry': saga._name})
+            try:
+                await future
+            finally:
+                span.end()
+
+    async def _flush_sagas(self, sagas: list[Saga]):
+        """
+        Internal method to call saga commit handlers for the batch of dirty sagas
+        """
+        if self._store:
+            async with self.__store_call('save', {'orsa.store.sagas': len(sagas)}):
+                await self._store.save_many(sagas)
+        if self.saga._on_store_many:
+            await _call_helper(self.saga._on_store_many, self,sagas)
+        elif self.saga._on_store:
+            for saga in sagas:
+                await _call_helper(self.saga._on_store, self,saga)
+
+    @contextlib.asynccontextmanager
+    async def __store_call(self, op: str, attributes: dict[str,Any]):
+        """
+        Measure and trace the call of the built-in store
+        """
+        span = _tracing._start(f"store.{op}", attributes) if _tracing._active is not None else None
+        started = time.perf_counter()
+        try:
+            yield
+        except BaseException as ex:
+            if span is not None:
+                span.record_exception(ex)
+            raise
+        finally:
+            if self._metrics is not None:
+                self._metrics.observe('orsa_store_duration_seconds', (op,), time.perf_counter() - started)
+            if span is not None:
+                span.end()
+
+    async def _complete_saga(self, saga: Saga):
+        """
+        Internal method to call saga complete handler
+        """
+        await self._shard_of(saga.uid).queue.discard(saga.uid)
+        if self._store:
+            async with self.__store_call('complete', {'orsa.saga.uid': str(saga.uid)}):
+                await self._store.complete(saga)
+        try:
+            return await _call_helper(self.saga._on_complete, self,saga)
+        finally:
+            # Kept result written to the blobs is read by the callback
+            if self._blobs is not None:
+                self._blobs.release(saga.uid)
+
+    async def _abort_saga(self, saga: Saga, ex: Exception):
+        """
+        Internal method to call saga abort handler
+        """
+        await self._shard_of(saga.uid).queue.discard(saga.uid)
+        if self._store:
+            async with self.__store_call('abort', {'orsa.saga.uid': str(saga.uid)}):
+                await self._store.abort(saga, ex)
+        try:
+            return await _call_helper(self.saga._on_abort, self,saga,ex)
+        finally:
+            # Kept result written to the blobs is read by the callback
+            if self._blobs is not None:
+                self._blobs.release(saga.uid)
+
+    async def __restore_store(self, states: list[dict[str,Any]]):
+        """
+        Restore incomplete sagas loaded from the built-in store
+        """
+        report = await self.restore(states, concurrency=self._restore_concurrency)
+        _logger.info(f"Restored {report.restored}/{report.total} sagas, failed {len(report.failed)}", extra={'kind': 'manager'})
+
+    async def restore(self, states: list[dict[str,Any]], concurrency: int = 64, oldest_first: bool = True, progress = None) -> 'RestoreReport':
+        """
+        Restore incomplete sagas and continue their execution, at most `concurrency` restored sagas are executing at once.
+        Sagas which can not be restored are reported in `RestoreReport.failed` and do not stop the others
+
+        progress: optional callback `(manager, report)` called after every restored saga is finished
+
+        Examples:
+            @manager.startup
+            async def _startup(self)
+                report = await self.restore(LoadIncompleteSagas(), concurrency=32)
         """
-        return await _call_helper(self.saga._on_store, self,saga)
+        report = RestoreReport(len(states))
+        if oldest_first:
+            states = sorted(states, key=lambda state: state.get('@created') or 0.0)
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        async def __restore(state: dict[str,Any]):
+            try:
+                self._restored_uid(state)
+            except ValueError as ex:
+                _logger.error(f"Saga:{state.get('@entry')} with {state.get('@uid')} ... restore failed", exc_info=ex, extra={'kind': 'manager'})
+                report.failed.append((state.get('@uid'), ex))
+                await __finished(None)
+                return
+            if self._park_after is not None and state.get('@uid') and state.get('@retry'):
+                # Saga waiting for the step retry goes straight to the timer wheel
+                future = concurrent.futures.Future()
+                self._park_saga(state, future)
+                report.restored += 1
+                await __finished(future)
+                return
+            async with semaphore:
+                try:
+                    future = await self._resume_saga(state)
+                    report.restored += 1
+                except Exception as ex:
+                    _logger.error(f"Saga:{state.get('@entry')} with {state.get('@uid')} ... restore failed", exc_info=ex, extra={'kind': 'manager'})
+                    report.failed.append((state.get('@uid'), ex))
+                    future = None
+                await __finished(future)
+
+        async def __finished(future: concurrent.futures.Future):
+            if future is not None:
+                try:
+                    await asyncio.wrap_future(future)
+                    report.completed += 1
+                except BaseException:
+                    report.aborted += 1
+            if progress:
+                await _call_helper(progress, self, report)
+
+        await asyncio.gather(*(__restore(state) for state in states))
+        return report
+
+    def _resolve_entry(self, module_name: str, src: str, entry_name: str):
+        """
+        Resolve saga entry, entry modules are imported once
+        """
+        key = (module_name, src, entry_name)
+        entry = self._entries.get(key)
+        if entry is None:
+            module = sys.modules.get(module_name)
+            if module is None:
+                spec = importlib.util.spec_from_file_location(module_name, src)
+                module = importlib.util.module_from_spec(spec)
+                sys.modules[spec.name] = module
+                spec.loader.exec_module(module)
+            entry = self._entries[key] = getattr(module, entry_name)
+        return entry
+
+    @staticmethod
+    def _restored_uid(state: dict[str,Any]) -> UUID:
+        """
+        Normalize `@uid` of the restored state in place, stores without pickle keep it as the string
+        """
+        uid = state.get('@uid')
+        if uid and not isinstance(uid, UUID):
+            uid = state['@uid'] = UUID(str(uid))
+        return uid
+
+    async def _resume_saga(self, state: dict[str,Any]) -> concurrent.futures.Future:
+        """
+        Internal method to schedule restored Saga, returns future of the Saga execution
+        """
+        _uid = self._restored_uid(state)
+        _, _args, _kwargs,_src, _entry, _module = Saga._expand_module_entry(state)
+        if not _uid:
+            raise ValueError("Saga state has no @uid")
+        entry = self._resolve_entry(_module, _src, _entry)
+        if self._blobs is not None:
+            self._blobs.acquire(_uid, state.get('@returns'))
+        return await entry(*_args, **_kwargs, __manager=self,__state=state)
 
     async def _restore_saga(self, state: dict[str,Any]) -> tuple[uuid.UUID, str]:
         """
@@ -188,18 +658,19 @@ class Manager():
         """
         _uid, _args, _kwargs,_src, _entry, _module = Saga._expand_module_entry(state)
         if _uid:
-            if _module in sys.modules:
-                module = sys.modules[_module]
-                entry = getattr(module, _entry)
-                context = await entry(*_args, **_kwargs, __manager=self,__state=state)
-                return (_uid,_entry)
-            else:
-                spec = importlib.util.spec_from_file_location(_module, _src)
-                module = importlib.util.module_from_spec(spec)
-                sys.modules[spec.name] = module
-                spec.loader.exec_module(module)
+            await self._resume_saga(state)
+            return (state['@uid'],_entry)
+
+class RestoreReport():
+    """
+    Progress of the sagas restore
+    """
+    def __init__(self, total: int):
+        self.total = total
+        self.restored = 0
+        self.completed = 0
+        self.aborted = 0
+        self.failed: list[tuple[UUID, Exception]] = []
 
-                entry = getattr(module, _entry)
-                context = await entry(*_args, **_kwargs, __manager=self,__state=state)
-                
-                return (_uid,_entry)
+    def __repr__(self) -> str:
+        return f"RestoreReport(total={self.total}, restored={self.restored}, completed={self.completed}, aborted={self.aborted}, failed={len(self.failed)})"
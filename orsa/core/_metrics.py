@@ -0,0 +1,142 @@
+from bisect import bisect_left
+from typing import NamedTuple
+import threading
+
+"""
+Upper bounds of the latency histogram buckets in seconds
+"""
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+"""
+Metric name: (type, help, label names)
+"""
+METRICS = {
+    'orsa_saga_duration_seconds': ('histogram', 'Saga duration from creation to completion or abort', ('saga',)),
+    'orsa_step_duration_seconds': ('histogram', 'Step duration including retries', ('saga', 'step')),
+    'orsa_store_duration_seconds': ('histogram', 'Duration of the state store operations', ('op',)),
+    'orsa_sagas_total': ('counter', 'Finished sagas by outcome', ('saga', 'outcome')),
+    'orsa_step_attempts_total': ('counter', 'Step attempts', ('saga', 'step')),
+    'orsa_step_retries_total': ('counter', 'Step retries', ('saga', 'step')),
+    'orsa_step_failures_total': ('counter', 'Failed step attempts', ('saga', 'step')),
+    'orsa_step_cache_total': ('counter', 'Lookups of the cached step results by outcome', ('saga', 'step', 'outcome')),
+    'orsa_step_coalesced_total': ('counter', 'Step calls merged into the identical call in flight', ('saga', 'step')),
+    'orsa_rollbacks_total': ('counter', 'Executed rollbacks by outcome', ('saga', 'rollback', 'outcome')),
+    'orsa_sagas_in_flight': ('gauge', 'Executing sagas', ()),
+    'orsa_sagas_pending': ('gauge', 'Sagas waiting for admission', ()),
+    'orsa_sagas_parked': ('gauge', 'Sagas parked until the step retry', ()),
+    'orsa_shard_sagas': ('gauge', 'Executing sagas of the shard', ('shard',)),
+}
+
+HistogramInfo = NamedTuple("HistogramInfo", [('count', int), ('sum', float), ('buckets', tuple), ('counts', tuple)])
+
+class Metrics():
+    """
+    Registry of the manager metrics: counters and latency histograms with fixed buckets.
+    Recording is a dict lookup and an increment under the lock shared by the manager shards
+    """
+    def __init__(self, buckets: tuple[float] = BUCKETS):
+        self._buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._counters: dict[str, dict[tuple, float]] = {}
+        self._histograms: dict[str, dict[tuple, list]] = {}
+
+    def inc(self, name: str, labels: tuple = (), value: float = 1):
+        with self._lock:
+            series = self._counters.get(name)
+            if series is None:
+                series = self._counters[name] = {}
+            series[labels] = series.get(labels, 0) + value
+
+    def observe(self, name: str, labels: tuple, value: float):
+        with self._lock:
+            series = self._histograms.get(name)
+            if series is None:
+                series = self._histograms[name] = {}
+            hist = series.get(labels)
+            if hist is None:
+                # Bucket counts, then sum and count
+                hist = series[labels] = [0] * (len(self._buckets) + 1) + [0.0, 0]
+            hist[bisect_left(self._buckets, value)] += 1
+            hist[-2] += value
+            hist[-1] += 1
+
+    def snapshot(self, gauges: dict[str, dict[tuple, float]] = None) -> 'MetricsSnapshot':
+        with self._lock:
+            counters = {name: dict(series) for name, series in self._counters.items()}
+            histograms = {name: {labels: HistogramInfo(hist[-1], hist[-2], self._buckets, tuple(hist[:-2]))
+                                 for labels, hist in series.items()}
+                          for name, series in self._histograms.items()}
+        return MetricsSnapshot(counters, histograms, gauges or {})
+
+class MetricsSnapshot():
+    """
+    Point in time copy of the manager metrics
+
+    Examples:
+        @manager.monitor(timeout=15.0)
+        async def _monitor(self, metrics: MetricsSnapshot)
+            self.logger.info(f"p99 of charge: {metrics.quantile('orsa_step_duration_seconds', ('payment', 'charge'), 0.99)}")
+    """
+    def __init__(self, counters: dict, histograms: dict, gauges: dict):
+        self.counters: dict[str, dict[tuple, float]] = counters
+        self.histograms: dict[str, dict[tuple, HistogramInfo]] = histograms
+        self.gauges: dict[str, dict[tuple, float]] = gauges
+
+    def counter(self, name: str, labels: tuple = ()) -> float:
+        return self.counters.get(name, {}).get(labels, 0)
+
+    def histogram(self, name: str, labels: tuple = ()) -> HistogramInfo | None:
+        return self.histograms.get(name, {}).get(labels)
+
+    def quantile(self, name: str, labels: tuple, q: float) -> float | None:
+        """
+        Estimate quantile of the histogram by linear interpolation inside the bucket
+        """
+        hist = self.histogram(name, labels)
+        if hist is None or not hist.count:
+            return None
+        rank = q * hist.count
+        seen = 0
+        for no, count in enumerate(hist.counts):
+            if count and seen + count >= rank:
+                lower = hist.buckets[no - 1] if no > 0 else 0.0
+                upper = hist.buckets[no] if no < len(hist.buckets) else hist.buckets[-1]
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+        return hist.buckets[-1]
+
+    def prometheus(self) -> str:
+        """
+        Metrics in Prometheus text exposition format
+        """
+        lines = []
+        for name, (kind, help, label_names) in METRICS.items():
+            if kind == 'histogram':
+                series = self.histograms.get(name)
+            elif kind == 'counter':
+                series = self.counters.get(name)
+            else:
+                series = self.gauges.get(name)
+            if not series:
+                continue
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in sorted(series.items()):
+                pairs = [f'{label}="{_escape(text)}"' for label, text in zip(label_names, labels)]
+                if kind != 'histogram':
+                    lines.append(f"{name}{_labels(pairs)} {value}")
+                    continue
+                cumulative = 0
+                for bound, count in zip((*value.buckets, '+Inf'), value.counts):
+                    cumulative += count
+                    le = f'le="{bound}"'
+                    lines.append(f"{name}_bucket{_labels(pairs + [le])} {cumulative}")
+                lines.append(f"{name}_sum{_labels(pairs)} {value.sum}")
+                lines.append(f"{name}_count{_labels(pairs)} {value.count}")
+        return '\n'.join(lines) + '\n'
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _labels(pairs: list[str]) -> str:
+    return '{' + ','.join(pairs) + '}' if pairs else ''
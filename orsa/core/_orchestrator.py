@@ -3,22 +3,30 @@ from ._manager import Manager
 from ..context._async import AsyncContext
 
 class Orchestrator:
-    def __init__(self, manager=None):
+    def __init__(self, manager=None, parallel: bool = False, deadline: float = None, parallel_rollback: bool = False):
         self._manager = manager
+        self._parallel = parallel
+        self._deadline = deadline
+        self._parallel_rollback = parallel_rollback
 
     def __call__(self, func):  # Decorator
         def wrapper(*args, **kwargs):
             if iscoroutinefunction(func):
                 try:
                     _manager = self._manager or kwargs.pop('__manager',None)
-                    ctx = AsyncContext(func, args, kwargs, manager=_manager, state = kwargs.pop('__state',None))
+                    _state = kwargs.pop('__state',None)
+                    _deadline = kwargs.pop('__deadline',self._deadline)
+                    ctx = AsyncContext(func, args, kwargs, manager=_manager, state = _state, parallel=self._parallel, deadline=_deadline,
+                                       parallel_rollback=self._parallel_rollback)
                     if _manager:
                         async def __schedule():
-                            return _manager._schedule_saga(ctx)
+                            return await _manager._admit_saga(ctx, block=_state is not None)
                         return __schedule()  # Coroutine call
                     else:
                         fut = get_running_loop().create_future()
-                        create_task(ctx(fut))
+                        task = create_task(ctx(fut))
+                        # Exception of the saga is delivered through the future
+                        task.add_done_callback(lambda task: task.cancelled() or task.exception())
                         return fut
                 except Exception as e:
                     print(f"Error orchestrating coroutine {func.__name__}: {e}") # Add error handling
@@ -32,10 +40,20 @@ class Orchestrator:
                     return None
         return wrapper
 
-def orchestrator(func = None, manager: Manager = None):
+def orchestrator(func = None, manager: Manager = None, parallel: bool = False, deadline: float = None, parallel_rollback: bool = False):
+    """
+    Decorator for declare Saga entry
+
+    parallel: execute steps as dependency graph built from `Result[...]` annotations,
+              steps which do not depend on each other are running concurrently
+    deadline: time limit in seconds for the whole saga, can be overridden by `__deadline` argument of the call.
+              On expiry the running step is cancelled and the saga is rolled back with `DeadlineExceeded`
+    parallel_rollback: run rollbacks of independent steps concurrently, rollback of the step runs only after
+              rollbacks of all completed steps which take its result
+    """
     if func:
-        return Orchestrator(manager = manager)(func)
+        return Orchestrator(manager = manager, parallel = parallel, deadline = deadline, parallel_rollback = parallel_rollback)(func)
     else:
-        return Orchestrator(manager = manager)
+        return Orchestrator(manager = manager, parallel = parallel, deadline = deadline, parallel_rollback = parallel_rollback)
 
 __all__ = ['orchestrator']
\ No newline at end of file
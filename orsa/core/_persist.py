@@ -0,0 +1,77 @@
+from uuid import UUID
+import asyncio
+
+from ._logger import getLogger
+
+_logger = getLogger("orsa", True)
+
+class _StoreQueue():
+    """
+    Queue of dirty sagas of the shard. Repeated stores of the same saga are coalesced until the flush,
+    flush passes up to `batch` sagas to the manager at once no later than `delay` seconds after the first store
+    """
+    def __init__(self, loop: asyncio.AbstractEventLoop, flush, delay: float = 0.0, batch: int = 256):
+        self._loop = loop
+        self._flush_fn = flush
+        self._delay = delay
+        self._batch = max(1, batch)
+        self._dirty: dict[UUID, tuple] = {}
+        self._flushing: dict[UUID, asyncio.Future] = {}
+        self._timer = None
+
+    def __len__(self) -> int:
+        return len(self._dirty)
+
+    def put(self, saga) -> asyncio.Future:
+        """
+        Mark saga dirty, returned future is resolved when saga state is flushed
+        """
+        pending = self._dirty.get(saga.uid)
+        if pending is None:
+            pending = self._dirty[saga.uid] = (saga, self._loop.create_future())
+        if len(self._dirty) >= self._batch:
+            self._schedule(0.0)
+        elif self._timer is None:
+            self._schedule(self._delay)
+        return pending[1]
+
+    async def discard(self, uid: UUID):
+        """
+        Drop pending store of the finished saga and wait for the flush in progress
+        """
+        pending = self._dirty.pop(uid, None)
+        if pending is not None and not pending[1].done():
+            pending[1].set_result(False)
+        flushing = self._flushing.get(uid)
+        if flushing is not None:
+            await asyncio.shield(flushing)
+
+    def _schedule(self, delay: float):
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = self._loop.call_later(delay, lambda: self._loop.create_task(self.flush(), name='@store'))
+
+    async def flush(self):
+        self._timer = None
+        while self._dirty:
+            batch = [self._dirty.pop(uid) for uid in list(self._dirty)[:self._batch]]
+            done = self._loop.create_future()
+            for saga, _ in batch:
+                self._flushing[saga.uid] = done
+            try:
+                await self._flush_fn([saga for saga, _ in batch])
+                for _, future in batch:
+                    if not future.done():
+                        future.set_result(True)
+            except Exception as ex:
+                _logger.error(f"Store of {len(batch)} sagas failed", exc_info=ex, extra={'kind': 'manager'})
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(ex)
+                        # Fire and forget stores have nobody to retrieve the exception
+                        future.exception()
+            finally:
+                for saga, _ in batch:
+                    if self._flushing.get(saga.uid) is done:
+                        del self._flushing[saga.uid]
+                done.set_result(True)
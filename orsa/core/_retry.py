@@ -0,0 +1,142 @@
+from typing import NamedTuple
+import asyncio, random, threading, time
+
+from ._types import Retry
+
+class CircuitOpen(Exception):
+    """
+    Step is not called because the circuit breaker of the step is open
+    """
+
+RetryInfo = NamedTuple("RetryInfo", [('state', str), ('failures', int), ('tokens', float), ('attempts', int),
+                                     ('retries', int), ('exhausted', int), ('short_circuited', int)])
+
+JITTERS = ('none', None, 'full', 'decorrelated')
+
+class _StepState():
+    __slots__ = ('tokens', 'refilled', 'failures', 'opened', 'probe', 'attempts', 'retries', 'exhausted', 'short_circuited')
+
+    def __init__(self, tokens: float):
+        self.tokens = tokens
+        self.refilled = time.monotonic()
+        self.failures = 0
+        self.opened = None
+        self.probe = None
+        self.attempts = 0
+        self.retries = 0
+        self.exhausted = 0
+        self.short_circuited = 0
+
+class RetryPolicy():
+    """
+    Manager-wide retry engine shared by all sagas, state is kept per step (`saga.step`):
+
+    jitter: 'none' (or None) - fixed `timeout * scale ** attempt` delay of the step `Retry`, 'full' - random delay up to the fixed one,
+            'decorrelated' - random delay between `timeout` and triple previous delay
+    max_delay: upper limit of the retry delay in seconds
+    budget_rate, budget_burst: token bucket of retries, every retry takes a token, bucket is refilled
+            with `budget_rate` tokens per second up to `budget_burst`. Step is failed without retry when
+            the bucket is empty, retries are unlimited by default
+    breaker_threshold: number of consecutive failures which open the circuit breaker of the step, disabled by default
+    breaker_reset: seconds before the open breaker lets one probe call through
+    breaker_mode: 'fail' - step fails fast with `CircuitOpen` while breaker is open, 'park' - saga waits until the probe
+
+    Examples:
+        manager = Manager(retry_policy=RetryPolicy(jitter='decorrelated', budget_rate=10, budget_burst=50, breaker_threshold=20))
+    """
+    def __init__(self, jitter: str = 'none', max_delay: float = 300.0, budget_rate: float = None, budget_burst: float = None,
+                 breaker_threshold: int = None, breaker_reset: float = 30.0, breaker_mode: str = 'fail'):
+        if jitter not in JITTERS:
+            raise ValueError(f"jitter must be one of {JITTERS}, got {jitter!r}")
+        if breaker_mode not in ('fail', 'park'):
+            raise ValueError(f"breaker_mode must be 'fail' or 'park', got {breaker_mode!r}")
+        self._jitter = jitter if jitter != 'none' else None
+        self._max_delay = max_delay
+        self._budget_rate = budget_rate
+        self._budget_burst = budget_burst if budget_burst is not None else budget_rate
+        self._breaker_threshold = breaker_threshold
+        self._breaker_reset = breaker_reset
+        self._breaker_mode = breaker_mode
+        self._lock = threading.Lock()
+        self._steps: dict[str, _StepState] = {}
+
+    def _state(self, key: str) -> _StepState:
+        state = self._steps.get(key)
+        if state is None:
+            state = self._steps[key] = _StepState(self._budget_burst or 0.0)
+        return state
+
+    @staticmethod
+    def _breaker(state: _StepState) -> str:
+        if state.opened is None:
+            return 'closed'
+        return 'half-open' if state.probe is not None else 'open'
+
+    @property
+    def info(self) -> dict[str, RetryInfo]:
+        with self._lock:
+            return {key: RetryInfo(self._breaker(state), state.failures, state.tokens, state.attempts,
+                                   state.retries, state.exhausted, state.short_circuited)
+                    for key, state in self._steps.items()}
+
+    async def acquire(self, key: str):
+        """
+        Wait for permission to call the step, raise `CircuitOpen` when breaker is open in 'fail' mode
+        """
+        while True:
+            with self._lock:
+                state = self._state(key)
+                state.attempts += 1
+                if state.opened is None:
+                    return
+                now = time.monotonic()
+                # Probe is not reported back (e.g. cancelled) within the reset period: let the next one through
+                if now - state.opened >= self._breaker_reset and (state.probe is None or now - state.probe >= self._breaker_reset):
+                    state.probe = now
+                    return
+                state.attempts -= 1
+                state.short_circuited += 1
+                wait = max(0.0, state.opened + self._breaker_reset - now)
+            if self._breaker_mode == 'fail':
+                raise CircuitOpen(f"Circuit of `{key}` is open")
+            await asyncio.sleep(wait or self._breaker_reset)
+
+    def success(self, key: str):
+        with self._lock:
+            state = self._state(key)
+            state.failures = 0
+            state.opened = None
+            state.probe = None
+
+    def failure(self, key: str):
+        with self._lock:
+            state = self._state(key)
+            state.failures += 1
+            if state.probe is not None or (self._breaker_threshold is not None and state.failures >= self._breaker_threshold):
+                state.opened = time.monotonic()
+                state.probe = None
+
+    def delay(self, key: str, attempt: int, retry: Retry, previous: float = None) -> float | None:
+        """
+        Delay before the next attempt, None when retry budget of the step is exhausted
+        """
+        with self._lock:
+            state = self._state(key)
+            if self._budget_rate is not None:
+                now = time.monotonic()
+                state.tokens = min(self._budget_burst, state.tokens + (now - state.refilled) * self._budget_rate)
+                state.refilled = now
+                if state.tokens < 1.0:
+                    state.exhausted += 1
+                    return None
+                state.tokens -= 1.0
+            state.retries += 1
+
+        if self._jitter == 'decorrelated':
+            base = retry.timeout
+            current = random.uniform(base, max(base, (previous or base) * 3))
+        elif self._jitter == 'full':
+            current = random.uniform(0.0, retry.timeout * (retry.scale ** attempt))
+        else:
+            current = retry.timeout * (retry.scale ** attempt)
+        return min(current, self._max_delay)
@@ -0,0 +1,181 @@
+from types import FunctionType, CellType
+from inspect import signature, getsource
+from weakref import WeakKeyDictionary
+import ast, dis, textwrap
+
+from ._logger import getLogger
+from ._context import _liveness
+from ._types import Retry
+
+_logger = getLogger("orsa", True)
+
+_LOAD_OPS = {'LOAD_FAST', 'LOAD_FAST_CHECK', 'LOAD_FAST_LOAD_FAST', 'LOAD_DEREF', 'LOAD_CLASSDEREF'}
+_JUMP_OPS = set(dis.hasjrel) | set(dis.hasjabs)
+
+class _Template:
+    """
+    Compiled saga structure (steps, rollbacks, readiness and catch callbacks) captured once per entry function.
+    Every next run instantiates the structure with new closures bound to the run arguments instead of
+    re-executing the entry body.
+
+    Entry is compiled only if its body just declares steps: no control flow, no awaits, no direct use of
+    arguments, no calls other than the saga decorators and `Retry`, and the declared functions close over entry
+    arguments and other declared functions only.
+    Any other entry is executed on every run as before.
+    """
+    __slots__ = ('signature', 'positional', 'functions', 'referenced', 'steps', 'liveness', 'readiness', 'catch')
+
+    _templates: WeakKeyDictionary = WeakKeyDictionary()
+
+    def __init__(self, entry, functions, steps, readiness, catch):
+        self.signature = signature(entry)
+        self.positional = tuple(name for name, param in self.signature.parameters.items()
+                                if param.kind in (param.POSITIONAL_ONLY, param.POSITIONAL_OR_KEYWORD))
+        if len(self.positional) != len(self.signature.parameters):
+            self.positional = None
+        self.functions = functions
+        # Cells are created only for the functions which other declared functions close over
+        self.referenced = frozenset(ref for fn, recipe in functions for is_arg, ref in recipe if not is_arg)
+        self.steps = steps
+        self.liveness = _liveness([stp for stp, no in steps])
+        self.readiness = readiness
+        self.catch = catch
+
+    @classmethod
+    def of(cls, entry) -> '_Template':
+        """
+        Get compiled template of the entry, None when it is not compiled yet or entry is not compilable
+        """
+        return cls._templates.get(entry) or None
+
+    @classmethod
+    def compile(cls, saga) -> '_Template':
+        """
+        Capture structure of the saga, whose entry body has been just executed
+        """
+        entry = saga._entry
+        if entry in cls._templates:
+            return cls._templates[entry] or None
+        template = cls._templates[entry] = cls._capture(saga) or False
+        if template:
+            _logger.debug(f"Compiled template", extra={'saga' : saga._name, 'kind' : 'orchestrator '})
+        return template or None
+
+    @classmethod
+    def _capture(cls, saga):
+        entry = saga._entry
+        code = getattr(entry, '__code__', None)
+        if code is None:
+            return None
+
+        params = tuple(signature(entry).parameters)
+        if not params:
+            return None
+        allowed = {params[0]} | {name for name in code.co_varnames + code.co_cellvars if name not in params}
+        for ins in dis.get_instructions(code):
+            if ins.opcode in _JUMP_OPS or ins.opname in ('GET_AWAITABLE', 'YIELD_VALUE'):
+                return None
+            if ins.opname in _LOAD_OPS:
+                names = ins.argval if isinstance(ins.argval, tuple) else (ins.argval,)
+                for name in names:
+                    # Loading of the captured cell itself is a part of closure creation
+                    if name not in allowed and not (ins.opname != 'LOAD_DEREF' and name in code.co_cellvars):
+                        return None
+        # Side effects of the entry body would run on the first run only
+        if not cls._declares(entry, params[0]):
+            return None
+
+        declared = [stp._fn for stp in saga._steps] + [fn for fn in (saga._readiness, saga._catch) if fn is not None]
+        functions = []
+        for fn in declared:
+            if not isinstance(fn, FunctionType):
+                return None
+            if fn not in functions:
+                functions.append(fn)
+
+        recipes = []
+        for fn in functions:
+            recipe = []
+            for name, cell in zip(fn.__code__.co_freevars, fn.__closure__ or ()):
+                if name in params:
+                    recipe.append((True, name))
+                    continue
+                try:
+                    value = cell.cell_contents
+                except ValueError:
+                    return None
+                if value not in functions:
+                    return None
+                recipe.append((False, functions.index(value)))
+            recipes.append((fn, tuple(recipe)))
+
+        # Template steps must not keep results of the run they are captured from
+        steps = tuple((stp._rebind(stp._fn, {}), functions.index(stp._fn)) for stp in saga._steps)
+        readiness = functions.index(saga._readiness) if saga._readiness is not None else None
+        catch = functions.index(saga._catch) if saga._catch is not None else None
+        return cls(entry, tuple(recipes), steps, readiness, catch)
+
+    @staticmethod
+    def _declares(entry, saga: str) -> bool:
+        """
+        Entry body calls the saga decorators (`saga.step`, `saga.rollback`, ...) and `Retry` only,
+        the bodies of the declared functions are not checked
+        """
+        try:
+            tree = ast.parse(textwrap.dedent(getsource(entry)))
+        except (OSError, TypeError, SyntaxError):
+            return False
+        if not tree.body or not isinstance(tree.body[0], (ast.FunctionDef, ast.AsyncFunctionDef)):
+            return False
+        nodes = list(tree.body[0].body)
+        while nodes:
+            node = nodes.pop()
+            if isinstance(node, ast.Call):
+                fn = node.func
+                while isinstance(fn, ast.Call):
+                    fn = fn.func
+                if isinstance(fn, ast.Attribute) and isinstance(fn.value, ast.Name) and fn.value.id == saga:
+                    pass
+                elif not (isinstance(fn, ast.Name) and entry.__globals__.get(fn.id) is Retry):
+                    return False
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda)):
+                # Decorators, defaults and annotations are evaluated on declaration, the body is not
+                nodes += [*getattr(node, 'decorator_list', ()), node.args]
+                nodes += [node.returns] if getattr(node, 'returns', None) is not None else []
+            else:
+                nodes.extend(ast.iter_child_nodes(node))
+        return True
+
+    def instantiate(self, saga, args, kwargs):
+        """
+        Fill saga with steps bound to the run arguments
+        """
+        if not kwargs and self.positional is not None and len(args) + 1 == len(self.positional):
+            values = zip(self.positional, (saga, *args))
+        else:
+            bound = self.signature.bind(saga, *args, **kwargs)
+            bound.apply_defaults()
+            values = bound.arguments.items()
+        arguments = {name: CellType(value) for name, value in values}
+        cells = [CellType() if no in self.referenced else None for no in range(len(self.functions))]
+        functions = []
+        for no, (fn, recipe) in enumerate(self.functions):
+            if not recipe:
+                # Function without closure is shared by all runs, module level functions stay picklable
+                if cells[no] is not None:
+                    cells[no].cell_contents = fn
+                functions.append(fn)
+                continue
+            closure = tuple(arguments[ref] if is_arg else cells[ref] for is_arg, ref in recipe)
+            run_fn = FunctionType(fn.__code__, fn.__globals__, fn.__name__, fn.__defaults__, closure or None)
+            run_fn.__kwdefaults__ = fn.__kwdefaults__
+            run_fn.__annotations__ = fn.__annotations__
+            run_fn.__qualname__ = fn.__qualname__
+            run_fn.__module__ = fn.__module__
+            if cells[no] is not None:
+                cells[no].cell_contents = run_fn
+            functions.append(run_fn)
+
+        saga._steps = [stp._rebind(functions[no], saga._returns) for stp, no in self.steps]
+        saga._readiness = functions[self.readiness] if self.readiness is not None else None
+        saga._catch = functions[self.catch] if self.catch is not None else None
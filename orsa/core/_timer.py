@@ -0,0 +1,87 @@
+from typing import Any
+import asyncio, math, threading, time
+
+class _TimerWheel():
+    """
+    Hierarchical timer wheel: `levels` wheels of `slots` slots, the slot of the level `L` covers `tick * slots ** L` seconds.
+    Timers are placed to the coarsest level which fits and cascade down to the finer levels as the wheel turns,
+    so add and expire cost O(1) regardless of the number of timers and their delays.
+    Wheel is driven by the event loop, expired items are passed to `expire` callback on that loop
+    """
+    def __init__(self, expire, tick: float = 0.1, slots: int = 64, levels: int = 4):
+        self._expire = expire
+        self._tick = tick
+        self._slots = slots
+        self._levels = [[[] for _ in range(slots)] for _ in range(levels)]
+        self._overflow: list[tuple[int, Any]] = []
+        self._lock = threading.Lock()
+        self._origin = time.monotonic()
+        self._current = 0
+        self._count = 0
+        self._loop: asyncio.AbstractEventLoop = None
+        self._handle = None
+
+    def __len__(self) -> int:
+        return self._count
+
+    def start(self, loop: asyncio.AbstractEventLoop):
+        """
+        Start turning the wheel on the event loop, call from any thread
+        """
+        self._loop = loop
+        loop.call_soon_threadsafe(self.__turn)
+
+    def stop(self):
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+
+    def add(self, at: float, item: Any):
+        """
+        Add timer expiring at `at` by `time.monotonic()` clock
+        """
+        with self._lock:
+            self._place(max(self._current + 1, math.ceil((at - self._origin) / self._tick)), item)
+            self._count += 1
+
+    def _place(self, ticks: int, item: Any):
+        delta = ticks - self._current
+        span = self._slots
+        for level in self._levels:
+            if delta < span:
+                level[(ticks // (span // self._slots)) % self._slots].append((ticks, item))
+                return
+            span *= self._slots
+        self._overflow.append((ticks, item))
+
+    def _advance(self, now: float) -> list[Any]:
+        expired = []
+        target = int((now - self._origin) / self._tick)
+        with self._lock:
+            while self._current < target:
+                self._current += 1
+                # Cascade timers of the coarser levels whose slot is reached
+                span = 1
+                for no in range(1, len(self._levels)):
+                    span *= self._slots
+                    if self._current % span:
+                        break
+                    slot = self._levels[no][(self._current // span) % self._slots]
+                    entries, slot[:] = list(slot), []
+                    for ticks, item in entries:
+                        self._place(ticks, item)
+                else:
+                    if self._current % (span * self._slots) == 0 and self._overflow:
+                        entries, self._overflow = self._overflow, []
+                        for ticks, item in entries:
+                            self._place(ticks, item)
+                slot = self._levels[0][self._current % self._slots]
+                expired.extend(item for _, item in slot)
+                slot.clear()
+            self._count -= len(expired)
+        return expired
+
+    def __turn(self):
+        self._handle = self._loop.call_later(self._tick, self.__turn)
+        for item in self._advance(time.monotonic()):
+            self._expire(item)
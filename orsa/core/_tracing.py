@@ -0,0 +1,159 @@
+from contextvars import ContextVar
+from typing import Any
+import itertools, threading, time
+
+class Span():
+    """
+    No-op span, base class of the tracer spans
+    """
+    __slots__ = ()
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def record_exception(self, ex: BaseException) -> None:
+        pass
+
+    def end(self) -> None:
+        pass
+
+class Tracer():
+    """
+    No-op tracer, base class of the tracers. Orchestrator opens spans for saga run, step, attempt,
+    rollback and store call, `parent` is the enclosing span or None for the root one.
+    Tracer is installed with `orsa.set_tracer()`, spans are not created at all while no tracer is installed
+    """
+    def start_span(self, name: str, parent: Span = None, attributes: dict[str,Any] = None) -> Span:
+        return _NOOP_SPAN
+
+_NOOP_SPAN = Span()
+
+_active: Tracer = None
+_current: ContextVar[Span] = ContextVar('orsa_span', default=None)
+
+def set_tracer(tracer: Tracer | None) -> None:
+    """
+    Install tracer of the orchestrator, None or no-op `Tracer` disables tracing
+    """
+    global _active
+    _active = tracer if tracer is not None and type(tracer) is not Tracer else None
+
+def get_tracer() -> Tracer:
+    return _active if _active is not None else Tracer()
+
+def current_span() -> Span | None:
+    """
+    Get span of the running saga, step or attempt
+    """
+    return _current.get()
+
+def _start(name: str, attributes: dict[str,Any] = None, parent: Span = None) -> Span | None:
+    """
+    Start span under the current one, None when tracing is disabled
+    """
+    if _active is None:
+        return None
+    return _active.start_span(name, parent if parent is not None else _current.get(), attributes)
+
+class RecordedSpan(Span):
+    """
+    Span recorded by `InMemoryTracer`
+    """
+    __slots__ = ('name', 'span_id', 'parent_id', 'attributes', 'start', 'finish', 'error', '_tracer')
+
+    def __init__(self, tracer: 'InMemoryTracer', name: str, span_id: int, parent_id: int | None, attributes: dict[str,Any]):
+        self._tracer = tracer
+        self.name = name
+        self.span_id = span_id
+        self.parent_id = parent_id
+        self.attributes = dict(attributes) if attributes else {}
+        self.start = time.perf_counter()
+        self.finish = None
+        self.error = None
+
+    @property
+    def duration(self) -> float | None:
+        return self.finish - self.start if self.finish is not None else None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def record_exception(self, ex: BaseException) -> None:
+        self.error = ex
+
+    def end(self) -> None:
+        if self.finish is None:
+            self.finish = time.perf_counter()
+            self._tracer._record(self)
+
+    def __repr__(self) -> str:
+        return f"RecordedSpan({self.name!r}, id={self.span_id}, parent={self.parent_id}, duration={self.duration})"
+
+class InMemoryTracer(Tracer):
+    """
+    Tracer keeping finished spans in memory, for tests and latency breakdowns
+
+    Examples:
+        tracer = InMemoryTracer()
+        orsa.set_tracer(tracer)
+        ...
+        for span in tracer.children(tracer.find('saga payment')[0]):
+            print(span.name, span.duration)
+    """
+    def __init__(self):
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self.spans: list[RecordedSpan] = []
+
+    def start_span(self, name: str, parent: Span = None, attributes: dict[str,Any] = None) -> RecordedSpan:
+        return RecordedSpan(self, name, next(self._ids), getattr(parent, 'span_id', None), attributes)
+
+    def _record(self, span: RecordedSpan):
+        with self._lock:
+            self.spans.append(span)
+
+    def find(self, name: str) -> list[RecordedSpan]:
+        return [span for span in self.spans if span.name == name]
+
+    def children(self, span: RecordedSpan) -> list[RecordedSpan]:
+        return sorted((child for child in self.spans if child.parent_id == span.span_id), key=lambda child: child.start)
+
+    def clear(self):
+        with self._lock:
+            self.spans.clear()
+
+class _OpenTelemetrySpan(Span):
+    __slots__ = ('span',)
+
+    def __init__(self, span):
+        self.span = span
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.span.set_attribute(key, value)
+
+    def record_exception(self, ex: BaseException) -> None:
+        from opentelemetry.trace import Status, StatusCode
+        self.span.record_exception(ex)
+        self.span.set_status(Status(StatusCode.ERROR, str(ex)))
+
+    def end(self) -> None:
+        self.span.end()
+
+class OpenTelemetryTracer(Tracer):
+    """
+    Adapter of OpenTelemetry tracer (`opentelemetry-api` package is required)
+
+    Examples:
+        orsa.set_tracer(OpenTelemetryTracer(opentelemetry.trace.get_tracer('orsa')))
+    """
+    def __init__(self, tracer = None):
+        try:
+            from opentelemetry import trace
+        except ImportError as ex:
+            raise ImportError("OpenTelemetryTracer requires `opentelemetry-api` package") from ex
+        self._trace = trace
+        self._tracer = tracer if tracer is not None else trace.get_tracer('orsa')
+
+    def start_span(self, name: str, parent: Span = None, attributes: dict[str,Any] = None) -> Span:
+        context = self._trace.set_span_in_context(parent.span) if isinstance(parent, _OpenTelemetrySpan) else None
+        return _OpenTelemetrySpan(self._tracer.start_span(name, context=context, attributes=attributes))
@@ -7,8 +7,47 @@ Definition of the parameters for step retry algorithm
 """
 Retry = NamedTuple("Retry", [('count', int), ('timeout', float), ('scale', float)])
 
+"""
+Outcome of the rollback executed on saga abort
+"""
+RollbackInfo = NamedTuple("RollbackInfo", [('name', str), ('step', str), ('elapsed', float), ('error', Exception)])
+
 T = TypeVar('T')
 
+class _Parked(Exception):
+    """
+    Saga is parked by the manager until the retry time of the step, it is not a failure of the saga
+    """
+
+class DeadlineExceeded(TimeoutError):
+    """
+    Saga is not finished before its deadline, the step in flight is cancelled and the saga is rolled back
+    """
+
+class Released(str):
+    """
+    Tombstone of the step result which no later step or rollback reads, the step stays completed on restore.
+    Stores without pickle deliver it back as the plain string `'@released'`
+    """
+    __slots__ = ()
+
+RELEASED = Released('@released')
+
+class BlobRef(str):
+    """
+    Handle of the large step result written out-of-line to the `BlobStore` of the manager, `@blob:<digest>.<format>`.
+    Result is read from the blob when a later step takes it through `Result[...]`
+    """
+    __slots__ = ()
+
+    @property
+    def digest(self) -> str:
+        return self[6:].partition('.')[0]
+
+    @property
+    def format(self) -> str:
+        return self.partition('.')[2]
+
 class Result(Generic[T]):
     """
     Custom type for Annotated like syntaxis support for pass previous result to saga step
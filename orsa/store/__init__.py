@@ -0,0 +1,10 @@
+"""
+Saga state stores for Manager
+"""
+from ._base import Store
+from ._journal import JournalStore
+from ._sqlite import SQLiteStore
+from ._codec import StateCodec, PickleCodec, MsgpackCodec
+from ._blob import BlobStore, BlobInfo
+
+__all__ = ['Store', 'JournalStore', 'SQLiteStore', 'StateCodec', 'PickleCodec', 'MsgpackCodec', 'BlobStore', 'BlobInfo']
@@ -0,0 +1,40 @@
+from typing import Any
+
+class Store():
+    """
+    Base class of the Saga state store, attached to manager with `Manager(store=...)`.
+    Store is called before `saga.store`, `saga.complete` and `saga.abort` callbacks and
+    incomplete sagas returned by `load` are restored on manager startup
+    """
+    async def save(self, saga) -> None:
+        """
+        Persist Saga state after it is scheduled and after every step
+        """
+
+    async def save_many(self, sagas: list) -> None:
+        """
+        Persist states of the batch of dirty sagas
+        """
+        for saga in sagas:
+            await self.save(saga)
+
+    async def complete(self, saga) -> None:
+        """
+        Saga is executing complete with success state
+        """
+
+    async def abort(self, saga, ex: Exception) -> None:
+        """
+        Saga abort execution
+        """
+
+    async def load(self) -> list[dict[str,Any]]:
+        """
+        Load states of incomplete sagas
+        """
+        return []
+
+    def close(self) -> None:
+        """
+        Release store resources, called on manager shutdown
+        """
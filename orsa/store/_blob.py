@@ -0,0 +1,298 @@
+from typing import Any, NamedTuple
+from uuid import UUID
+import asyncio, hashlib, mmap, os, pathlib, threading
+
+from ._codec import PickleCodec
+from ..core._logger import getLogger
+from ..core._types import BlobRef, Released
+
+_logger = getLogger("orsa", True)
+
+BlobInfo = NamedTuple("BlobInfo", [('blobs', int), ('sagas', int), ('written', int), ('reused', int), ('collected', int)])
+
+# Format of the blob: type of the raw result or the pickle stream
+_BYTES = 'bytes'
+_BYTEARRAY = 'bytearray'
+_VIEW = 'view'
+_TEXT = 'text'
+_PICKLE = 'pickle'
+
+_RAW = (_BYTES, _BYTEARRAY, _VIEW, _TEXT)
+
+# Nodes of the result visited to estimate its size before it is pickled
+_WALK = 256
+
+def _estimate(value: Any, limit: int) -> int | None:
+    """
+    Estimate of the pickled size of the result, stops at `limit`. None when the result is too large to walk
+    or holds the objects measured only by pickle
+    """
+    size, budget, stack = 0, _WALK, [value]
+    while stack:
+        item = stack.pop()
+        budget -= 1
+        if budget < 0:
+            return None
+        if item is None or isinstance(item, (bool, int, float, complex, Released)):
+            size += 9
+        elif isinstance(item, str):
+            size += 5 + (len(item) if item.isascii() else 4 * len(item))
+        elif isinstance(item, (bytes, bytearray)):
+            size += 5 + len(item)
+        elif isinstance(item, dict):
+            if 2 * len(item) > budget:
+                return None
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            if len(item) > budget:
+                return None
+            stack.extend(item)
+        elif type(item).__reduce_ex__ is object.__reduce_ex__ and hasattr(item, '__dict__') and not hasattr(item, '__slots__'):
+            stack.append(vars(item))
+        else:
+            return None
+        if size >= limit:
+            return size
+    return size
+
+class BlobStore():
+    """
+    Content-addressed area of the large step results on the local disk, attached with `Manager(blobs=...)`.
+    Step result of at least `threshold` bytes is written once to the file named by its digest and the saga state keeps
+    only `BlobRef` handle, so state writes stay small whatever the result size. Small results of the plain types are
+    measured without pickle, the result which can not be pickled is kept inline. Handles written for the saga are listed
+    in its index file, so the stores without pickle restore them from the plain strings.
+
+    Later step reads the result lazily through `Result[...]` from the memory-mapped file: parameter annotated with
+    `memoryview` or `mmap.mmap` gets the read-only view without copy, out-of-band buffers of the pickled values (numpy arrays)
+    are mapped without copy as well. Blob is removed when the last saga referencing it completes or aborts,
+    blobs of no stored saga are removed when the manager with the built-in store is started
+
+    Examples:
+        manager = Manager(store=JournalStore('./saga.journal'), blobs=BlobStore('./saga.blobs', threshold=256 * 1024))
+
+        @saga.step
+        async def rates() -> bytes:
+            ...
+
+        @saga.step
+        async def price(table: Result[memoryview, rates]) -> float:
+            ...
+    """
+    def __init__(self, path: str | pathlib.Path, threshold: int = 1024 * 1024, fsync: bool = False):
+        if threshold < 1:
+            raise ValueError(f"threshold must be positive, got {threshold}")
+        self._path = pathlib.Path(path)
+        self._path.mkdir(parents=True, exist_ok=True)
+        self._threshold = threshold
+        self._fsync = fsync
+        self._codec = PickleCodec()
+        self._lock = threading.Lock()
+        self._refs: dict[str, set[UUID]] = {}
+        self._owned: dict[UUID, set[str]] = {}
+        self._written = 0
+        self._reused = 0
+        self._collected = 0
+
+    def _file(self, digest: str) -> pathlib.Path:
+        return self._path / digest[:2] / digest[2:]
+
+    def _index(self, uid: UUID) -> pathlib.Path:
+        return self._path / 'sagas' / str(uid)
+
+    def _encode(self, value: Any) -> tuple[str, Any] | None:
+        """
+        Format and data of the result to write out-of-line, None when the result is kept inline
+        """
+        if value is None or isinstance(value, (bool, int, float, Released, BlobRef)):
+            return None
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            data = memoryview(value)
+            fmt = _BYTES if isinstance(value, bytes) else _BYTEARRAY if isinstance(value, bytearray) else _VIEW
+        elif isinstance(value, str):
+            # UTF-8 is never shorter than the number of characters
+            if len(value) < self._threshold:
+                return None
+            data, fmt = memoryview(value.encode()), _TEXT
+        else:
+            size = _estimate(value, self._threshold)
+            if size is not None and size < self._threshold:
+                return None
+            try:
+                data, fmt = memoryview(self._codec.encode(value)), _PICKLE
+            except Exception as ex:
+                _logger.debug(f"Result of type {type(value).__name__} is kept inline: {ex}", extra={'kind': 'blobs'})
+                return None
+        if data.nbytes < self._threshold:
+            return None
+        return fmt, data
+
+    async def offload(self, uid: UUID, value: Any, step: str = None) -> Any:
+        """
+        Write the large result of the saga `uid` to the blob area, returns `BlobRef` or the result itself when it is small.
+        Handle of the `step` result is listed in the index of the saga
+        """
+        encoded = self._encode(value)
+        if encoded is None:
+            return value
+        fmt, data = encoded
+        digest = hashlib.blake2b(data, digest_size=20).hexdigest()
+        path = self._file(digest)
+        with self._lock:
+            self._acquire(uid, digest)
+            exists = path.exists()
+            if exists:
+                self._reused += 1
+        ref = BlobRef(f'@blob:{digest}.{fmt}')
+        # Same content written by concurrent sagas is replaced by the equal one
+        await asyncio.to_thread(self.__write, None if exists else path, data, uid, step, ref)
+        if not exists:
+            with self._lock:
+                self._written += 1
+        return ref
+
+    def __write(self, path: pathlib.Path | None, data: memoryview, uid: UUID, step: str | None, ref: BlobRef):
+        if path is not None:
+            path.parent.mkdir(exist_ok=True)
+            tmp = path.with_name(f'{path.name}.{os.getpid()}.{threading.get_ident()}.tmp')
+            with open(tmp, 'wb') as fd:
+                fd.write(data)
+                if self._fsync:
+                    fd.flush()
+                    os.fsync(fd.fileno())
+            tmp.replace(path)
+        if step is not None:
+            index = self._index(uid)
+            index.parent.mkdir(exist_ok=True)
+            # Line is appended at once, the last line of the step wins
+            with open(index, 'a', encoding='utf-8') as fd:
+                fd.write(f'{step}\t{ref}\n')
+                if self._fsync:
+                    fd.flush()
+                    os.fsync(fd.fileno())
+
+    def handles(self, uid: UUID) -> dict[str, BlobRef]:
+        """
+        Handles of the step results written for the saga `uid`, read from its index
+        """
+        try:
+            with open(self._index(uid), encoding='utf-8') as fd:
+                lines = fd.read().splitlines()
+        except FileNotFoundError:
+            return {}
+        handles = {}
+        for line in lines:
+            step, _, ref = line.partition('\t')
+            if ref.startswith('@blob:'):
+                handles[step] = BlobRef(ref)
+        return handles
+
+    def load(self, ref: BlobRef, hint: type = None) -> Any:
+        """
+        Read the result from the memory-mapped blob, `hint` is the type annotation of the step parameter
+        """
+        fmt = ref.format
+        with open(self._file(ref.digest), 'rb') as fd:
+            size = os.fstat(fd.fileno()).st_size
+            mapped = mmap.mmap(fd.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+        view = memoryview(mapped) if mapped is not None else memoryview(b'')
+        if fmt in _RAW:
+            if hint is mmap.mmap and mapped is not None:
+                return mapped
+            if hint is memoryview or fmt == _VIEW:
+                return view
+            if fmt == _TEXT:
+                return str(view, 'utf-8')
+            return bytearray(view) if fmt == _BYTEARRAY else bytes(view)
+        return self._codec.decode(view)
+
+    def _acquire(self, uid: UUID, digest: str):
+        self._refs.setdefault(digest, set()).add(uid)
+        self._owned.setdefault(uid, set()).add(digest)
+
+    def acquire(self, uid: UUID, returns: dict[str,Any]):
+        """
+        Reference the blobs of the restored saga results, handles restored as plain strings are replaced by `BlobRef`.
+        Only the results listed in the index of the saga are handles, released results are not referenced
+        """
+        if returns is None:
+            return
+        digests = []
+        for step, ref in self.handles(uid).items():
+            if step in returns and type(returns[step]) in (str, BlobRef) and returns[step] == ref:
+                returns[step] = ref
+                digests.append(ref.digest)
+        if digests:
+            with self._lock:
+                for digest in digests:
+                    self._acquire(uid, digest)
+
+    def release(self, uid: UUID) -> int:
+        """
+        Drop the references of the finished saga, blobs of no other saga are removed. Returns number of removed blobs
+        """
+        removed = 0
+        with self._lock:
+            self.__unlink(self._index(uid))
+            for digest in self._owned.pop(uid, ()):
+                refs = self._refs.get(digest)
+                if refs is not None:
+                    refs.discard(uid)
+                    if refs:
+                        continue
+                    del self._refs[digest]
+                removed += self.__remove(digest)
+            self._collected += removed
+        return removed
+
+    def sweep(self, states: list[dict[str,Any]]) -> int:
+        """
+        Reference the blobs of the stored sagas and remove the blobs referenced by no saga. Returns number of removed blobs
+        """
+        uids = set()
+        for state in states:
+            if state.get('@uid') is not None:
+                uids.add(str(state['@uid']))
+                self.acquire(state['@uid'], state.get('@returns'))
+        for index in self._path.glob('sagas/*'):
+            if index.name not in uids:
+                self.__unlink(index)
+        removed = 0
+        for path in self._path.glob('??/*'):
+            if path.name.endswith('.tmp'):
+                continue
+            with self._lock:
+                digest = path.parent.name + path.name
+                if digest not in self._refs:
+                    removed += self.__remove(digest)
+        with self._lock:
+            self._collected += removed
+        if removed:
+            _logger.debug(f"Removed {removed} unreferenced blobs", extra={'kind': 'blobs'})
+        return removed
+
+    @staticmethod
+    def __unlink(path: pathlib.Path):
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+        except OSError as ex:
+            _logger.warning(f"Blob index {path.name} is not removed: {ex}", extra={'kind': 'blobs'})
+
+    def __remove(self, digest: str) -> int:
+        try:
+            self._file(digest).unlink()
+            return 1
+        except FileNotFoundError:
+            return 0
+        except OSError as ex:
+            # Blob mapped by a running step can not be removed on some platforms, the next sweep removes it
+            _logger.warning(f"Blob {digest} is not removed: {ex}", extra={'kind': 'blobs'})
+            return 0
+
+    @property
+    def info(self) -> BlobInfo:
+        with self._lock:
+            return BlobInfo(len(self._refs), len(self._owned), self._written, self._reused, self._collected)
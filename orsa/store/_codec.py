@@ -0,0 +1,239 @@
+from collections.abc import Mapping
+from dataclasses import fields, is_dataclass
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from enum import Enum
+from typing import Any
+from uuid import UUID
+import importlib, pickle, struct
+
+from ..core._types import Released, BlobRef
+
+class StateCodec():
+    """
+    Binary codec of the saga state (`saga.state`) and of the store records, used by `JournalStore` and `SQLiteStore`
+    and available for the custom stores of `saga.store` callback
+
+    Examples:
+        codec = PickleCodec()
+
+        @manager.saga.store
+        async def _store(self, saga):
+            await db.put(saga.uid, codec.encode(saga.state))
+    """
+    def encode(self, state: Any) -> bytes:
+        raise NotImplementedError()
+
+    def decode(self, data: bytes | memoryview) -> Any:
+        raise NotImplementedError()
+
+_OOB_MAGIC = b'O5'
+_OOB_HEADER = struct.Struct('<2sII')
+_OOB_SIZE = struct.Struct('<Q')
+
+class PickleCodec(StateCodec):
+    """
+    Pickle protocol 5 codec, default codec of the stores. Objects reduced to `pickle.PickleBuffer` (numpy arrays and the like)
+    are written out-of-band after the pickle stream and restored from the views of the encoded data without copy.
+    Data without out-of-band buffers is the plain pickle stream, so states written by the previous versions are read as is
+    """
+    def encode(self, state: Any) -> bytes:
+        buffers: list[pickle.PickleBuffer] = []
+        data = pickle.dumps(state, protocol=5, buffer_callback=buffers.append)
+        if not buffers:
+            return data
+        views = [buffer.raw() for buffer in buffers]
+        return b''.join([_OOB_HEADER.pack(_OOB_MAGIC, len(views), len(data)),
+                         *(_OOB_SIZE.pack(view.nbytes) for view in views), data, *views])
+
+    def decode(self, data: bytes | memoryview) -> Any:
+        view = memoryview(data)
+        if bytes(view[:2]) != _OOB_MAGIC:
+            return pickle.loads(view)
+        _, count, size = _OOB_HEADER.unpack_from(view)
+        pos = _OOB_HEADER.size
+        sizes = [_OOB_SIZE.unpack_from(view, pos + no * _OOB_SIZE.size)[0] for no in range(count)]
+        pos += count * _OOB_SIZE.size
+        stream, pos = view[pos: pos + size], pos + size
+        buffers = []
+        for nbytes in sizes:
+            buffers.append(view[pos: pos + nbytes])
+            pos += nbytes
+        return pickle.loads(stream, buffers=buffers)
+
+# Extension types of the msgpack codec
+_EXT_UUID = 1
+_EXT_DATETIME = 2
+_EXT_DATE = 3
+_EXT_TIME = 4
+_EXT_TIMEDELTA = 5
+_EXT_DECIMAL = 6
+_EXT_TUPLE = 7
+_EXT_SET = 8
+_EXT_FROZENSET = 9
+_EXT_RELEASED = 10
+_EXT_ENUM = 11
+_EXT_OBJECT = 12
+_EXT_BLOB = 13
+
+# Containers packed inline after the empty extension type of their code
+_INLINE = frozenset((_EXT_TIMEDELTA, _EXT_TUPLE, _EXT_SET, _EXT_FROZENSET))
+
+class _Mark():
+    """
+    Decoded header of the value packed inline as the array of the header and the value fields,
+    `build` restores the value from the array
+    """
+    __slots__ = ('build',)
+
+    def __init__(self, build):
+        self.build = build
+
+class MsgpackCodec(StateCodec):
+    """
+    MessagePack codec (`msgpack` package is required, `pip install orsa[msgpack]`), state is readable by the services
+    written in other languages. Besides the msgpack types it keeps tuples, sets, `UUID`, `datetime`, `date`, `time`,
+    `timedelta`, `Decimal`, enums, named tuples, dataclasses, pydantic models (restored by `model_validate`) and result handles,
+    other mappings and lists (`OrderedDict`, `Counter`) are restored as dict and list.
+    Classes are referenced by the module and the qualified name, so they must be declared at module level.
+
+    Scalars are the extension types of UTF-8 text, containers are packed inline as the array led by the empty extension
+    type of the container, objects as the array of the extension type `module:qualname` and the fields, so the nested
+    values are packed and unpacked in one pass
+    """
+    def __init__(self):
+        try:
+            import msgpack
+        except ImportError as ex:
+            raise ImportError("MsgpackCodec requires `msgpack` package") from ex
+        self._msgpack = msgpack
+        self._packers: dict[type, Any] = {}
+        self._headers = {code: msgpack.ExtType(code, b'') for code in _INLINE}
+        self._marks = {_EXT_TUPLE: _Mark(lambda items: tuple(items[1:])),
+                       _EXT_SET: _Mark(lambda items: set(items[1:])),
+                       _EXT_FROZENSET: _Mark(lambda items: frozenset(items[1:])),
+                       _EXT_TIMEDELTA: _Mark(lambda items: timedelta(items[1], items[2], items[3]))}
+        self._classes: dict[bytes, _Mark] = {}
+        self._scalars = {_EXT_UUID: lambda data: UUID(bytes=data),
+                         _EXT_DATETIME: lambda data: datetime.fromisoformat(data.decode()),
+                         _EXT_DATE: lambda data: date.fromisoformat(data.decode()),
+                         _EXT_TIME: lambda data: time.fromisoformat(data.decode()),
+                         _EXT_DECIMAL: lambda data: Decimal(data.decode()),
+                         _EXT_RELEASED: lambda data: Released(data.decode()),
+                         _EXT_BLOB: lambda data: BlobRef(data.decode())}
+
+    def encode(self, state: Any) -> bytes:
+        return self._msgpack.packb(state, default=self.__default, use_bin_type=True, strict_types=True)
+
+    def decode(self, data: bytes | memoryview) -> Any:
+        return self._msgpack.unpackb(data, ext_hook=self.__ext, list_hook=self.__list, raw=False, strict_map_key=False)
+
+    def __text(self, code: int):
+        return lambda obj: self._msgpack.ExtType(code, str(obj).encode())
+
+    def __default(self, obj: Any):
+        # Strict types: subclasses of the msgpack types (Released, IntEnum, named tuples) are passed here as well
+        pack = self._packers.get(type(obj))
+        if pack is None:
+            pack = self._packers[type(obj)] = self.__packer(type(obj))
+        return pack(obj)
+
+    def __packer(self, cls: type):
+        """
+        Converter of the objects of the class to the extension type or the inline array, resolved once per class
+        """
+        if issubclass(cls, Released):
+            return self.__text(_EXT_RELEASED)
+        if issubclass(cls, BlobRef):
+            return self.__text(_EXT_BLOB)
+        if issubclass(cls, Enum):
+            header = self.__class_header(_EXT_ENUM, cls)
+            return lambda obj: [header, obj.value]
+        if issubclass(cls, UUID):
+            return lambda obj: self._msgpack.ExtType(_EXT_UUID, obj.bytes)
+        for base, code in ((datetime, _EXT_DATETIME), (date, _EXT_DATE), (time, _EXT_TIME)):
+            if issubclass(cls, base):
+                return lambda obj, code=code: self._msgpack.ExtType(code, obj.isoformat().encode())
+        if issubclass(cls, timedelta):
+            header = self._headers[_EXT_TIMEDELTA]
+            return lambda obj: [header, obj.days, obj.seconds, obj.microseconds]
+        if issubclass(cls, Decimal):
+            return self.__text(_EXT_DECIMAL)
+        if cls is tuple:
+            header = self._headers[_EXT_TUPLE]
+            return lambda obj: [header, *obj]
+        if issubclass(cls, tuple) and hasattr(cls, '_fields'):
+            header = self.__class_header(_EXT_OBJECT, cls)
+            return lambda obj: [header, obj._asdict()]
+        if issubclass(cls, (set, frozenset)):
+            header = self._headers[_EXT_SET if issubclass(cls, set) else _EXT_FROZENSET]
+            return lambda obj: [header, *obj]
+        if is_dataclass(cls):
+            header, names = self.__class_header(_EXT_OBJECT, cls), [field.name for field in fields(cls)]
+            return lambda obj: [header, {name: getattr(obj, name) for name in names}]
+        if hasattr(cls, 'model_dump') and hasattr(cls, 'model_validate'):
+            header = self.__class_header(_EXT_OBJECT, cls)
+            return lambda obj: [header, obj.model_dump()]
+        if issubclass(cls, (bytearray, memoryview)):
+            return bytes
+        if issubclass(cls, Mapping):
+            return dict
+        if issubclass(cls, list):
+            return list
+        raise TypeError(f"Object of type {cls.__qualname__} can not be encoded by MsgpackCodec")
+
+    def __class_header(self, code: int, cls: type):
+        """
+        Extension type of the class, the class is referenced by the module and the qualified name
+        """
+        if '<locals>' in cls.__qualname__:
+            raise TypeError(f"Class `{cls.__qualname__}` is a local class and can not be decoded, declare it at module level")
+        return self._msgpack.ExtType(code, f'{cls.__module__}:{cls.__qualname__}'.encode())
+
+    def __class_mark(self, data: bytes) -> _Mark:
+        """
+        Header of the class instances, the class is resolved once
+        """
+        mark = self._classes.get(data)
+        if mark is None:
+            module, _, qualname = data.decode().partition(':')
+            cls = importlib.import_module(module)
+            for name in qualname.split('.'):
+                cls = getattr(cls, name)
+            build = self.__constructor(cls)
+            mark = self._classes[data] = _Mark(lambda items: build(items[1]))
+        return mark
+
+    @staticmethod
+    def __constructor(cls: type):
+        if issubclass(cls, Enum):
+            return cls
+        if hasattr(cls, 'model_validate'):
+            return cls.model_validate
+        if is_dataclass(cls):
+            init = frozenset(field.name for field in fields(cls) if field.init)
+            def build(values: dict[str,Any]):
+                if init.issuperset(values):
+                    return cls(**values)
+                obj = cls(**{name: value for name, value in values.items() if name in init})
+                for name, value in values.items():
+                    if name not in init:
+                        object.__setattr__(obj, name, value)
+                return obj
+            return build
+        return lambda values: cls(**values)
+
+    def __ext(self, code: int, data: bytes):
+        decode = self._scalars.get(code)
+        if decode is not None:
+            return decode(data)
+        if code == _EXT_OBJECT or code == _EXT_ENUM:
+            return self.__class_mark(data)
+        mark = self._marks.get(code)
+        return mark if mark is not None and not data else self._msgpack.ExtType(code, data)
+
+    @staticmethod
+    def __list(items: list):
+        if items and type(items[0]) is _Mark:
+            return items[0].build(items)
+        return items
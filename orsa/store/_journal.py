@@ -0,0 +1,261 @@
+from typing import Any
+from uuid import UUID
+import asyncio, concurrent.futures, os, pathlib, struct, threading
+
+from ._base import Store
+from ._codec import StateCodec, PickleCodec
+from ..core._logger import getLogger
+from ..core._types import Released
+
+_logger = getLogger("orsa", True)
+
+_FRAME = struct.Struct('<I')
+
+_BEGIN = 'B'
+_STEP = 'S'
+_RETRY = 'R'
+_COMPLETE = 'C'
+_ABORT = 'A'
+
+class JournalStore(Store):
+    """
+    Append-only saga journal. Every record is a compact delta: saga header when it is scheduled,
+    one record per step result, released result or retry schedule change and one for completion or abort, so the cost of a write
+    does not depend on the number of in-flight sagas.
+
+    Journal is split to segments, after `snapshot_every` segments the states of in-flight sagas are
+    written to snapshot and the older segments are removed. Records and snapshots are encoded by `codec`,
+    the journal must be read with the codec it is written by. Records are written by the writer thread, records queued
+    by the shards meanwhile are written and flushed at once, so file I/O and compaction never block the event loops
+
+    Examples:
+        manager = Manager(store=JournalStore('./saga.journal'))
+    """
+    def __init__(self, path: str | pathlib.Path, segment_size: int = 16 * 1024 * 1024, snapshot_every: int = 4, fsync: bool = False,
+                 codec: StateCodec = None):
+        self._path = pathlib.Path(path)
+        self._path.mkdir(parents=True, exist_ok=True)
+        self._segment_size = segment_size
+        self._snapshot_every = max(1, snapshot_every)
+        self._fsync = fsync
+        self._codec = codec if codec is not None else PickleCodec()
+        self._lock = threading.Lock()
+        self._sagas: dict[UUID, dict[str,Any]] = {}
+        self._written: dict[UUID, set[str]] = {}
+        self._retries: dict[UUID, dict] = {}
+        self._released: dict[UUID, set[str]] = {}
+        self._segment = None
+        self._segment_no = 0
+        self._segments = 0
+        self._cond = threading.Condition()
+        self._queue: list[tuple[bytes, concurrent.futures.Future]] = []
+        self._closed = False
+        self._thread = threading.Thread(target=self.__writer, daemon=True, name='@journal-store')
+        self._thread.start()
+
+    def _segments_list(self) -> list[tuple[int, pathlib.Path]]:
+        return sorted((int(p.stem.split('.')[-1]), p) for p in self._path.glob('journal.*.log'))
+
+    def _snapshots_list(self) -> list[tuple[int, pathlib.Path]]:
+        return sorted((int(p.stem.split('.')[-1]), p) for p in self._path.glob('snapshot.*.bin'))
+
+    def _open_segment(self, no: int):
+        if self._segment is not None:
+            self._segment.close()
+        self._segment_no = no
+        self._segment = open(self._path / f'journal.{no:08d}.log', 'ab')
+
+    def _append(self, *records) -> concurrent.futures.Future:
+        """
+        Queue records to the writer thread, records are encoded by the caller to capture the current state
+        """
+        data = b''.join(_FRAME.pack(len(payload)) + payload for payload in map(self._codec.encode, records))
+        waiter = concurrent.futures.Future()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Store is closed")
+            self._queue.append((data, waiter))
+            self._cond.notify()
+        return waiter
+
+    def __writer(self):
+        while True:
+            with self._cond:
+                while not self._queue and not self._closed:
+                    self._cond.wait()
+                if not self._queue and self._closed:
+                    break
+                batch, self._queue = self._queue, []
+            try:
+                with self._lock:
+                    if self._segment is None:
+                        self._open_segment(self._segment_no + 1)
+                    self._segment.write(b''.join(data for data, _ in batch))
+                    self._segment.flush()
+                    if self._fsync:
+                        os.fsync(self._segment.fileno())
+                error = None
+            except Exception as ex:
+                _logger.error(f"Write of {len(batch)} records failed", exc_info=ex, extra={'kind': 'journal'})
+                error = ex
+            for _, waiter in batch:
+                if error is None:
+                    waiter.set_result(True)
+                else:
+                    waiter.set_exception(error)
+            try:
+                with self._lock:
+                    if self._segment is not None and self._segment.tell() >= self._segment_size:
+                        self._roll()
+            except Exception as ex:
+                _logger.error(f"Journal compaction failed", exc_info=ex, extra={'kind': 'journal'})
+
+    def _roll(self):
+        """
+        Start new segment and take snapshot when enough segments are written
+        """
+        self._segments += 1
+        self._open_segment(self._segment_no + 1)
+        if self._segments >= self._snapshot_every:
+            self._snapshot()
+
+    def _snapshot(self):
+        """
+        Write in-flight sagas to snapshot and remove segments covered by it
+        """
+        no = self._segment_no
+        states = {uid: {**state, '@returns': dict(state.get('@returns', {})), '@retry': dict(state.get('@retry') or {})}
+                  for uid, state in list(self._sagas.items())}
+        tmp = self._path / f'snapshot.{no:08d}.tmp'
+        with open(tmp, 'wb') as fd:
+            fd.write(self._codec.encode(states))
+            fd.flush()
+            os.fsync(fd.fileno())
+        tmp.replace(self._path / f'snapshot.{no:08d}.bin')
+        for seg_no, seg in self._segments_list():
+            if seg_no < no:
+                seg.unlink(missing_ok=True)
+        for snap_no, snap in self._snapshots_list():
+            if snap_no < no:
+                snap.unlink(missing_ok=True)
+        self._segments = 0
+        _logger.debug(f"Snapshot {no} with {len(states)} sagas", extra={'kind': 'journal'})
+
+    def _records(self, saga) -> list[tuple]:
+        """
+        Delta records of the saga since the last save
+        """
+        state = saga.state
+        uid = saga.uid
+        returns = state.get('@returns', {})
+        retry = dict(state.get('@retry') or {})
+        written = self._written.get(uid)
+        if written is None:
+            self._written[uid] = set(returns)
+            self._retries[uid] = retry
+            self._released[uid] = {name for name, value in list(returns.items()) if type(value) is Released}
+            self._sagas[uid] = state
+            return [(_BEGIN, uid, {**state, '@returns': dict(returns), '@retry': retry})]
+        # Restored saga builds own state dict, the snapshot must see its retry schedule and results
+        self._sagas[uid] = state
+        records = []
+        if len(written) != len(returns):
+            records = [(_STEP, uid, (name, value)) for name, value in list(returns.items()) if name not in written]
+            written.update(name for _, _, (name, _) in records)
+        # Released result is written as the step record with the tombstone, replay drops the value
+        released = self._released[uid]
+        for name, value in list(returns.items()):
+            if type(value) is Released and name not in released:
+                if not any(record[2][0] == name for record in records):
+                    records.append((_STEP, uid, (name, value)))
+                released.add(name)
+        if retry != self._retries.get(uid):
+            self._retries[uid] = retry
+            records.append((_RETRY, uid, retry))
+        return records
+
+    async def save(self, saga) -> None:
+        records = self._records(saga)
+        if records:
+            await asyncio.wrap_future(self._append(*records))
+
+    async def save_many(self, sagas: list) -> None:
+        records = [record for saga in sagas for record in self._records(saga)]
+        if records:
+            await asyncio.wrap_future(self._append(*records))
+
+    async def complete(self, saga) -> None:
+        self._forget(saga.uid)
+        await asyncio.wrap_future(self._append((_COMPLETE, saga.uid, None)))
+
+    async def abort(self, saga, ex: Exception) -> None:
+        self._forget(saga.uid)
+        await asyncio.wrap_future(self._append((_ABORT, saga.uid, None)))
+
+    def _forget(self, uid: UUID):
+        self._sagas.pop(uid, None)
+        self._written.pop(uid, None)
+        self._retries.pop(uid, None)
+        self._released.pop(uid, None)
+
+    async def load(self) -> list[dict[str,Any]]:
+        """
+        Rebuild in-flight sagas from the last snapshot and the segments written after it
+        """
+        with self._lock:
+            sagas: dict[UUID, dict[str,Any]] = {}
+            snapshots = self._snapshots_list()
+            first = 0
+            if snapshots:
+                first, snapshot = snapshots[-1]
+                with open(snapshot, 'rb') as fd:
+                    sagas = self._codec.decode(fd.read())
+
+            last = first
+            for no, seg in self._segments_list():
+                last = max(last, no)
+                if no < first:
+                    continue
+                with open(seg, 'rb') as fd:
+                    data = fd.read()
+                view = memoryview(data)
+                pos = 0
+                while pos + _FRAME.size <= len(data):
+                    size, = _FRAME.unpack_from(data, pos)
+                    if pos + _FRAME.size + size > len(data):
+                        break
+                    op, uid, payload = self._codec.decode(view[pos + _FRAME.size: pos + _FRAME.size + size])
+                    pos += _FRAME.size + size
+                    if op == _BEGIN:
+                        sagas[uid] = payload
+                    elif op == _STEP:
+                        if uid in sagas:
+                            sagas[uid]['@returns'][payload[0]] = payload[1]
+                    elif op == _RETRY:
+                        if uid in sagas:
+                            sagas[uid]['@retry'] = payload
+                    else:
+                        sagas.pop(uid, None)
+                if pos != len(data):
+                    _logger.warning(f"Truncated record at {seg.name}:{pos}", extra={'kind': 'journal'})
+                    with open(seg, 'r+b') as fd:
+                        fd.truncate(pos)
+
+            self._sagas = sagas
+            self._written = {uid: set(state.get('@returns', {})) for uid, state in sagas.items()}
+            self._retries = {uid: dict(state.get('@retry') or {}) for uid, state in sagas.items()}
+            self._released = {uid: {name for name, value in state.get('@returns', {}).items() if type(value) is Released}
+                              for uid, state in sagas.items()}
+            self._open_segment(last + 1)
+            self._snapshot()
+            return list(sagas.values())
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join()
+        with self._lock:
+            if self._segment is not None:
+                self._segment.close()
+                self._segment = None
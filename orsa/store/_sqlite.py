@@ -0,0 +1,172 @@
+from typing import Any
+from uuid import UUID
+import asyncio, concurrent.futures, pathlib, sqlite3, threading, time
+
+from ._base import Store
+from ._codec import StateCodec, PickleCodec
+from ..core._logger import getLogger
+
+_logger = getLogger("orsa", True)
+
+_SCHEMA = (
+    '''CREATE TABLE IF NOT EXISTS sagas (
+        uid TEXT PRIMARY KEY,
+        entry TEXT NOT NULL,
+        module TEXT,
+        src TEXT,
+        created REAL NOT NULL,
+        updated REAL NOT NULL,
+        state BLOB NOT NULL)''',
+    'CREATE INDEX IF NOT EXISTS sagas_entry ON sagas(entry, created)',
+    'CREATE INDEX IF NOT EXISTS sagas_created ON sagas(created)',
+)
+
+_UPSERT = '''INSERT INTO sagas(uid, entry, module, src, created, updated, state) VALUES (?, ?, ?, ?, ?, ?, ?)
+             ON CONFLICT(uid) DO UPDATE SET state = excluded.state, updated = excluded.updated'''
+
+_DELETE = 'DELETE FROM sagas WHERE uid = ?'
+
+class SQLiteStore(Store):
+    """
+    Saga state store in SQLite database (WAL mode), keyed by saga `@uid`.
+    Writes of concurrent sagas are collected during `window` seconds and committed by the writer thread
+    in one transaction, repeated writes of the same saga inside the window are coalesced. State is stored as the blob
+    encoded by `codec`
+
+    Examples:
+        manager = Manager(store=SQLiteStore('./saga.db'))
+    """
+    def __init__(self, path: str | pathlib.Path, window: float = 0.005, synchronous: str = 'FULL', codec: StateCodec = None):
+        self._path = str(path)
+        self._window = window
+        self._synchronous = synchronous
+        self._codec = codec if codec is not None else PickleCodec()
+        self._cond = threading.Condition()
+        self._pending: dict[str, tuple] = {}
+        self._waiters: list[concurrent.futures.Future] = []
+        self._closed = False
+        self._thread = threading.Thread(target=self.__writer, daemon=True, name='@sqlite-store')
+        self._ready = concurrent.futures.Future()
+        self._thread.start()
+        self._ready.result()
+
+    def _connect(self) -> sqlite3.Connection:
+        db = sqlite3.connect(self._path, isolation_level=None)
+        db.execute('PRAGMA journal_mode=WAL')
+        db.execute(f'PRAGMA synchronous={self._synchronous}')
+        return db
+
+    def __writer(self):
+        try:
+            db = self._connect()
+            for sql in _SCHEMA:
+                db.execute(sql)
+        except Exception as ex:
+            self._ready.set_exception(ex)
+            return
+        self._ready.set_result(True)
+
+        while True:
+            with self._cond:
+                while not self._waiters and not self._closed:
+                    self._cond.wait()
+                if not self._waiters and self._closed:
+                    break
+            # Group commit window: let concurrent sagas add their writes to the batch
+            time.sleep(self._window)
+            with self._cond:
+                batch, self._pending = self._pending, {}
+                waiters, self._waiters = self._waiters, []
+            try:
+                db.execute('BEGIN')
+                upserts = [row for op, row in batch.values() if op]
+                deletes = [(uid,) for uid, (op, row) in batch.items() if not op]
+                if upserts:
+                    db.executemany(_UPSERT, upserts)
+                if deletes:
+                    db.executemany(_DELETE, deletes)
+                db.execute('COMMIT')
+                error = None
+            except Exception as ex:
+                if db.in_transaction:
+                    db.execute('ROLLBACK')
+                _logger.error(f"Commit of {len(batch)} sagas failed", exc_info=ex, extra={'kind': 'sqlite'})
+                error = ex
+            for waiter in waiters:
+                if error is None:
+                    waiter.set_result(len(batch))
+                else:
+                    waiter.set_exception(error)
+        db.close()
+
+    def _write(self, uid: UUID, op: bool, row: tuple = None) -> concurrent.futures.Future:
+        waiter = concurrent.futures.Future()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Store is closed")
+            self._pending[str(uid)] = (op, row)
+            self._waiters.append(waiter)
+            self._cond.notify()
+        return waiter
+
+    def _row(self, saga) -> tuple:
+        state = saga.state
+        now = time.time()
+        blob = self._codec.encode({**state, '@returns': dict(state.get('@returns', {}))})
+        return (str(saga.uid), state.get('@entry'), state.get('@module'), state.get('@src'), state.get('@created', now), now, blob)
+
+    async def save(self, saga) -> None:
+        await asyncio.wrap_future(self._write(saga.uid, True, self._row(saga)))
+
+    async def save_many(self, sagas: list) -> None:
+        waiters = [self._write(saga.uid, True, self._row(saga)) for saga in sagas]
+        if waiters:
+            await asyncio.wrap_future(waiters[-1])
+
+    async def complete(self, saga) -> None:
+        await asyncio.wrap_future(self._write(saga.uid, False))
+
+    async def abort(self, saga, ex: Exception) -> None:
+        await asyncio.wrap_future(self._write(saga.uid, False))
+
+    async def flush(self) -> None:
+        """
+        Wait until all queued writes are committed
+        """
+        waiter = concurrent.futures.Future()
+        with self._cond:
+            self._waiters.append(waiter)
+            self._cond.notify()
+        await asyncio.wrap_future(waiter)
+
+    def _query(self, where: str = '', params: tuple = (), limit: int = -1) -> list[dict[str,Any]]:
+        db = self._connect()
+        try:
+            return [self._codec.decode(state) for state, in db.execute(f'SELECT state FROM sagas {where} ORDER BY created LIMIT ?', (*params, limit))]
+        finally:
+            db.close()
+
+    async def load(self) -> list[dict[str,Any]]:
+        await self.flush()
+        return await asyncio.to_thread(self._query)
+
+    async def pending(self, entry: str = None, older_than: float = None, limit: int = None) -> list[dict[str,Any]]:
+        """
+        Lookup states of in-flight sagas by entry name and/or age in seconds, oldest first
+        """
+        await self.flush()
+        where, params = [], []
+        if entry is not None:
+            where.append('entry = ?')
+            params.append(entry)
+        if older_than is not None:
+            where.append('created <= ?')
+            params.append(time.time() - older_than)
+        sql = f"WHERE {' AND '.join(where)}" if where else ''
+        return await asyncio.to_thread(self._query, sql, tuple(params), -1 if limit is None else limit)
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join()
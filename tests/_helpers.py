@@ -0,0 +1,37 @@
+import asyncio, contextlib
+
+
+def run(entry, *args, **kwargs):
+    """
+    Run the saga without manager and return its result
+    """
+    async def main():
+        return await entry(*args, **kwargs)
+    return asyncio.run(main())
+
+
+def run_managed(entry, *args, **kwargs):
+    """
+    Run the saga of the started manager and return its result
+    """
+    async def main():
+        return await asyncio.wrap_future(await entry(*args, **kwargs))
+    return asyncio.run(main())
+
+
+@contextlib.contextmanager
+def started(manager):
+    manager.Start()
+    try:
+        yield manager
+    finally:
+        manager.Stop()
+
+
+def restored(manager, timeout: float = 5.0):
+    """
+    Wait for the sagas restored from the built-in store on the manager startup
+    """
+    async def wait():
+        await manager._restoring
+    asyncio.run_coroutine_threadsafe(wait(), manager._shards[0].loop).result(timeout)
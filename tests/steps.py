@@ -0,0 +1,12 @@
+"""
+Module level steps of the tests, picklable to the process pool
+"""
+import os
+
+
+def pid(value: int) -> tuple[int, int]:
+    return os.getpid(), value
+
+
+def fail(value: int):
+    raise ValueError(f'failed {value}')
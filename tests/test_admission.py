@@ -0,0 +1,108 @@
+import asyncio, concurrent.futures
+
+import pytest
+
+from orsa import Overloaded
+from orsa.core._admission import _Admission
+
+
+class _Saga:
+    def __init__(self, name: str):
+        self._name = name
+
+
+class _Launcher:
+    """
+    Launch of the admitted sagas, every saga runs until it is finished by the test
+    """
+    def __init__(self):
+        self.running: dict[str, tuple[concurrent.futures.Future, object]] = {}
+        self.aborted: list[tuple[str, Exception]] = []
+
+    def launch(self, saga, release) -> concurrent.futures.Future:
+        future = concurrent.futures.Future()
+        self.running[saga._name] = (future, release)
+        return future
+
+    def abort(self, saga, ex):
+        self.aborted.append((saga._name, ex))
+
+    def finish(self, name: str, result=None):
+        future, release = self.running.pop(name)
+        future.set_result(result)
+        release()
+
+
+def test_pending_saga_is_launched_when_slot_is_released():
+    launcher = _Launcher()
+    admission = _Admission(launcher.launch, launcher.abort, max_in_flight=1, max_pending=1)
+
+    async def main():
+        first = await admission.admit(_Saga('a'))
+        second = await admission.admit(_Saga('b'))
+        assert list(launcher.running) == ['a']
+        launcher.finish('a', 1)
+        launcher.finish('b', 2)
+        return first.result(), second.result()
+
+    assert asyncio.run(main()) == (1, 2)
+    assert admission.info.admitted == 2
+
+
+def test_overflow_rejects_and_sheds():
+    launcher = _Launcher()
+    rejecting = _Admission(launcher.launch, launcher.abort, max_in_flight=1, max_pending=0, overflow='reject')
+    shedding = _Admission(launcher.launch, launcher.abort, max_in_flight=1, max_pending=1, overflow='shed')
+
+    async def main():
+        await rejecting.admit(_Saga('a'))
+        with pytest.raises(Overloaded):
+            await rejecting.admit(_Saga('b'))
+        await shedding.admit(_Saga('c'))
+        victim = await shedding.admit(_Saga('d'))
+        await shedding.admit(_Saga('e'))
+        with pytest.raises(Overloaded):
+            victim.result()
+
+    asyncio.run(main())
+    assert [name for name, ex in launcher.aborted] == ['d']
+
+
+def test_cancelled_blocked_admission_passes_wakeup_on():
+    launcher = _Launcher()
+    admission = _Admission(launcher.launch, launcher.abort, max_in_flight=1, max_pending=0)
+
+    async def main():
+        await admission.admit(_Saga('a'))
+        cancelled = asyncio.create_task(admission.admit(_Saga('b')))
+        waiting = asyncio.create_task(admission.admit(_Saga('c')))
+        await asyncio.sleep(0.01)
+        # Wakeup is delivered to the admission cancelled before it resumes
+        launcher.finish('a')
+        cancelled.cancel()
+        await asyncio.wait_for(waiting, 1.0)
+        with pytest.raises(asyncio.CancelledError):
+            await cancelled
+        return list(launcher.running), len(admission._blocked)
+
+    assert asyncio.run(main()) == (['c'], 0)
+
+
+def test_cancelled_blocked_admission_leaves_queue():
+    launcher = _Launcher()
+    admission = _Admission(launcher.launch, launcher.abort, max_in_flight=1, max_pending=0)
+
+    async def main():
+        await admission.admit(_Saga('a'))
+        cancelled = asyncio.create_task(admission.admit(_Saga('b')))
+        await asyncio.sleep(0.01)
+        cancelled.cancel()
+        await asyncio.gather(cancelled, return_exceptions=True)
+        assert len(admission._blocked) == 0
+        waiting = asyncio.create_task(admission.admit(_Saga('c')))
+        await asyncio.sleep(0.01)
+        launcher.finish('a')
+        await asyncio.wait_for(waiting, 1.0)
+        return list(launcher.running)
+
+    assert asyncio.run(main()) == ['c']
@@ -0,0 +1,77 @@
+import asyncio
+
+from orsa import Result, batch, orchestrator, Saga
+
+calls = []
+rolled = []
+
+
+@batch(max_size=10, max_wait=0.01)
+async def reserve(items: list[tuple[str, int]]) -> list:
+    calls.append(len(items))
+    return [ValueError(f'no {sku}') if qty < 0 else qty for sku, qty in items]
+
+
+@orchestrator
+async def order(saga: Saga, sku: str, qty: int):
+    @saga.step
+    async def hold() -> int:
+        return await reserve((sku, qty))
+
+    @saga.rollback
+    async def release(held: Result[int, hold]):
+        rolled.append(sku)
+
+    @saga.step
+    async def confirm(held: Result[int, hold]) -> int:
+        if held > 100:
+            raise RuntimeError('too much')
+        return held
+
+
+async def await_order(sku: str, qty: int):
+    return await order(sku, qty)
+
+
+def test_concurrent_sagas_share_bulk_call():
+    calls.clear()
+
+    async def main():
+        return await asyncio.gather(*[await_order(f'sku-{no}', no) for no in range(5)])
+
+    assert asyncio.run(main()) == [0, 1, 2, 3, 4]
+    assert calls == [5]
+    assert reserve.info.batches >= 1
+
+
+def test_item_failure_fails_only_its_saga():
+    rolled.clear()
+
+    async def main():
+        return await asyncio.gather(await_order('ok', 1), await_order('bad', -1), await_order('big', 500),
+                                    return_exceptions=True)
+
+    ok, bad, big = asyncio.run(main())
+    assert ok == 1
+    assert isinstance(bad, ValueError) and isinstance(big, RuntimeError)
+    assert rolled == ['big']
+
+
+def test_cancelled_bulk_call_cancels_waiting_items():
+    @batch(max_size=2, max_wait=0.01)
+    async def slow(items: list) -> list:
+        await asyncio.sleep(10)
+        return items
+
+    async def main():
+        waiting = [asyncio.ensure_future(slow(no)) for no in range(2)]
+        await asyncio.sleep(0.01)
+        for task in list(slow._running):
+            task.cancel()
+        done, _ = await asyncio.wait(waiting, timeout=1.0)
+        return done, waiting
+
+    done, waiting = asyncio.run(main())
+    assert len(done) == 2
+    assert all(future.cancelled() for future in waiting)
+
@@ -0,0 +1,29 @@
+import asyncio
+
+import pytest
+
+from benchmarks.__main__ import run_case
+from benchmarks._sagas import Stubs, build
+from orsa.core._template import _Template
+
+
+@pytest.mark.parametrize('mode', ['plain', 'journal'])
+@pytest.mark.parametrize('rollback', [False, True])
+def test_case_reports_throughput_and_latency(mode, rollback):
+    result = run_case(mode, 2, 5, 20, 0.2, rollback)
+    assert (result['mode'], result['sagas'], result['rollback']) == (mode, 20, rollback)
+    assert result['sagas_per_sec'] > 0 and result['p50_ms'] <= result['p99_ms'] <= result['max_ms']
+
+
+def test_generated_saga_is_templated():
+    stubs = Stubs(rollback=True)
+    entry = build(3, stubs)
+
+    async def main():
+        for n in range(2):
+            with pytest.raises(RuntimeError, match='Stub failure'):
+                await entry(n)
+
+    asyncio.run(main())
+    templates = [template for entry, template in _Template._templates.items() if entry.__code__.co_filename == '<bench_saga:3>']
+    assert templates and all(templates)
@@ -0,0 +1,51 @@
+import pytest
+
+from orsa import Result, orchestrator, Saga
+from orsa.core._callee import _Binding
+
+from _helpers import run
+
+calls = []
+
+
+@orchestrator
+async def transfer(saga: Saga, amount: int, currency: str = 'EUR'):
+    @saga.step
+    async def debit(amount: int) -> int:
+        calls.append('debit')
+        return amount
+
+    @saga.rollback
+    async def credit(debited: Result[int, debit]):
+        calls.append(f'credit {debited}')
+
+    @saga.step(retry=3)
+    async def convert(debited: Result[int, debit], currency: str, rate: float) -> float:
+        calls.append('convert')
+        return debited * rate
+
+
+@orchestrator
+async def exchange(saga: Saga, amount: int, currency: str = 'EUR'):
+    @saga.step
+    async def debit(amount: int) -> int:
+        return amount
+
+    @saga.step
+    async def convert(debited: Result[int, debit], currency: str) -> str:
+        return f'{debited} {currency}'
+
+
+def test_results_and_arguments_are_bound_by_shared_plan():
+    assert run(exchange, 5, 'EUR') == '5 EUR'
+    plans = len(_Binding._plans)
+    # Steps declared by the next instance reuse the plans of their code objects
+    assert run(exchange, 7, currency='USD') == '7 USD'
+    assert len(_Binding._plans) == plans
+
+
+def test_binding_error_fails_step_once_and_rolls_back():
+    calls.clear()
+    with pytest.raises(TypeError):
+        run(transfer, 5)
+    assert calls == ['debit', 'credit 5']
@@ -0,0 +1,66 @@
+import asyncio, threading, uuid
+
+import pytest
+
+from orsa import BlobRef, Manager, Result, orchestrator, Saga
+from orsa.store import BlobStore
+
+from _helpers import run, run_managed, started
+
+
+def test_unpicklable_result_is_kept_inline_and_rolled_back(tmp_path):
+    manager = Manager(blobs=BlobStore(tmp_path, threshold=64))
+    rolled = []
+
+    @orchestrator(manager=manager)
+    async def locked(saga: Saga, fail: bool):
+        @saga.step
+        def hold() -> threading.Lock:
+            return threading.Lock()
+
+        @saga.rollback
+        def release(lock: Result[threading.Lock, hold]):
+            rolled.append(type(lock))
+
+        @saga.step
+        def payload(lock: Result[threading.Lock, hold]) -> bytes:
+            if fail:
+                raise RuntimeError('declined')
+            return b'x' * 1000
+
+        @saga.step
+        def size(data: Result[bytes, payload]) -> int:
+            return len(data)
+
+    with started(manager):
+        assert run_managed(locked, False) == 1000
+        with pytest.raises(RuntimeError, match='declined'):
+            run_managed(locked, True)
+    assert rolled == [type(threading.Lock())]
+    assert manager.blobs.info.written == 1
+
+
+def test_handle_like_string_is_plain_data():
+    @orchestrator
+    async def echo(saga: Saga):
+        @saga.step
+        async def text() -> str:
+            return '@blob:0123.bytes'
+
+    assert run(echo) == '@blob:0123.bytes'
+
+
+def test_handles_restored_as_strings_are_listed_by_index(tmp_path):
+    blobs = BlobStore(tmp_path, threshold=64)
+    uid = uuid.UUID(int=1)
+    ref = asyncio.run(blobs.offload(uid, b'x' * 100, 'data'))
+    assert type(ref) is BlobRef
+
+    # Store without pickle restores the handle as the plain string
+    restored = BlobStore(tmp_path, threshold=64)
+    returns = {'data': str(ref), 'note': '@blob:0123.bytes'}
+    assert restored.sweep([{'@uid': uid, '@returns': returns}]) == 0
+    assert type(returns['data']) is BlobRef and type(returns['note']) is str
+    assert restored.load(returns['data']) == b'x' * 100
+    assert restored.release(uid) == 1
+    assert restored.handles(uid) == {}
@@ -0,0 +1,71 @@
+import time
+
+import pytest
+
+from orsa import Manager, Result, orchestrator, Saga
+
+from _helpers import run_managed, started
+
+# Lists captured by the step closure would make it uncacheable
+calls = []
+rolled = []
+
+
+def _declare(manager: Manager, ttl: float = 60.0):
+    calls.clear()
+    rolled.clear()
+
+    @orchestrator(manager=manager)
+    async def exchange(saga: Saga, currency: str, amount: float):
+        @saga.step(cache=ttl)
+        async def rate() -> float:
+            calls.append(currency)
+            if currency == 'XXX':
+                raise LookupError('no rate')
+            return 2.0
+
+        @saga.rollback
+        async def forget(value: Result[float, rate]):
+            rolled.append(value)
+
+        @saga.step
+        async def convert(value: Result[float, rate]) -> float:
+            if amount < 0:
+                raise ValueError('negative amount')
+            return amount * value
+
+    return exchange
+
+
+def test_cached_result_is_shared_by_sagas_with_same_closure():
+    manager = Manager(cache_size=2)
+    exchange = _declare(manager)
+    with started(manager):
+        assert [run_managed(exchange, 'EUR', n) for n in (1, 2)] == [2.0, 4.0]
+        with pytest.raises(ValueError):
+            run_managed(exchange, 'EUR', -1)
+        run_managed(exchange, 'USD', 1)
+        run_managed(exchange, 'GBP', 1)
+        # EUR is evicted by the size limit
+        run_managed(exchange, 'EUR', 1)
+        assert manager.cache.invalidate('exchange.rate') == 2
+        run_managed(exchange, 'USD', 1)
+    assert calls == ['EUR', 'USD', 'GBP', 'EUR', 'USD']
+    # Rollback of the cached step gets the cached result
+    assert rolled == [2.0]
+    info = manager.cache.info
+    assert (info.hits, info.evictions, info.invalidated) == (2, 2, 2)
+
+
+def test_failures_are_not_cached_and_results_expire():
+    manager = Manager()
+    exchange = _declare(manager, ttl=0.05)
+    with started(manager):
+        for _ in range(2):
+            with pytest.raises(LookupError):
+                run_managed(exchange, 'XXX', 1)
+        run_managed(exchange, 'EUR', 1)
+        time.sleep(0.1)
+        run_managed(exchange, 'EUR', 1)
+    assert calls == ['XXX', 'XXX', 'EUR', 'EUR']
+    assert manager.cache.info.expired == 1
@@ -0,0 +1,86 @@
+import asyncio
+
+import pytest
+
+from orsa import Manager, Result, orchestrator, Saga
+from orsa.core._flight import _Flights
+
+from _helpers import started
+
+calls = []
+rolled = []
+
+
+def _declare(manager: Manager):
+    calls.clear()
+    rolled.clear()
+
+    @orchestrator(manager=manager)
+    async def quote(saga: Saga, currency: str, no: int):
+        @saga.step
+        async def hold() -> int:
+            return no
+
+        @saga.rollback
+        async def release(held: Result[int, hold]):
+            rolled.append(held)
+
+        @saga.step(coalesce=True)
+        async def rate() -> float:
+            calls.append(currency)
+            await asyncio.sleep(0.05)
+            if currency == 'XXX':
+                raise LookupError('no rate')
+            return 2.0
+
+        @saga.step
+        async def price(value: Result[float, rate]) -> float:
+            return value * no
+
+    return quote
+
+
+def _run_many(manager: Manager, quote, currency: str, count: int) -> list:
+    async def main():
+        futures = [await quote(currency, no) for no in range(count)]
+        return await asyncio.gather(*map(asyncio.wrap_future, futures), return_exceptions=True)
+    return asyncio.run(main())
+
+
+def test_identical_calls_of_sagas_on_all_shards_are_merged():
+    manager = Manager(threads=2)
+    quote = _declare(manager)
+    with started(manager):
+        assert _run_many(manager, quote, 'EUR', 6) == [0.0, 2.0, 4.0, 6.0, 8.0, 10.0]
+    assert calls == ['EUR']
+    assert manager.coalesced.merged == 5
+
+
+def test_failure_of_the_call_fails_every_merged_saga():
+    manager = Manager()
+    quote = _declare(manager)
+    with started(manager):
+        results = _run_many(manager, quote, 'XXX', 4)
+    assert calls == ['XXX'] and all(isinstance(result, LookupError) for result in results)
+    assert sorted(rolled) == [0, 1, 2, 3]
+
+
+def test_waiting_caller_takes_over_the_cancelled_call():
+    flights = _Flights()
+    started = []
+
+    async def call(no: int) -> int:
+        started.append(no)
+        await asyncio.sleep(0.05)
+        return no
+
+    async def main():
+        leader = asyncio.create_task(flights.call(('rate',), lambda: call(1)))
+        await asyncio.sleep(0.01)
+        waiter = asyncio.create_task(flights.call(('rate',), lambda: call(2)))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        return await waiter
+
+    assert asyncio.run(main()) == 2
+    assert started == [1, 2] and flights.info.in_flight == 0
@@ -0,0 +1,82 @@
+import collections, dataclasses, datetime, decimal, enum, uuid
+from typing import NamedTuple
+
+import pytest
+
+from orsa import BlobRef
+from orsa.core._types import RELEASED, Released
+from orsa.store import MsgpackCodec, PickleCodec
+
+
+class Color(enum.Enum):
+    RED = 'red'
+
+
+class Point(NamedTuple):
+    x: int
+    y: int
+
+
+@dataclasses.dataclass
+class Item:
+    sku: str
+    qty: int
+    tags: tuple = ()
+    total: float = dataclasses.field(init=False, default=0.0)
+
+
+class Rows(list):
+    pass
+
+
+def _state() -> dict:
+    item = Item('a', 2, ('x',))
+    item.total = 4.5
+    return {'@uid': uuid.UUID(int=1), '@args': [1, 'a'], '@kwargs': {'b': None},
+            '@returns': {'rows': [(1, 'a', 0.5), (2, 'b', None), ()], 'item': item, 'point': Point(1, 2),
+                         'color': Color.RED, 'at': datetime.datetime(2024, 1, 2, 3, 4, 5, tzinfo=datetime.timezone.utc),
+                         'day': datetime.date(2024, 1, 2), 'time': datetime.time(3, 4), 'span': datetime.timedelta(1, 2, 3),
+                         'total': decimal.Decimal('10.25'), 'set': {1, 2}, 'frozen': frozenset({'a'}), 'keys': {(1, 2): 'pair'},
+                         'released': RELEASED, 'blob': BlobRef('@blob:0123.bytes'), 'raw': b'\x00\x01'}}
+
+
+@pytest.fixture(params=['pickle', 'msgpack'])
+def codec(request):
+    if request.param == 'msgpack':
+        pytest.importorskip('msgpack')
+        return MsgpackCodec()
+    return PickleCodec()
+
+
+def test_state_round_trip_keeps_types(codec):
+    state = _state()
+    restored = codec.decode(codec.encode(state))
+    assert restored == state
+    returns = restored['@returns']
+    assert type(returns['rows'][0]) is tuple and type(returns['point']) is Point
+    assert type(returns['released']) is Released and type(returns['blob']) is BlobRef
+    assert returns['item'].total == 4.5
+
+
+def test_msgpack_encodes_mapping_and_list_subclasses():
+    pytest.importorskip('msgpack')
+    codec = MsgpackCodec()
+    value = {'ordered': collections.OrderedDict(b=1, a=2), 'counter': collections.Counter('aab'),
+             'default': collections.defaultdict(list, x=[1]), 'rows': Rows([(1, 2)])}
+    restored = codec.decode(codec.encode(value))
+    assert restored == {'ordered': {'b': 1, 'a': 2}, 'counter': {'a': 2, 'b': 1}, 'default': {'x': [1]}, 'rows': [(1, 2)]}
+    assert type(restored['ordered']) is dict and type(restored['rows']) is list
+
+
+def test_msgpack_rejects_unknown_and_local_classes():
+    pytest.importorskip('msgpack')
+    codec = MsgpackCodec()
+
+    @dataclasses.dataclass
+    class Local:
+        value: int
+
+    with pytest.raises(TypeError, match='local class'):
+        codec.encode({'value': Local(1)})
+    with pytest.raises(TypeError, match='can not be encoded'):
+        codec.encode({'value': object()})
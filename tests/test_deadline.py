@@ -0,0 +1,52 @@
+import asyncio
+
+import pytest
+
+from orsa import DeadlineExceeded, Result, Retry, orchestrator, Saga
+
+from _helpers import run
+
+
+def test_timed_out_attempt_is_cancelled_and_retried():
+    attempts = []
+
+    @orchestrator
+    async def lookup(saga: Saga):
+        @saga.step(timeout=0.05, retry=Retry(2, 0.0, 1.0))
+        async def fetch() -> int:
+            attempts.append(len(attempts))
+            if len(attempts) < 2:
+                await asyncio.sleep(10)
+            return len(attempts)
+
+    assert run(lookup) == 2
+    assert attempts == [0, 1]
+
+
+def test_expired_deadline_cancels_step_and_rolls_back():
+    events = []
+
+    @orchestrator(deadline=0.1)
+    async def order(saga: Saga, delay: float):
+        @saga.step
+        async def reserve() -> int:
+            return 1
+
+        @saga.rollback
+        async def release(held: Result[int, reserve]):
+            events.append('released')
+
+        @saga.step
+        async def ship(held: Result[int, reserve]) -> str:
+            try:
+                await asyncio.sleep(delay)
+                return 'shipped'
+            except asyncio.CancelledError:
+                events.append('cancelled')
+                raise
+
+    with pytest.raises(DeadlineExceeded):
+        run(order, 10)
+    assert events == ['cancelled', 'released']
+    # Deadline of the call overrides the orchestrator one
+    assert run(order, 0.2, __deadline=5.0) == 'shipped'
@@ -0,0 +1,67 @@
+import os, threading
+
+import pytest
+
+from orsa import Manager, Result, orchestrator, Saga
+
+import steps
+from _helpers import run, run_managed, started
+
+
+def test_manager_process_executor_runs_closures_on_threads():
+    manager = Manager(executor='process', thread_workers=2, process_workers=1)
+
+    @orchestrator(manager=manager)
+    async def offloaded(saga: Saga, value: int):
+        @saga.step
+        def local() -> str:
+            return threading.current_thread().name
+
+        saga.step(steps.pid)
+
+        @saga.step
+        def collect(thread: Result[str, local], child: Result[tuple, steps.pid]) -> tuple:
+            return thread, child
+
+    with started(manager):
+        thread, (pid, value) = run_managed(offloaded, 7)
+    assert thread.startswith('@step')
+    assert pid != os.getpid() and value == 7
+
+
+def test_local_process_step_is_rejected_on_registration():
+    executed = []
+
+    @orchestrator
+    async def invalid(saga: Saga):
+        @saga.step
+        async def first():
+            executed.append('first')
+
+        @saga.step(executor='process')
+        def local():
+            executed.append('local')
+
+    with pytest.raises(TypeError, match='local function'):
+        run(invalid)
+    assert executed == []
+
+
+def test_process_step_failure_rolls_back():
+    rolled = []
+
+    @orchestrator
+    async def failing(saga: Saga, value: int):
+        @saga.step
+        async def first() -> int:
+            return value
+
+        @saga.rollback
+        async def undo(held: Result[int, first]):
+            rolled.append(held)
+
+        saga.step(steps.fail, executor='process')
+
+    with pytest.raises(ValueError, match='failed 3'):
+        run(failing, 3)
+    assert rolled == [3]
@@ -0,0 +1,78 @@
+import asyncio, time, uuid
+
+from orsa import Manager, Result, orchestrator, Saga
+from orsa.store import JournalStore
+
+from _helpers import restored, started
+
+calls = []
+
+
+@orchestrator
+async def shipment(saga: Saga, no: int, fail: bool):
+    @saga.step
+    async def reserve() -> int:
+        calls.append(('reserve', no))
+        return no
+
+    @saga.rollback
+    async def cancel(held: Result[int, reserve]):
+        calls.append(('cancel', held))
+
+    @saga.step
+    async def ship(held: Result[int, reserve]) -> int:
+        if fail:
+            raise RuntimeError('lost')
+        calls.append(('ship', held))
+        return held
+
+
+class _Saga:
+    """
+    Saga state as written by the manager after every step
+    """
+    def __init__(self, no: int, fail: bool = False):
+        self.uid = uuid.UUID(int=no + 1)
+        self.state = {'@uid': self.uid, '@args': [no, fail], '@kwargs': {}, '@src': __file__, '@entry': 'shipment',
+                      '@module': __name__, '@created': time.time(), '@deadline': None, '@retry': None, '@returns': {}}
+
+
+def _write(store: JournalStore, *sagas: _Saga):
+    async def main():
+        for saga in sagas:
+            await store.save(saga)
+            saga.state['@returns']['reserve'] = saga.state['@args'][0]
+            await store.save(saga)
+    asyncio.run(main())
+
+
+def test_journal_replays_step_records(tmp_path):
+    store = JournalStore(tmp_path, segment_size=64)
+    done, running = _Saga(1), _Saga(2)
+    _write(store, done, running)
+    asyncio.run(store.complete(done))
+    store.close()
+    # Record cut by the crash is dropped on load
+    segment = sorted(tmp_path.glob('journal.*.log'))[-1]
+    segment.write_bytes(segment.read_bytes() + b'\xff\x00\x00\x00partial')
+
+    store = JournalStore(tmp_path)
+    states = asyncio.run(store.load())
+    store.close()
+    assert [(state['@uid'], state['@returns']) for state in states] == [(running.uid, {'reserve': 2})]
+
+
+def test_restored_sagas_continue_after_the_journaled_steps(tmp_path):
+    calls.clear()
+    store = JournalStore(tmp_path)
+    _write(store, _Saga(1), _Saga(2, fail=True))
+    store.close()
+
+    manager = Manager(store=JournalStore(tmp_path))
+    with started(manager):
+        restored(manager)
+    assert sorted(calls) == [('cancel', 2), ('ship', 1)]
+
+    store = JournalStore(tmp_path)
+    assert asyncio.run(store.load()) == []
+    store.close()
@@ -0,0 +1,63 @@
+import io, json, logging, threading
+
+import pytest
+
+from orsa import configure_logging, orchestrator, Saga
+from orsa.core import _logger as logger_module
+
+from _helpers import run
+
+
+@pytest.fixture
+def output():
+    stream = io.StringIO()
+    yield stream
+    configure_logging(level=logging.WARNING)
+
+
+def _records(stream: io.StringIO) -> list[dict]:
+    # Listener is stopped to flush the queued records
+    logger_module._stop_listener()
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+@pytest.mark.parametrize('queued', [False, True])
+def test_structured_record_keeps_exception(output, queued):
+    logger = configure_logging(level=logging.INFO, structured=True, queued=queued, stream=output)
+    try:
+        raise ValueError('broken')
+    except ValueError:
+        logger.error("Step failed", exc_info=True, extra={'saga': 'charge', 'kind': 'order.', 'uid': 'u-1'})
+    record, = _records(output)
+    assert (record['message'], record['saga'], record['step'], record['uid']) == ('Step failed', 'order', 'charge', 'u-1')
+    assert 'ValueError: broken' in record['exc']
+
+
+def test_queued_records_are_formatted_in_listener(output, monkeypatch):
+    threads = []
+    for cls in (logging.Formatter, logger_module.JsonFormatter):
+        def traced(self, record, format=cls.format):
+            threads.append(threading.current_thread())
+            return format(self, record)
+        monkeypatch.setattr(cls, 'format', traced)
+
+    logger = configure_logging(level=logging.INFO, structured=True, queued=True, stream=output)
+    logger.info("value %d", 42)
+    records = _records(output)
+    assert records[0]['message'] == 'value 42'
+    assert threads and threading.current_thread() not in threads
+
+
+def test_failed_step_is_logged_with_saga_fields(output):
+    configure_logging(level=logging.WARNING, structured=True, queued=True, stream=output)
+
+    @orchestrator
+    async def order(saga: Saga):
+        @saga.step
+        async def charge():
+            raise RuntimeError('declined')
+
+    with pytest.raises(RuntimeError):
+        run(order)
+    record = next(record for record in _records(output) if record.get('step') == 'charge')
+    assert record['level'] == 'ERROR' and record['saga'] == 'order' and 'declined' in record['message']
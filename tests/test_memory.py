@@ -0,0 +1,44 @@
+import pytest
+
+from orsa import Retry, orchestrator, Saga
+
+from benchmarks.memory import run_case
+from _helpers import run
+
+contexts = []
+
+
+def test_template_runs_share_step_config():
+    contexts.clear()
+
+    @orchestrator
+    async def order(saga: Saga, fail: bool):
+        @saga.step(retry=Retry(2, 0.0, 1.0))
+        async def reserve() -> int:
+            contexts.append(saga)
+            return 1
+
+        @saga.rollback
+        async def release():
+            pass
+
+        @saga.step
+        async def pay():
+            if fail:
+                raise RuntimeError('declined')
+
+    run(order, False)
+    with pytest.raises(RuntimeError):
+        run(order, True)
+    first, second = contexts
+    assert not hasattr(first, '__dict__') and not hasattr(first._steps[0], '__dict__')
+    assert first._steps[0]._retry_config is second._steps[0]._retry_config
+    assert first._steps[0]._binding is second._steps[0]._binding
+    # State is built only when the store asks for it
+    assert first._state is None and second._state is None
+    assert first.state['@uid'] == first.uid and set(first.state['@returns']) == {'reserve', 'pay'}
+
+
+def test_parked_sagas_keep_less_memory_than_waiting_ones():
+    sizes = {mode: run_case(mode, 3, 200)['bytes_per_saga'] for mode in ('manager', 'parked')}
+    assert 0 < sizes['parked'] < sizes['manager']
@@ -0,0 +1,60 @@
+import pytest
+
+from orsa import Manager, Retry, orchestrator, Saga
+
+from _helpers import run_managed, started
+
+
+def test_step_and_saga_metrics_are_recorded():
+    manager = Manager()
+    attempts = []
+
+    @orchestrator(manager=manager)
+    async def payment(saga: Saga, fail: bool):
+        @saga.step(retry=Retry(2, 0.0, 1.0))
+        async def charge() -> int:
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise ConnectionError('gateway')
+            return 1
+
+        @saga.rollback
+        async def refund():
+            pass
+
+        @saga.step
+        async def receipt():
+            if fail:
+                raise RuntimeError('printer')
+
+    with started(manager):
+        run_managed(payment, False)
+        with pytest.raises(RuntimeError):
+            run_managed(payment, True)
+        metrics = manager.metrics
+
+    assert metrics.counter('orsa_step_attempts_total', ('payment', 'charge')) == 3
+    assert metrics.counter('orsa_step_retries_total', ('payment', 'charge')) == 1
+    assert metrics.counter('orsa_step_failures_total', ('payment', 'receipt')) == 1
+    assert metrics.counter('orsa_rollbacks_total', ('payment', 'refund', 'ok')) == 1
+    assert metrics.counter('orsa_sagas_total', ('payment', 'completed')) == 1
+    assert metrics.counter('orsa_sagas_total', ('payment', 'aborted')) == 1
+    assert metrics.histogram('orsa_step_duration_seconds', ('payment', 'charge')).count == 2
+    assert metrics.quantile('orsa_saga_duration_seconds', ('payment',), 0.99) is not None
+    text = metrics.prometheus()
+    assert 'orsa_sagas_total{saga="payment",outcome="completed"} 1' in text
+    assert '# TYPE orsa_step_duration_seconds histogram' in text
+
+
+def test_disabled_metrics():
+    manager = Manager(metrics=False)
+
+    @orchestrator(manager=manager)
+    async def noop(saga: Saga):
+        @saga.step
+        async def step() -> int:
+            return 1
+
+    with started(manager):
+        assert run_managed(noop) == 1
+        assert manager.metrics.counter('orsa_sagas_total', ('noop', 'completed')) == 0
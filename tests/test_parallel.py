@@ -0,0 +1,126 @@
+import asyncio
+
+import pytest
+
+from orsa import Manager, Result, orchestrator, Saga
+
+from _helpers import run, run_managed, started
+
+
+def test_graph_runs_independent_steps_concurrently():
+    events = []
+
+    @orchestrator(parallel=True)
+    async def order(saga: Saga, amount: int):
+        @saga.step
+        async def stock() -> int:
+            events.append('stock+')
+            await asyncio.sleep(0.05)
+            events.append('stock-')
+            return amount
+
+        @saga.step
+        async def price() -> int:
+            events.append('price+')
+            await asyncio.sleep(0.05)
+            events.append('price-')
+            return 10
+
+        @saga.step
+        def total(count: Result[int, stock], cost: Result[int, price]) -> int:
+            return count * cost
+
+    assert run(order, 3) == 30
+    assert events[:2] == ['stock+', 'price+']
+
+
+def test_graph_failure_finishes_siblings_and_compensates_them():
+    rolled = []
+
+    @orchestrator(parallel=True)
+    async def order(saga: Saga):
+        @saga.step
+        async def a():
+            await asyncio.sleep(0.05)
+            return 'a'
+
+        @saga.rollback
+        async def undo_a():
+            rolled.append('a')
+
+        @saga.step
+        async def b():
+            raise ValueError('b failed')
+
+        @saga.step
+        async def c():
+            await asyncio.sleep(0.05)
+            return 'c'
+
+        @saga.rollback
+        async def undo_c():
+            rolled.append('c')
+
+        @saga.step
+        def last(x: Result[str, a], y: Result[str, c]):
+            rolled.append('never')
+
+    with pytest.raises(ValueError, match='b failed'):
+        run(order)
+    assert sorted(rolled) == ['a', 'c']
+
+
+def test_graph_store_failure_rolls_back_and_calls_catch():
+    manager = Manager()
+    events = []
+
+    @manager.saga.store
+    async def store(self, saga):
+        if 'a' in saga.state['@returns']:
+            raise ConnectionError('store is down')
+
+    @orchestrator(manager=manager, parallel=True)
+    async def order(saga: Saga):
+        @saga.step
+        async def a():
+            return 'a'
+
+        @saga.rollback
+        async def undo_a():
+            events.append('undo a')
+
+        @saga.step
+        async def b():
+            await asyncio.sleep(0.1)
+            events.append('b done')
+            return 'b'
+
+        @saga.rollback
+        async def undo_b():
+            events.append('undo b')
+
+        @saga.catch
+        def failed(step, ex):
+            events.append(f'catch {type(ex).__name__}')
+
+    with started(manager), pytest.raises(ConnectionError):
+        run_managed(order)
+    # Sibling is finished before the rollback, nothing runs after the abort
+    assert events[0] == 'b done'
+    assert sorted(events[1:3]) == ['undo a', 'undo b']
+    assert events[3:] == ['catch ConnectionError']
+
+
+def test_graph_deadline_keeps_first_step_failure():
+    @orchestrator(parallel=True, deadline=0.1)
+    async def order(saga: Saga):
+        @saga.step
+        async def fails():
+            raise ValueError('first')
+
+        @saga.step
+        async def slow():
+            await asyncio.sleep(1)
+
+    with pytest.raises(ValueError, match='first'):
+        run(order)
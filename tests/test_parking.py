@@ -0,0 +1,57 @@
+import asyncio
+
+from orsa import Manager, Result, Retry, orchestrator, Saga
+
+from _helpers import started
+
+calls = []
+
+
+@orchestrator
+async def delivery(saga: Saga, failures: int):
+    @saga.step
+    async def pack() -> str:
+        calls.append('pack')
+        return 'box'
+
+    @saga.rollback
+    async def unpack(box: Result[str, pack]):
+        calls.append('unpack')
+
+    @saga.step(retry=Retry(2, 0.3, 1.0))
+    async def send(box: Result[str, pack]) -> str:
+        calls.append('send')
+        if calls.count('send') <= failures:
+            raise ConnectionError('courier')
+        return f'{box} sent'
+
+
+def _run(failures: int) -> tuple[object, int]:
+    calls.clear()
+    manager = Manager(park_after=0.1)
+
+    async def main():
+        # Parked saga is resumed by its module entry
+        future = await delivery(failures, __manager=manager)
+        await asyncio.sleep(0.15)
+        parked = manager.parked
+        try:
+            return await asyncio.wrap_future(future), parked
+        except ConnectionError as ex:
+            return ex, parked
+
+    with started(manager):
+        return asyncio.run(main())
+
+
+def test_parked_saga_resumes_after_the_retry_delay():
+    result, parked = _run(1)
+    assert (result, parked) == ('box sent', 1)
+    # Resumed saga continues from its state, the completed step is not executed again
+    assert calls == ['pack', 'send', 'send']
+
+
+def test_parked_saga_rolls_back_when_retries_are_exhausted():
+    result, parked = _run(5)
+    assert isinstance(result, ConnectionError) and parked == 1
+    assert calls == ['pack', 'send', 'send', 'unpack']
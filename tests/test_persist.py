@@ -0,0 +1,73 @@
+import asyncio
+
+import pytest
+
+from orsa import Manager, Result, orchestrator, Saga
+from orsa.store import Store
+
+from _helpers import started
+
+
+class _Recorder(Store):
+    """
+    Store keeping the batches of the saved sagas, fails to save the step results when `fail` is set
+    """
+    def __init__(self, fail: bool = False):
+        self.batches: list[list[tuple]] = []
+        self.finished: list[str] = []
+        self.fail = fail
+
+    async def save_many(self, sagas: list) -> None:
+        self.batches.append([(saga.uid, tuple(saga.state['@returns'])) for saga in sagas])
+        if self.fail:
+            raise OSError('disk full')
+
+    async def complete(self, saga) -> None:
+        self.finished.append('complete')
+
+    async def abort(self, saga, ex: Exception) -> None:
+        self.finished.append(type(ex).__name__)
+
+
+def _run_many(store: _Recorder, count: int) -> tuple[list, list]:
+    manager = Manager(store=store, store_delay=0.05)
+    rolled = []
+
+    @orchestrator(manager=manager)
+    async def order(saga: Saga, no: int):
+        @saga.step
+        async def reserve() -> int:
+            return no
+
+        @saga.rollback
+        async def release(held: Result[int, reserve]):
+            rolled.append(held)
+
+        @saga.step
+        async def confirm(held: Result[int, reserve]) -> int:
+            return held
+
+    async def main():
+        futures = [await order(no) for no in range(count)]
+        return await asyncio.gather(*map(asyncio.wrap_future, futures), return_exceptions=True)
+
+    with started(manager):
+        return asyncio.run(main()), rolled
+
+
+def test_stores_of_concurrent_sagas_are_batched():
+    store = _Recorder()
+    results, rolled = _run_many(store, 4)
+    assert results == [0, 1, 2, 3] and rolled == []
+    # One batch per step of all sagas, every saga once in a batch
+    assert [len(batch) for batch in store.batches] == [4, 4]
+    assert all(len({uid for uid, _ in batch}) == len(batch) for batch in store.batches)
+    assert store.finished == ['complete'] * 4
+
+
+def test_failed_store_rolls_back_the_stored_step():
+    store = _Recorder(fail=True)
+    results, rolled = _run_many(store, 3)
+    assert all(isinstance(result, OSError) for result in results)
+    assert sorted(rolled) == [0, 1, 2]
+    assert store.finished == ['OSError'] * 3
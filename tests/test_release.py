@@ -0,0 +1,77 @@
+import pytest
+
+from orsa import Manager, Released, Result, orchestrator, Saga
+from orsa.store import Store
+
+from _helpers import run_managed, started
+
+
+class _Snapshots(Store):
+    """
+    Store keeping the step results of every saved state
+    """
+    def __init__(self):
+        self.returns: list[dict] = []
+        self.completed: dict = None
+
+    async def save(self, saga) -> None:
+        self.returns.append(dict(saga.state['@returns']))
+
+    async def complete(self, saga) -> None:
+        self.completed = dict(saga.state['@returns'])
+
+
+def _declare(manager: Manager):
+    rolled = []
+
+    @orchestrator(manager=manager)
+    async def report(saga: Saga, fail: bool):
+        @saga.step
+        async def rows() -> list:
+            return [1, 2, 3]
+
+        @saga.step
+        async def total(values: Result[list, rows]) -> int:
+            return sum(values)
+
+        @saga.step(keep=True)
+        async def title() -> str:
+            return 'daily'
+
+        @saga.step
+        async def account() -> str:
+            return 'acc-1'
+
+        @saga.rollback
+        async def unlock(acc: Result[str, account]):
+            rolled.append(acc)
+
+        @saga.step
+        async def publish(value: Result[int, total], name: Result[str, title]) -> str:
+            if fail:
+                raise RuntimeError('offline')
+            return f'{name}: {value}'
+
+    return report, rolled
+
+
+def test_results_are_released_after_their_last_reader():
+    store = _Snapshots()
+    manager = Manager(store=store, store_batch=1)
+    report, _ = _declare(manager)
+    with started(manager):
+        assert run_managed(report, False) == 'daily: 6'
+    # Rows are dropped once the total is computed, the result read by publish lives until then
+    assert type(store.returns[1]['rows']) is Released
+    assert store.returns[1]['total'] == 6
+    assert type(store.completed['total']) is Released
+    assert (store.completed['title'], store.completed['account'], store.completed['publish']) == ('daily', 'acc-1', 'daily: 6')
+
+
+def test_result_read_by_rollback_lives_until_abort():
+    manager = Manager()
+    report, rolled = _declare(manager)
+    with started(manager):
+        with pytest.raises(RuntimeError, match='offline'):
+            run_managed(report, True)
+    assert rolled == ['acc-1']
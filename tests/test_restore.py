@@ -0,0 +1,56 @@
+import asyncio, uuid
+
+from orsa import Manager, Result, orchestrator, Saga
+
+from _helpers import started
+
+running = []
+peak = []
+rolled = []
+
+
+@orchestrator
+async def settle(saga: Saga, no: int, fail: bool):
+    @saga.step
+    async def hold() -> int:
+        return no
+
+    @saga.rollback
+    async def free(held: Result[int, hold]):
+        rolled.append(held)
+
+    @saga.step
+    async def pay(held: Result[int, hold]) -> int:
+        running.append(held)
+        peak.append(len(running))
+        await asyncio.sleep(0.01)
+        running.remove(held)
+        if fail:
+            raise RuntimeError('declined')
+        return held
+
+
+def _state(no: int, entry: str = 'settle') -> dict:
+    return {'@uid': uuid.UUID(int=no + 1), '@args': [no, no % 4 == 0], '@kwargs': {}, '@src': __file__, '@entry': entry,
+            '@module': __name__, '@created': float(no), '@deadline': None, '@retry': None, '@returns': {'hold': no}}
+
+
+def test_restore_is_bounded_and_reports_every_saga():
+    peak.clear()
+    rolled.clear()
+    progress = []
+    manager = Manager()
+    states = [_state(no) for no in range(8)] + [_state(8, entry='missing')]
+
+    async def restore():
+        return await manager.restore(states, concurrency=3, progress=lambda _, report: progress.append(report.completed))
+
+    async def main():
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(restore(), manager._shards[0].loop))
+
+    with started(manager):
+        report = asyncio.run(main())
+    assert (report.total, report.restored, report.completed, report.aborted) == (9, 8, 6, 2)
+    assert [uid for uid, _ in report.failed] == [uuid.UUID(int=9)]
+    assert max(peak) == 3 and len(progress) == 9
+    assert sorted(rolled) == [0, 4]
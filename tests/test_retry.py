@@ -0,0 +1,70 @@
+import asyncio
+
+import pytest
+
+from orsa import CircuitOpen, Manager, Retry, RetryPolicy, orchestrator, Saga
+
+from _helpers import run_managed, started
+
+
+def _manager(policy: RetryPolicy) -> tuple[Manager, object, list]:
+    manager = Manager(retry_policy=policy)
+    calls = []
+
+    @orchestrator(manager=manager)
+    async def charge(saga: Saga):
+        @saga.step
+        async def hold() -> int:
+            calls.append('hold')
+            return 1
+
+        @saga.rollback
+        async def release():
+            calls.append('release')
+
+        @saga.step(retry=Retry(5, 0.0, 1.0))
+        async def pay():
+            calls.append('pay')
+            raise ConnectionError('gateway')
+
+    return manager, charge, calls
+
+
+def test_exhausted_budget_stops_retries():
+    policy = RetryPolicy(budget_rate=0.001, budget_burst=1)
+    manager, charge, calls = _manager(policy)
+    with started(manager):
+        with pytest.raises(ConnectionError):
+            run_managed(charge)
+    # One retry is paid from the bucket, the next one is refused
+    assert calls == ['hold', 'pay', 'pay', 'release']
+    info, = [info for key, info in policy.info.items() if key.endswith('pay')]
+    assert (info.retries, info.exhausted) == (1, 1)
+
+
+def test_open_breaker_fails_fast_and_rolls_back():
+    policy = RetryPolicy(breaker_threshold=3, breaker_reset=60.0)
+    manager, charge, calls = _manager(policy)
+    with started(manager):
+        # Breaker is opened by the retries of the first saga
+        with pytest.raises(CircuitOpen):
+            run_managed(charge)
+        assert calls == ['hold', 'pay', 'pay', 'pay', 'release']
+        calls.clear()
+        with pytest.raises(CircuitOpen):
+            run_managed(charge)
+    assert calls == ['hold', 'release']
+    info, = [info for key, info in policy.info.items() if key.endswith('pay')]
+    assert info.state == 'open' and info.short_circuited == 2
+
+
+@pytest.mark.parametrize('jitter', ['full', 'decorrelated'])
+def test_jittered_delays_stay_in_range(jitter):
+    policy = RetryPolicy(jitter=jitter, max_delay=3.0)
+    retry = Retry(10, 1.0, 2.0)
+    previous = None
+    for attempt in range(6):
+        delay = policy.delay('step', attempt, retry, previous)
+        upper = 1.0 * 2.0 ** attempt if jitter == 'full' else max(1.0, (previous or 1.0) * 3)
+        assert 0.0 <= delay <= min(upper, 3.0)
+        previous = delay
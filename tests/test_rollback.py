@@ -0,0 +1,60 @@
+import asyncio
+
+import pytest
+
+from orsa import Result, orchestrator, Saga
+
+from _helpers import run
+
+
+def test_independent_rollbacks_run_concurrently_after_dependents():
+    events = []
+    outcomes = []
+
+    @orchestrator(parallel_rollback=True)
+    async def trip(saga: Saga):
+        async def undo(name: str):
+            events.append(f'{name} start')
+            await asyncio.sleep(0.02)
+            events.append(f'{name} end')
+
+        @saga.step
+        async def flight() -> str:
+            return 'F1'
+
+        @saga.rollback
+        async def cancel_flight(booked: Result[str, flight]):
+            await undo('flight')
+
+        @saga.step
+        async def hotel() -> str:
+            return 'H1'
+
+        @saga.rollback
+        async def cancel_hotel():
+            await undo('hotel')
+            raise RuntimeError('hotel is closed')
+
+        @saga.step
+        async def seat(booked: Result[str, flight]) -> str:
+            return f'{booked}-12A'
+
+        @saga.rollback
+        async def cancel_seat(reserved: Result[str, seat]):
+            await undo('seat')
+
+        @saga.step
+        async def pay():
+            raise RuntimeError('declined')
+
+        @saga.catch
+        def failed(step_name, ex):
+            outcomes.extend((info.name, info.step, type(info.error).__name__ if info.error else None) for info in saga.rollbacks)
+
+    with pytest.raises(RuntimeError, match='declined'):
+        run(trip)
+    # Hotel is independent of the others, flight is released after the seat taking its result
+    assert events.index('hotel start') < events.index('seat end')
+    assert events.index('seat end') < events.index('flight start')
+    assert sorted(outcomes) == [('cancel_flight', 'flight', None), ('cancel_hotel', 'hotel', 'RuntimeError'),
+                                ('cancel_seat', 'seat', None)]
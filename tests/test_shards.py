@@ -0,0 +1,57 @@
+import asyncio, threading, uuid
+
+from orsa import Manager, orchestrator, Saga
+
+from _helpers import started
+
+threads = {}
+
+
+@orchestrator
+async def sharded(saga: Saga, no: int, fail: bool = False):
+    @saga.step
+    async def record() -> int:
+        threads[no] = threading.current_thread().name
+        return no
+
+    @saga.rollback
+    async def undo():
+        threads[no] = 'rolled back'
+
+    @saga.step
+    async def finish() -> int:
+        if fail:
+            raise RuntimeError('failed')
+        return no
+
+
+def _states(count: int, uid) -> list[dict]:
+    return [{'@uid': uid(uuid.UUID(int=no + 1)), '@args': [no, no % 3 == 0], '@kwargs': {}, '@src': __file__, '@entry': 'sharded',
+             '@module': __name__, '@created': 0.0, '@deadline': None, '@retry': None, '@returns': {}} for no in range(count)]
+
+
+def _restore(manager: Manager, states: list[dict]):
+    async def main():
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(manager.restore(states), manager._shards[0].loop))
+    return asyncio.run(main())
+
+
+def test_sagas_are_spread_over_shards():
+    threads.clear()
+    manager = Manager(threads=2)
+    with started(manager):
+        report = _restore(manager, _states(8, lambda uid: uid))
+    assert (report.restored, report.completed, report.aborted, report.failed) == (8, 5, 3, [])
+    assert len({name for name in threads.values() if name != 'rolled back'}) == 2
+
+
+def test_string_uids_of_restored_states_are_routed():
+    # JSON-backed stores keep the uid as the string
+    threads.clear()
+    manager = Manager(threads=2)
+    states = _states(6, str)
+    with started(manager):
+        report = _restore(manager, states)
+    assert (report.restored, report.completed, report.aborted, report.failed) == (6, 4, 2, [])
+    assert sorted(no for no, name in threads.items() if name == 'rolled back') == [0, 3]
+    assert all(type(state['@uid']) is uuid.UUID for state in states)
@@ -0,0 +1,87 @@
+import asyncio, time, uuid
+
+from orsa import Manager, Result, orchestrator, Saga
+from orsa.store import SQLiteStore
+
+from _helpers import restored, started
+
+calls = []
+
+
+@orchestrator
+async def booking(saga: Saga, no: int, fail: bool):
+    @saga.step
+    async def hold() -> int:
+        calls.append(('hold', no))
+        return no
+
+    @saga.rollback
+    async def free(held: Result[int, hold]):
+        calls.append(('free', held))
+
+    @saga.step
+    async def confirm(held: Result[int, hold]) -> int:
+        if fail:
+            raise RuntimeError('rejected')
+        calls.append(('confirm', held))
+        return held
+
+
+class _Saga:
+    """
+    Saga state as written by the manager after every step
+    """
+    def __init__(self, no: int, fail: bool = False, entry: str = 'booking', age: float = 0.0):
+        self.uid = uuid.UUID(int=no + 1)
+        self.state = {'@uid': self.uid, '@args': [no, fail], '@kwargs': {}, '@src': __file__, '@entry': entry,
+                      '@module': __name__, '@created': time.time() - age, '@deadline': None, '@retry': None,
+                      '@returns': {'hold': no}}
+
+
+def test_concurrent_writes_are_committed_together(tmp_path):
+    store = SQLiteStore(tmp_path / 'saga.db', window=0.05)
+    sagas = [_Saga(no) for no in range(4)]
+    done = _Saga(9)
+
+    # Waiters of one transaction get the number of sagas written by it
+    waiters = [store._write(saga.uid, True, store._row(saga)) for saga in (*sagas, done, sagas[0])]
+    # Repeated write of the same saga inside the window is coalesced
+    assert {waiter.result(5.0) for waiter in waiters} == {5}
+    asyncio.run(store.complete(done))
+    assert [state['@uid'] for state in asyncio.run(store.load())] == [saga.uid for saga in sagas]
+    store.close()
+
+
+def test_pending_sagas_are_looked_up_by_entry_and_age(tmp_path):
+    store = SQLiteStore(tmp_path / 'saga.db')
+    sagas = [_Saga(1, age=60.0), _Saga(2, entry='refund', age=60.0), _Saga(3)]
+
+    async def main():
+        await store.save_many(sagas)
+        return (await store.pending(entry='booking'), await store.pending(older_than=30.0),
+                await store.pending(limit=1))
+
+    by_entry, old, first = asyncio.run(main())
+    store.close()
+    assert [state['@uid'] for state in by_entry] == [sagas[0].uid, sagas[2].uid]
+    assert [state['@uid'] for state in old] == [sagas[0].uid, sagas[1].uid]
+    assert len(first) == 1
+
+
+def test_restored_sagas_continue_after_the_stored_steps(tmp_path):
+    calls.clear()
+    store = SQLiteStore(tmp_path / 'saga.db')
+
+    async def main():
+        await store.save_many([_Saga(1), _Saga(2, fail=True)])
+    asyncio.run(main())
+    store.close()
+
+    manager = Manager(store=SQLiteStore(tmp_path / 'saga.db'))
+    with started(manager):
+        restored(manager)
+    assert sorted(calls) == [('confirm', 1), ('free', 2)]
+
+    store = SQLiteStore(tmp_path / 'saga.db')
+    assert asyncio.run(store.load()) == []
+    store.close()
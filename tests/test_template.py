@@ -0,0 +1,69 @@
+import pytest
+
+from orsa import Result, Retry, orchestrator, Saga
+from orsa.core._template import _Template
+
+from _helpers import run
+
+audits = []
+
+
+def audit():
+    audits.append(1)
+
+
+def test_template_binds_arguments_of_every_run():
+    @orchestrator
+    async def convert(saga: Saga, amount: int, rate: int):
+        @saga.step(retry=Retry(1, 0.0, 1.0))
+        async def base() -> int:
+            return amount * rate
+
+        @saga.step
+        def rounded(value: Result[int, base]) -> int:
+            return value + 1
+
+    assert [run(convert, n, 10) for n in (1, 2, 3)] == [11, 21, 31]
+    assert any(tpl and [stp._name for stp, no in tpl.steps] == ['base', 'rounded'] for tpl in _Template._templates.values())
+
+
+def test_template_rolls_back_with_run_arguments():
+    rolled = []
+
+    @orchestrator
+    async def reserve(saga: Saga, sku: str, fail: bool):
+        @saga.step
+        async def hold() -> str:
+            return sku
+
+        @saga.rollback
+        async def release(held: Result[str, hold]):
+            rolled.append(held)
+
+        @saga.step
+        async def charge():
+            if fail:
+                raise RuntimeError('declined')
+
+    run(reserve, 'a', False)
+    with pytest.raises(RuntimeError):
+        run(reserve, 'b', True)
+    with pytest.raises(RuntimeError):
+        run(reserve, 'c', True)
+    assert rolled == ['b', 'c']
+
+
+def test_entry_with_side_effects_runs_every_time():
+    audits.clear()
+
+    @orchestrator
+    async def audited(saga: Saga, value: int):
+        audit()
+
+        @saga.step
+        async def echo() -> int:
+            return value
+
+    assert [run(audited, n) for n in range(3)] == [0, 1, 2]
+    assert len(audits) == 3
+    assert not any(tpl and [stp._name for stp, no in tpl.steps] == ['echo'] for tpl in _Template._templates.values())
@@ -0,0 +1,70 @@
+import pytest
+
+from orsa import InMemoryTracer, Manager, Retry, orchestrator, Saga, set_tracer
+from orsa.core import _tracing
+
+from _helpers import run, run_managed, started
+
+
+@pytest.fixture
+def tracer():
+    tracer = InMemoryTracer()
+    set_tracer(tracer)
+    yield tracer
+    set_tracer(None)
+
+
+def _declare(manager: Manager = None):
+    attempts = []
+
+    @orchestrator(manager=manager)
+    async def payment(saga: Saga, fail: bool):
+        @saga.step(retry=Retry(2, 0.0, 1.0))
+        async def charge() -> int:
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise ConnectionError('gateway')
+            return 1
+
+        @saga.rollback
+        async def refund():
+            pass
+
+        @saga.step
+        async def receipt():
+            if fail:
+                raise RuntimeError('printer')
+
+    return payment
+
+
+def test_spans_of_saga_steps_attempts_and_rollbacks(tracer):
+    with pytest.raises(RuntimeError):
+        run(_declare(), True)
+    saga, = tracer.find('saga payment')
+    assert [span.name for span in tracer.children(saga)] == ['step charge', 'step receipt', 'rollback refund']
+    charge, receipt, refund = tracer.children(saga)
+    attempts = tracer.children(charge)
+    assert [type(span.error) for span in attempts] == [ConnectionError, type(None)]
+    assert isinstance(receipt.error, RuntimeError) and isinstance(saga.error, RuntimeError)
+    assert saga.attributes['orsa.saga.entry'] == 'payment' and refund.attributes['orsa.step'] == 'refund'
+
+
+def test_saga_on_manager_shard_is_child_of_calling_span(tracer):
+    manager = Manager()
+    payment = _declare(manager)
+    request = tracer.start_span('request')
+    token = _tracing._current.set(request)
+    try:
+        with started(manager):
+            assert run_managed(payment, False) is None
+    finally:
+        _tracing._current.reset(token)
+    saga, = tracer.find('saga payment')
+    assert saga.parent_id == request.span_id and saga.error is None
+
+
+def test_no_spans_without_tracer():
+    set_tracer(None)
+    assert _tracing._start('step') is None
+    assert run(_declare(), False) is None